@@ -6,30 +6,36 @@ from fastapi import APIRouter
 import sys
 sys.path.append('/opt/syntx-workflow-api-get-prompts/api-core')
 
-from utils.log_loader import load_field_flow, load_evolution, get_queue_counts
-from utils.algorithms import calculate_health_score, calculate_trend
-from collections import Counter
+import numpy as np
+
+from utils.log_loader import load_evolution, get_queue_counts
+from utils.algorithms import calculate_health_score
+from utils.analytics_snapshot import get_snapshot, trend
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 @router.get("/dashboard")
 async def get_dashboard():
     """📊 Dashboard Summary"""
-    entries = load_field_flow(limit=100)
+    snap = get_snapshot()
     generations = load_evolution()
     queue = get_queue_counts()
     
-    scores = [e.get('quality_score', {}).get('total_score', 0) for e in entries if e.get('quality_score')]
-    avg_score = sum(scores) / len(scores) if scores else 0
+    # Letzte 100 Jobs
+    recent = np.zeros(len(snap), dtype=bool)
+    recent[-100:] = True
+    
+    scores = np.nan_to_num(snap.score[recent & snap.has_quality], nan=0.0)
+    avg_score = float(scores.mean()) if len(scores) else 0
     
-    perfect = len([s for s in scores if s == 100])
-    success_rate = (perfect / len(scores) * 100) if scores else 0
+    perfect = int(np.count_nonzero(scores == 100))
+    success_rate = (perfect / len(scores) * 100) if len(scores) else 0
     
-    topics = Counter([e.get('topic') for e in entries if e.get('topic')])
-    wrappers = Counter([e.get('wrapper') for e in entries if e.get('wrapper')])
+    topics = snap.group_counts("topic", recent)
+    top_topics = dict(sorted(topics.items(), key=lambda x: x[1], reverse=True)[:5])
+    wrappers = snap.group_counts("wrapper", recent)
     
-    recent_scores = scores[-10:] if len(scores) > 10 else scores
-    trend = calculate_trend(recent_scores)
+    quality_trend = trend(scores[-10:])
     
     metrics = {
         "queue_health": 100 - (queue['incoming'] / 200 * 100),
@@ -47,12 +53,12 @@ async def get_dashboard():
         "qualität": {
             "durchschnitt": round(avg_score, 2),
             "success_rate": round(success_rate, 2),
-            "trend": trend
+            "trend": quality_trend
         },
         "aktivität": {
-            "total_jobs": len(entries),
+            "total_jobs": int(np.count_nonzero(recent)),
             "generationen": len(generations),
-            "top_topics": dict(topics.most_common(5)),
-            "wrappers": dict(wrappers)
+            "top_topics": top_topics,
+            "wrappers": wrappers
         }
     }
@@ -6,27 +6,48 @@ from fastapi import APIRouter
 import sys
 sys.path.append('/opt/syntx-workflow-api-get-prompts/api-core')
 
-from utils.log_loader import load_field_flow
-from collections import Counter
+import numpy as np
+
+from utils.analytics_snapshot import get_snapshot
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
+
+def _success_by(snap, by: str):
+    """Success Rate + Avg (auf int gekürzte Scores) pro Wrapper/Topic"""
+    mask = snap.has_score
+    scores = np.trunc(snap.score)
+    totals = snap.group(by, scores, mask)
+    perfect = snap.group(by, (scores == 100).astype(np.float64), mask)
+
+    results = {}
+    for label, g in totals.items():
+        total = g["count"]
+        results[label] = {
+            "total_jobs": total,
+            "success_rate": round(perfect[label]["sum"] / total * 100, 2),
+            "avg_score": round(g["sum"] / total, 2)
+        }
+    return results
+
+
 @router.get("/success-rate")
 async def get_success_rate():
     """Overall Success Rate"""
-    entries = load_field_flow()
-    
-    scores = [e.get('quality_score', {}).get('total_score', 0) for e in entries if e.get('quality_score')]
-    
-    if not scores:
+    snap = get_snapshot()
+
+    # Jobs mit quality_score, fehlender total_score zählt als 0
+    scores = np.nan_to_num(snap.score[snap.has_quality], nan=0.0)
+
+    if not len(scores):
         return {"status": "NO_DATA", "success_rate": 0}
-    
+
     total = len(scores)
-    perfect = len([s for s in scores if s == 100])
-    good = len([s for s in scores if 80 <= s < 100])
-    medium = len([s for s in scores if 50 <= s < 80])
-    low = len([s for s in scores if s < 50])
-    
+    perfect = int(np.count_nonzero(scores == 100))
+    good = int(np.count_nonzero((scores >= 80) & (scores < 100)))
+    medium = int(np.count_nonzero((scores >= 50) & (scores < 80)))
+    low = int(np.count_nonzero(scores < 50))
+
     return {
         "status": "SUCCESS_RATE_AKTIV",
         "gesamt_jobs": total,
@@ -42,72 +63,19 @@ async def get_success_rate():
 @router.get("/success-rate/by-wrapper")
 async def get_success_rate_by_wrapper():
     """Success Rate per Wrapper"""
-    entries = load_field_flow()
-    
-    by_wrapper = {}
-    for e in entries:
-        wrapper = e.get('wrapper', 'unknown')
-        quality_score = e.get("quality_score")
-        score_raw = quality_score.get("total_score") if quality_score else None
-        
-        if score_raw is not None:
-            try:
-                score = int(score_raw)
-            except (TypeError, ValueError):
-                continue # Skip data that can't be converted to int
-            
-            if wrapper not in by_wrapper:
-                by_wrapper[wrapper] = []
-            by_wrapper[wrapper].append(score)
-    
-    results = {}
-    for wrapper, scores in by_wrapper.items():
-        total = len(scores)
-        perfect = len([s for s in scores if s == 100])
-        results[wrapper] = {
-            "total_jobs": total,
-            "success_rate": round(perfect / total * 100, 2) if total > 0 else 0,
-            "avg_score": round(sum(scores) / total, 2) if total > 0 else 0
-        }
-    
     return {
         "status": "SUCCESS_RATE_BY_WRAPPER_AKTIV",
-        "wrappers": results
+        "wrappers": _success_by(get_snapshot(), "wrapper")
     }
 
 @router.get("/success-rate/by-topic")
 async def get_success_rate_by_topic():
     """Success Rate per Topic"""
-    entries = load_field_flow()
-    
-    by_topic = {}
-    for e in entries:
-        topic = e.get('topic', 'unknown')
-        score_raw = e.get('quality_score', {}).get('total_score')
-        
-        if score_raw is not None:
-            try:
-                score = int(score_raw)
-            except (TypeError, ValueError):
-                continue # Skip data that can't be converted to int
-
-            if topic not in by_topic:
-                by_topic[topic] = []
-            by_topic[topic].append(score)
-    
-    results = {}
-    for topic, scores in by_topic.items():
-        total = len(scores)
-        perfect = len([s for s in scores if s == 100])
-        results[topic] = {
-            "total_jobs": total,
-            "success_rate": round(perfect / total * 100, 2) if total > 0 else 0,
-            "avg_score": round(sum(scores) / total, 2) if total > 0 else 0
-        }
-    
+    results = _success_by(get_snapshot(), "topic")
+
     # Sort by success rate
     results = dict(sorted(results.items(), key=lambda x: x[1]['success_rate'], reverse=True))
-    
+
     return {
         "status": "SUCCESS_RATE_BY_TOPIC_AKTIV",
         "topics": results
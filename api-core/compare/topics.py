@@ -6,52 +6,43 @@ from fastapi import APIRouter
 import sys
 sys.path.append('/opt/syntx-workflow-api-get-prompts/api-core')
 
-from utils.log_loader import load_field_flow
+from utils.analytics_snapshot import get_snapshot
 
 router = APIRouter(prefix="/compare", tags=["compare"])
 
 @router.get("/topics/{topic1}/{topic2}")
 async def compare_two_topics(topic1: str, topic2: str):
     """Compare two topics"""
-    entries = load_field_flow()
-    
-    t1_data = {"scores": [], "wrappers": []}
-    t2_data = {"scores": [], "wrappers": []}
-    
-    for e in entries:
-        topic = e.get('topic', '').lower()
-        score = e.get('quality_score', {}).get('total_score')
-        wrapper = e.get('wrapper')
-        
-        if topic == topic1.lower() and score is not None:
-            t1_data["scores"].append(score)
-            if wrapper:
-                t1_data["wrappers"].append(wrapper)
-        elif topic == topic2.lower() and score is not None:
-            t2_data["scores"].append(score)
-            if wrapper:
-                t2_data["wrappers"].append(wrapper)
-    
-    if not t1_data["scores"] or not t2_data["scores"]:
+    snap = get_snapshot()
+
+    t1_mask = snap.topic_mask(topic1) & snap.has_score
+    if topic1.lower() == topic2.lower():
+        # Original-Semantik: gleiches Topic landet nur im ersten Bucket
+        t2_mask = t1_mask & False
+    else:
+        t2_mask = snap.topic_mask(topic2) & snap.has_score
+
+    t1_scores = snap.score[t1_mask]
+    t2_scores = snap.score[t2_mask]
+
+    if not len(t1_scores) or not len(t2_scores):
         return {"status": "INSUFFICIENT_DATA"}
-    
-    t1_avg = sum(t1_data["scores"]) / len(t1_data["scores"])
-    t2_avg = sum(t2_data["scores"]) / len(t2_data["scores"])
-    
-    from collections import Counter
-    
+
+    t1_avg = float(t1_scores.mean())
+    t2_avg = float(t2_scores.mean())
+
     return {
         "status": "TOPIC_COMPARISON_AKTIV",
         "comparison": {
             topic1: {
                 "avg_score": round(t1_avg, 2),
-                "total_jobs": len(t1_data["scores"]),
-                "wrapper_distribution": dict(Counter(t1_data["wrappers"]))
+                "total_jobs": len(t1_scores),
+                "wrapper_distribution": snap.group_counts("wrapper", t1_mask)
             },
             topic2: {
                 "avg_score": round(t2_avg, 2),
-                "total_jobs": len(t2_data["scores"]),
-                "wrapper_distribution": dict(Counter(t2_data["wrappers"]))
+                "total_jobs": len(t2_scores),
+                "wrapper_distribution": snap.group_counts("wrapper", t2_mask)
             },
             "better_topic": topic1 if t1_avg > t2_avg else topic2,
             "score_difference": round(abs(t1_avg - t2_avg), 2)
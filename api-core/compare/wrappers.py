@@ -6,54 +6,34 @@ from fastapi import APIRouter
 import sys
 sys.path.append('/opt/syntx-workflow-api-get-prompts/api-core')
 
-from utils.log_loader import load_field_flow
-from collections import Counter
+from utils.analytics_snapshot import get_snapshot
 
 router = APIRouter(prefix="/compare", tags=["compare"])
 
 @router.get("/wrappers")
 async def compare_all_wrappers():
     """Compare all wrappers"""
-    entries = load_field_flow()
-    
-    by_wrapper = {}
-    for e in entries:
-        wrapper = e.get('wrapper', 'unknown')
-        if wrapper not in by_wrapper:
-            by_wrapper[wrapper] = {
-                "scores": [],
-                "topics": [],
-                "durations": []
-            }
-        
-        # Handle None quality_score
-        qs = e.get('quality_score')
-        if qs and isinstance(qs, dict):
-            score = qs.get('total_score')
-            if score is not None:
-                by_wrapper[wrapper]["scores"].append(score)
-        
-        topic = e.get('topic')
-        if topic:
-            by_wrapper[wrapper]["topics"].append(topic)
-        
-        duration = e.get('duration_ms')
-        if duration:
-            by_wrapper[wrapper]["durations"].append(duration)
-    
+    snap = get_snapshot()
+
+    jobs = snap.group_counts("wrapper")
+    scores = snap.group("wrapper", snap.score, snap.has_score)
+    perfect = snap.group("wrapper", (snap.score == 100).astype(float), snap.has_score)
+    durations = snap.group("wrapper", snap.duration, snap.has_duration)
+    top_topics = snap.top_per_group("wrapper", "topic", k=5)
+
     comparison = {}
-    for wrapper, data in by_wrapper.items():
-        scores = data["scores"]
-        durations = data["durations"]
-        
+    for wrapper in jobs:
+        sc = scores.get(wrapper)
+        durs = durations.get(wrapper)
+
         comparison[wrapper] = {
-            "total_jobs": len(scores) if scores else 0,
-            "avg_score": round(sum(scores) / len(scores), 2) if scores else 0,
-            "success_rate": round(len([s for s in scores if s == 100]) / len(scores) * 100, 2) if scores else 0,
-            "avg_duration_ms": round(sum(durations) / len(durations), 2) if durations else 0,
-            "top_topics": dict(Counter(data["topics"]).most_common(5))
+            "total_jobs": sc["count"] if sc else 0,
+            "avg_score": round(sc["mean"], 2) if sc else 0,
+            "success_rate": round(perfect[wrapper]["sum"] / sc["count"] * 100, 2) if sc else 0,
+            "avg_duration_ms": round(durs["mean"], 2) if durs else 0,
+            "top_topics": top_topics.get(wrapper, {})
         }
-    
+
     return {
         "status": "WRAPPER_COMPARISON_AKTIV",
         "wrappers": comparison
@@ -62,49 +42,39 @@ async def compare_all_wrappers():
 @router.get("/wrappers/{wrapper1}/{wrapper2}")
 async def compare_two_wrappers(wrapper1: str, wrapper2: str):
     """Compare two wrappers"""
-    entries = load_field_flow()
-    
-    w1_data = {"scores": [], "durations": []}
-    w2_data = {"scores": [], "durations": []}
-    
-    for e in entries:
-        wrapper = e.get('wrapper', '').lower()
-        
-        # Handle None quality_score
-        qs = e.get('quality_score')
-        score = None
-        if qs and isinstance(qs, dict):
-            score = qs.get('total_score')
-        
-        duration = e.get('duration_ms')
-        
-        if wrapper == wrapper1.lower() and score is not None:
-            w1_data["scores"].append(score)
-            if duration:
-                w1_data["durations"].append(duration)
-        elif wrapper == wrapper2.lower() and score is not None:
-            w2_data["scores"].append(score)
-            if duration:
-                w2_data["durations"].append(duration)
-    
-    if not w1_data["scores"] or not w2_data["scores"]:
+    snap = get_snapshot()
+
+    def stats(wrapper: str):
+        mask = snap.wrapper_mask(wrapper) & snap.has_score
+        scores = snap.score[mask]
+        durations = snap.duration[mask & snap.has_duration]
+        return scores, durations
+
+    w1_scores, w1_durations = stats(wrapper1)
+    if wrapper1.lower() == wrapper2.lower():
+        # Original-Semantik: gleicher Wrapper landet nur im ersten Bucket
+        w2_scores, w2_durations = w1_scores[:0], w1_durations[:0]
+    else:
+        w2_scores, w2_durations = stats(wrapper2)
+
+    if not len(w1_scores) or not len(w2_scores):
         return {"status": "INSUFFICIENT_DATA"}
-    
-    w1_avg = sum(w1_data["scores"]) / len(w1_data["scores"])
-    w2_avg = sum(w2_data["scores"]) / len(w2_data["scores"])
-    
+
+    w1_avg = float(w1_scores.mean())
+    w2_avg = float(w2_scores.mean())
+
     return {
         "status": "WRAPPER_COMPARISON_AKTIV",
         "comparison": {
             wrapper1: {
                 "avg_score": round(w1_avg, 2),
-                "total_jobs": len(w1_data["scores"]),
-                "avg_duration_ms": round(sum(w1_data["durations"]) / len(w1_data["durations"]), 2) if w1_data["durations"] else 0
+                "total_jobs": len(w1_scores),
+                "avg_duration_ms": round(float(w1_durations.mean()), 2) if len(w1_durations) else 0
             },
             wrapper2: {
                 "avg_score": round(w2_avg, 2),
-                "total_jobs": len(w2_data["scores"]),
-                "avg_duration_ms": round(sum(w2_data["durations"]) / len(w2_data["durations"]), 2) if w2_data["durations"] else 0
+                "total_jobs": len(w2_scores),
+                "avg_duration_ms": round(float(w2_durations.mean()), 2) if len(w2_durations) else 0
             },
             "winner": wrapper1 if w1_avg > w2_avg else wrapper2,
             "difference": round(abs(w1_avg - w2_avg), 2)
@@ -7,6 +7,7 @@ from typing import Optional, List, Dict, Any
 from pathlib import Path
 from datetime import datetime
 import json
+import threading
 
 from .format_loader import (
     load_format, list_formats, get_format_summary,
@@ -17,6 +18,10 @@ from .format_loader import (
 
 router = APIRouter(prefix="/formats", tags=["formats"])
 
+# Bulk Re-Scoring läuft im Hintergrund-Thread, Status für GET /rescore/status
+_rescore_lock = threading.Lock()
+_rescore_state: Dict[str, Any] = {"status": "IDLE"}
+
 # ============================================================================
 # PYDANTIC MODELS
 # ============================================================================
@@ -361,3 +366,76 @@ async def clear_format_cache():
         "status": "CACHE_CLEARED",
         "message": "Format-Cache wurde geleert!"
     }
+
+# ============================================================================
+# RE-SCORING - Historische Jobs nach Format-/Scorer-Änderung neu bewerten
+# ============================================================================
+
+def _run_rescore(rescorer) -> None:
+    def progress(stats: dict):
+        with _rescore_lock:
+            _rescore_state["progress"] = stats
+
+    try:
+        stats = rescorer.run(progress=progress)
+        with _rescore_lock:
+            _rescore_state.update(status="COMPLETED", finished_at=datetime.now().isoformat(), progress=stats)
+    except Exception as e:
+        with _rescore_lock:
+            _rescore_state.update(status="FAILED", finished_at=datetime.now().isoformat(), error=str(e))
+
+
+@router.post("/rescore")
+async def start_rescore(
+    scorer: Optional[str] = Query(None, description="v1 | v2 (default: SYNTX_SCORER_V2)"),
+    workers: Optional[int] = Query(None, ge=1, le=32),
+    force: bool = Query(False)
+):
+    """
+    🔁 Alle processed/archive Jobs neu bewerten (Hintergrund)
+
+    Jobs mit aktueller score_version werden übersprungen (außer force=true)
+    → Scorer V2: nach PUT /formats/{name} nur Jobs des geänderten Formats
+    """
+    if scorer not in (None, "v1", "v2"):
+        raise HTTPException(status_code=400, detail="scorer muss 'v1' oder 'v2' sein")
+
+    from utils.job_store import QUEUE_DIR
+    from queue_system.core.rescorer import Rescorer
+    from queue_system.config.queue_config import RESCORE_WORKERS
+
+    with _rescore_lock:
+        if _rescore_state["status"] == "RUNNING":
+            raise HTTPException(status_code=409, detail="Re-Scoring läuft bereits")
+
+        rescorer = Rescorer(
+            queue_base=QUEUE_DIR,
+            use_v2=None if scorer is None else scorer == "v2",
+            workers=workers or RESCORE_WORKERS,
+            force=force
+        )
+        _rescore_state.clear()
+        _rescore_state.update(
+            status="RUNNING",
+            scorer="v2" if rescorer.use_v2 else "v1",
+            workers=rescorer.workers,
+            force=force,
+            started_at=datetime.now().isoformat()
+        )
+
+    threading.Thread(target=_run_rescore, args=(rescorer,), name="syntx-rescore", daemon=True).start()
+
+    return {
+        "status": "RESCORE_STARTED",
+        "message": "Re-Scoring läuft im Hintergrund 🔁",
+        "rescore": dict(_rescore_state)
+    }
+
+
+@router.get("/rescore/status")
+async def rescore_status():
+    """
+    📊 Status des laufenden/letzten Re-Scorings (inkl. responses_per_second)
+    """
+    with _rescore_lock:
+        return dict(_rescore_state)
@@ -4,9 +4,15 @@ Real-time system health tracking
 """
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 from pathlib import Path
 import json
+import sys
 from datetime import datetime, timedelta
+sys.path.append('/opt/syntx-workflow-api-get-prompts/api-core')
+
+from utils.job_store import job_index, queue_counter, metrics_dir
+from syntex_injector.syntex.utils.stage_metrics import load_histograms, summarize, prometheus_text
 
 router = APIRouter(prefix="/monitoring", tags=["monitoring"])
 
@@ -24,17 +30,23 @@ def live_queue_monitor():
     - System health
     """
     
-    # Count queue
-    incoming = list(QUEUE_DIR.glob("incoming/*.txt"))
-    incoming = [f for f in incoming if not f.name.endswith('_response.txt')]
-    processing = list(QUEUE_DIR.glob("processing/*.txt"))
-    processed_jsons = list(QUEUE_DIR.glob("processed/*.json"))
-    errors = list(QUEUE_DIR.glob("error/*.txt"))
+    # Count queue (live counters statt glob über processed/)
+    counter = queue_counter()
+    incoming_count = counter.count("incoming", kind="jobs")
+    processed_count = counter.count("processed", kind="json")
+    error_count = counter.count("error")
+    processing = sorted(
+        QUEUE_DIR / "processing" / name
+        for name in counter.names("processing") if name.endswith('.txt')
+    )
     
     # Get processing details
     processing_details = []
     for p in processing:
-        stat = p.stat()
+        try:
+            stat = p.stat()
+        except FileNotFoundError:
+            continue  # Gerade fertig geworden
         age_seconds = (datetime.now().timestamp() - stat.st_mtime)
         processing_details.append({
             'filename': p.name,
@@ -43,13 +55,11 @@ def live_queue_monitor():
             'status': '⚠️ STUCK' if age_seconds > 300 else '🔵 PROCESSING'
         })
     
-    # Get last 10 completed
+    # Get last 10 completed (Job Index, sortiert nach JSON-mtime)
+    index = job_index()
     recent_completed = []
-    for json_file in sorted(processed_jsons, key=lambda x: x.stat().st_mtime, reverse=True)[:10]:
+    for filename, mtime, data in index.recent("processed", limit=10):
         try:
-            with open(json_file) as f:
-                data = json.load(f)
-            
             result = data.get('syntex_result', {})
             score_data = result.get('quality_score', {})
             if isinstance(score_data, dict):
@@ -57,11 +67,10 @@ def live_queue_monitor():
             else:
                 score = 0
             
-            stat = json_file.stat()
-            completed_at = datetime.fromtimestamp(stat.st_mtime).strftime('%H:%M:%S')
+            completed_at = datetime.fromtimestamp(mtime).strftime('%H:%M:%S')
             
             recent_completed.append({
-                'filename': data.get('filename', json_file.name),
+                'filename': data.get('filename', Path(filename).with_suffix('.json').name),
                 'score': score,
                 'wrapper': result.get('wrapper', 'unknown'),
                 'completed_at': completed_at,
@@ -72,19 +81,15 @@ def live_queue_monitor():
     
     # Calculate processing speed (last hour)
     one_hour_ago = datetime.now() - timedelta(hours=1)
-    recent_processed = [
-        p for p in processed_jsons
-        if datetime.fromtimestamp(p.stat().st_mtime) > one_hour_ago
-    ]
-    jobs_per_hour = len(recent_processed)
+    jobs_per_hour = index.count_since("processed", one_hour_ago.timestamp())
     
     # System health
     health = "🟢 HEALTHY"
     if len(processing) > 5:
         health = "🟡 BUSY"
-    elif len(processing) > 0 and processing_details[0]['age_seconds'] > 300:
+    elif processing_details and processing_details[0]['age_seconds'] > 300:
         health = "🔴 STUCK"
-    elif len(incoming) < 10:
+    elif incoming_count < 10:
         health = "🟡 LOW QUEUE"
     
     return {
@@ -92,22 +97,64 @@ def live_queue_monitor():
         "timestamp": datetime.now().isoformat(),
         "system_health": health,
         "queue": {
-            "incoming": len(incoming),
+            "incoming": incoming_count,
             "processing": len(processing),
-            "processed": len(processed_jsons),
-            "errors": len(errors)
+            "processed": processed_count,
+            "errors": error_count
         },
         "processing_details": processing_details,
         "recent_completed": recent_completed,
         "performance": {
             "jobs_per_hour": jobs_per_hour,
             "avg_time_estimate": "~45s" if jobs_per_hour > 0 else "unknown",
-            "time_to_clear_queue": f"~{round(len(incoming) / (jobs_per_hour or 1), 1)}h" if jobs_per_hour > 0 else "unknown"
+            "time_to_clear_queue": f"~{round(incoming_count / (jobs_per_hour or 1), 1)}h" if jobs_per_hour > 0 else "unknown"
         },
         "insights": [
             f"🔥 Processing speed: {jobs_per_hour} jobs/hour",
             f"💎 Last completed: {recent_completed[0]['rating']} {recent_completed[0]['score']}" if recent_completed else "No recent completions",
-            f"⏱️ Queue will clear in ~{round(len(incoming) / (jobs_per_hour or 1), 1)}h" if jobs_per_hour > 0 else "⚠️ No processing activity"
+            f"⏱️ Queue will clear in ~{round(incoming_count / (jobs_per_hour or 1), 1)}h" if jobs_per_hour > 0 else "⚠️ No processing activity"
         ]
     }
 
+
+@router.get("/stages")
+def stage_latencies():
+    """
+    ⏱️ WHERE DOES THE TIME GO?
+    
+    p50/p95/p99 pro Pipeline-Stufe über alle Consumer-Prozesse:
+    wrapper → http → parse → embedding → score → log_write → file_move
+    (calibrate = Kalibrierung gesamt, job = Job gesamt)
+    """
+    stages = summarize(load_histograms(metrics_dir()))
+    
+    job_total = stages.get("job", {}).get("total_s", 0)
+    breakdown = []
+    if job_total:
+        # embedding steckt in score → nicht doppelt zählen
+        for name in ("wrapper", "http", "parse", "score", "log_write", "file_move"):
+            if name in stages:
+                breakdown.append({
+                    "stage": name,
+                    "share_percent": round(stages[name]["total_s"] / job_total * 100, 1)
+                })
+        breakdown.sort(key=lambda x: x["share_percent"], reverse=True)
+    
+    return {
+        "status": "STAGE_LATENCIES",
+        "timestamp": datetime.now().isoformat(),
+        "stages": stages,
+        "time_share": breakdown,
+        "insights": [
+            f"🐢 Slowest stage: {breakdown[0]['stage']} ({breakdown[0]['share_percent']}% of job time)"
+        ] if breakdown else ["No stage timings recorded yet"]
+    }
+
+
+@router.get("/stages/prometheus", response_class=PlainTextResponse)
+def stage_latencies_prometheus():
+    """Stage-Timings im Prometheus Text Format (Summary mit Quantilen)"""
+    return PlainTextResponse(
+        prometheus_text(load_histograms(metrics_dir())),
+        media_type="text/plain; version=0.0.4"
+    )
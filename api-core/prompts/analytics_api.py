@@ -9,6 +9,8 @@ from typing import Optional, Dict, List
 from collections import defaultdict, Counter
 from datetime import datetime
 
+from utils.job_store import load_all_processed
+
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 QUEUE_DIR = Path("/opt/syntx-workflow-api-get-prompts/queue")
@@ -17,26 +19,7 @@ LOGS_DIR = Path("/opt/syntx-workflow-api-get-prompts/logs")
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
-
-def load_all_processed() -> List[Dict]:
-    """Load all processed prompts - SAFE VERSION"""
-    processed = []
-    processed_dir = QUEUE_DIR / "processed"
-    
-    if not processed_dir.exists():
-        return processed
-    
-    for file in processed_dir.glob("*.json"):
-        try:
-            with open(file) as f:
-                data = json.load(f)
-                if data is not None and isinstance(data, dict):  # SAFE CHECK
-                    processed.append(data)
-        except Exception as e:
-            print(f"⚠️ Error loading {file}: {e}")
-            continue
-    
-    return processed
+# load_all_processed() kommt aus dem Job Index (utils.job_store)
 
 def safe_get_score(prompt: Dict) -> float:
     """Safely extract score from prompt"""
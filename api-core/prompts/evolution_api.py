@@ -10,6 +10,9 @@ from typing import Optional, Dict, List
 from collections import defaultdict, Counter
 import re
 
+from utils.job_store import load_job_entries, load_feature_entries
+from queue_system.core.keyword_features import extract_features, syntx_keywords, is_syntx
+
 router = APIRouter(prefix="/evolution", tags=["evolution"])
 
 QUEUE_DIR = Path("/opt/syntx-workflow-api-get-prompts/queue")
@@ -19,32 +22,16 @@ LOGS_DIR = Path("/opt/syntx-workflow-api-get-prompts/logs")
 # SYNTX vs NORMAL COMPARISON
 # ============================================================================
 
+# Keyword-Listen und Zählung: queue_system/core/keyword_features.py
+# Für gespeicherte Jobs liegen die Counts im Job Index (load_feature_entries)
+
 def is_syntx_prompt(text: str) -> bool:
     """Detect if prompt uses SYNTX terminology"""
-    syntx_keywords = [
-        'resonanzfeld', 'resonanz', 'driftkörper', 'drift',
-        'semantische einheit', 'bedeutungsströme', 'bedeutungsstrom',
-        'feldebene', 'feld', 'kohärenz', 'kalibrierung',
-        'tier-1', 'tier-2', 'tier-3', 'tier-4'
-    ]
-    text_lower = text.lower()
-    return any(keyword in text_lower for keyword in syntx_keywords)
+    return is_syntx(extract_features(text)["counts"])
 
 def extract_syntx_keywords(text: str) -> List[str]:
     """Extract all SYNTX keywords from text"""
-    syntx_keywords = [
-        'resonanzfeld', 'resonanz', 'driftkörper', 'drift',
-        'semantische einheit', 'bedeutungsströme', 'bedeutungsstrom',
-        'feldebene', 'feld', 'kohärenz', 'kalibrierung',
-        'tier-1', 'tier-2', 'tier-3', 'tier-4',
-        'strömung', 'fluss', 'schwingung'
-    ]
-    text_lower = text.lower()
-    found = []
-    for keyword in syntx_keywords:
-        if keyword in text_lower:
-            found.append(keyword)
-    return found
+    return syntx_keywords(extract_features(text)["counts"])
 
 @router.get("/syntx-vs-normal")
 async def compare_syntx_vs_normal():
@@ -53,46 +40,29 @@ async def compare_syntx_vs_normal():
     
     Shows the power of field-based language
     """
-    processed_dir = QUEUE_DIR / "processed"
-    archive_dir = QUEUE_DIR / "archive"
-    
     syntx_prompts = []
     normal_prompts = []
     
-    for search_dir in [processed_dir, archive_dir]:
-        if not search_dir.exists():
-            continue
+    for filename, state, data, features in load_feature_entries(("processed", "archive")):
+        try:
+            counts = features["counts"]
+            score = data.get('syntex_result', {}).get('quality_score', {}).get('total_score', 0)
             
-        for json_file in search_dir.glob("*.json"):
-            try:
-                with open(json_file) as f:
-                    data = json.load(f)
-                
-                # Get prompt text
-                txt_file = json_file.with_suffix('.txt')
-                if not txt_file.exists():
-                    continue
-                
-                with open(txt_file) as f:
-                    prompt_text = f.read()
-                
-                score = data.get('syntex_result', {}).get('quality_score', {}).get('total_score', 0)
-                
-                prompt_data = {
-                    "job_id": data.get('filename', json_file.stem),
-                    "score": score,
-                    "topic": data.get('topic'),
-                    "wrapper": data.get('syntex_result', {}).get('wrapper'),
-                    "keywords": extract_syntx_keywords(prompt_text)
-                }
+            prompt_data = {
+                "job_id": data.get('filename', Path(filename).stem),
+                "score": score,
+                "topic": data.get('topic'),
+                "wrapper": data.get('syntex_result', {}).get('wrapper'),
+                "keywords": syntx_keywords(counts)
+            }
+            
+            if is_syntx(counts):
+                syntx_prompts.append(prompt_data)
+            else:
+                normal_prompts.append(prompt_data)
                 
-                if is_syntx_prompt(prompt_text):
-                    syntx_prompts.append(prompt_data)
-                else:
-                    normal_prompts.append(prompt_data)
-                    
-            except:
-                continue
+        except:
+            continue
     
     # Calculate stats
     syntx_scores = [p['score'] for p in syntx_prompts if p['score'] > 0]
@@ -150,37 +120,20 @@ async def analyze_keyword_power():
     
     Shows which words create resonance
     """
-    processed_dir = QUEUE_DIR / "processed"
-    archive_dir = QUEUE_DIR / "archive"
-    
     keyword_stats = defaultdict(lambda: {"scores": [], "count": 0})
     
-    for search_dir in [processed_dir, archive_dir]:
-        if not search_dir.exists():
-            continue
+    for filename, state, data, features in load_feature_entries(("processed", "archive")):
+        try:
+            score = data.get('syntex_result', {}).get('quality_score', {}).get('total_score', 0)
             
-        for json_file in search_dir.glob("*.json"):
-            try:
-                with open(json_file) as f:
-                    data = json.load(f)
-                
-                txt_file = json_file.with_suffix('.txt')
-                if not txt_file.exists():
-                    continue
-                
-                with open(txt_file) as f:
-                    prompt_text = f.read()
-                
-                score = data.get('syntex_result', {}).get('quality_score', {}).get('total_score', 0)
-                
-                if score > 0:
-                    keywords = extract_syntx_keywords(prompt_text)
-                    for keyword in keywords:
-                        keyword_stats[keyword]["scores"].append(score)
-                        keyword_stats[keyword]["count"] += 1
-                        
-            except:
-                continue
+            if score > 0:
+                keywords = syntx_keywords(features["counts"])
+                for keyword in keywords:
+                    keyword_stats[keyword]["scores"].append(score)
+                    keyword_stats[keyword]["count"] += 1
+                    
+        except:
+            continue
     
     # Calculate power ranking
     keyword_power = []
@@ -289,16 +242,11 @@ async def analyze_wrapper_learning():
     
     Shows which wrapper improves fastest
     """
-    processed_dir = QUEUE_DIR / "processed"
-    
     # Get all prompts sorted by timestamp
     prompts_by_wrapper = defaultdict(list)
     
-    for json_file in sorted(processed_dir.glob("*.json")):
+    for _, _, data in load_job_entries(("processed",)):
         try:
-            with open(json_file) as f:
-                data = json.load(f)
-            
             wrapper = data.get('syntex_result', {}).get('wrapper', 'unknown')
             score = data.get('syntex_result', {}).get('quality_score', {}).get('total_score', 0)
             timestamp = data.get('processed_at', data.get('created_at'))
@@ -361,16 +309,11 @@ async def track_field_evolution():
     
     Shows which fields are getting better recognized
     """
-    processed_dir = QUEUE_DIR / "processed"
-    
     # Track field presence over time
     field_timeline = []
     
-    for json_file in sorted(processed_dir.glob("*.json")):
+    for _, _, data in load_job_entries(("processed",)):
         try:
-            with open(json_file) as f:
-                data = json.load(f)
-            
             breakdown = data.get('syntex_result', {}).get('quality_score', {}).get('detail_breakdown', {})
             timestamp = data.get('processed_at', data.get('created_at'))
             
@@ -435,8 +378,6 @@ async def analyze_topic_resonance():
     
     Shows topic-field harmony
     """
-    processed_dir = QUEUE_DIR / "processed"
-    
     topic_stats = defaultdict(lambda: {
         "syntx_prompts": 0,
         "normal_prompts": 0,
@@ -444,22 +385,12 @@ async def analyze_topic_resonance():
         "normal_scores": []
     })
     
-    for json_file in processed_dir.glob("*.json"):
+    for filename, state, data, features in load_feature_entries(("processed",)):
         try:
-            with open(json_file) as f:
-                data = json.load(f)
-            
             topic = data.get('topic', 'unknown')
             score = data.get('syntex_result', {}).get('quality_score', {}).get('total_score', 0)
             
-            txt_file = json_file.with_suffix('.txt')
-            if not txt_file.exists():
-                continue
-            
-            with open(txt_file) as f:
-                prompt_text = f.read()
-            
-            if is_syntx_prompt(prompt_text):
+            if is_syntx(features["counts"]):
                 topic_stats[topic]["syntx_prompts"] += 1
                 topic_stats[topic]["syntx_scores"].append(score)
             else:
@@ -8,7 +8,9 @@ from pydantic import BaseModel
 from typing import Optional
 import json
 from pathlib import Path
-import re
+
+from utils.job_store import load_all_processed, load_feature_entries
+from queue_system.core.keyword_features import extract_features, advanced_keywords, present_keywords
 
 router = APIRouter(prefix="/prompts/advanced", tags=["prompts-advanced"])
 
@@ -26,49 +28,16 @@ class PredictRequest(BaseModel):
     wrapper: Optional[str] = "syntex_system"
 
 
-# === HELPER: Load all processed for analysis ===
-
-def load_all_processed():
-    """Load all processed jobs with safe error handling"""
-    processed = []
-    
-    for json_file in PROCESSED_DIR.glob("*.json"):
-        try:
-            with open(json_file) as f:
-                data = json.load(f)
-                processed.append(data)
-        except:
-            continue
-    
-    return processed
-
-
 # === HELPER: Extract keywords ===
 
 def extract_keywords(text: str) -> dict:
-    """Extract SYNTX keywords from text"""
-    text_lower = text.lower()
-    
-    keywords = {
-        # TIER keywords
-        'tier': len(re.findall(r'tier-[1234]', text_lower)),
-        
-        # Field keywords
-        'drift': text_lower.count('drift'),
-        'driftkörper': text_lower.count('driftkörper'),
-        'kalibrierung': text_lower.count('kalibrierung'),
-        'strömung': text_lower.count('strömung'),
-        'stromung': text_lower.count('stromung'),
-        'resonanz': text_lower.count('resonanz'),
-        'feld': text_lower.count('feld'),
-        
-        # Meta keywords
-        'system': text_lower.count('system'),
-        'mechanismus': text_lower.count('mechanismus'),
-        'struktur': text_lower.count('struktur'),
-    }
+    """
+    Extract SYNTX keywords from text
     
-    return keywords
+    Ein Aho-Corasick-Durchlauf (queue_system/core/keyword_features.py) -
+    für gespeicherte Jobs liegen die Counts schon im Job Index
+    """
+    return advanced_keywords(extract_features(text)["counts"])
 
 
 # === HELPER: Calculate keyword score ===
@@ -319,25 +288,11 @@ def keyword_combinations():
     This is GOLD for evolution! 💎
     """
     
-    processed = load_all_processed()
-    
     # Track combinations
     combos = {}
     
-    for p in processed:
-        # Get prompt text
-        filename = p.get('filename', '')
-        prompt_file = PROCESSED_DIR / filename
-        
-        if not prompt_file.exists():
-            continue
-            
-        try:
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                prompt_text = f.read().lower()
-        except:
-            continue
-        
+    # Keyword-Counts aus dem Job Index (beim Ingest berechnet)
+    for _, _, p, features in load_feature_entries(("processed",)):
         # Get score
         result = p.get('syntex_result', {})
         if not result:
@@ -350,21 +305,7 @@ def keyword_combinations():
             continue
         
         # Extract keywords present
-        keywords_present = []
-        if 'tier-' in prompt_text:
-            keywords_present.append('tier')
-        if 'driftkörper' in prompt_text or 'driftkorper' in prompt_text:
-            keywords_present.append('driftkörper')
-        if 'drift' in prompt_text and 'driftkörper' not in keywords_present:
-            keywords_present.append('drift')
-        if 'kalibrierung' in prompt_text:
-            keywords_present.append('kalibrierung')
-        if 'strömung' in prompt_text or 'stromung' in prompt_text:
-            keywords_present.append('strömung')
-        if 'resonanz' in prompt_text:
-            keywords_present.append('resonanz')
-        if 'feld' in prompt_text:
-            keywords_present.append('feld')
+        keywords_present = present_keywords(features["counts"])
         
         # Generate all 2-keyword combinations
         for i in range(len(keywords_present)):
@@ -425,11 +366,10 @@ def templates_by_score(min_score: float = 90):
     This is how the system LEARNS! 🧠
     """
     
-    processed = load_all_processed()
-    
     high_scorers = []
     
-    for p in processed:
+    # Keyword-Counts + Länge aus dem Job Index, Prompt-Text nur für die Top 10
+    for filename, _, p, features in load_feature_entries(("processed",)):
         # Get score
         result = p.get('syntex_result', {})
         if not result:
@@ -442,33 +382,20 @@ def templates_by_score(min_score: float = 90):
         if total_score < min_score:
             continue
         
-        # Get prompt text
-        filename = p.get('filename', '')
-        prompt_file = PROCESSED_DIR / filename
-        
-        if not prompt_file.exists():
-            continue
-            
-        try:
-            with open(prompt_file, 'r', encoding='utf-8') as f:
-                prompt_text = f.read()
-        except:
-            continue
-        
         # Extract metadata
+        filename = p.get('filename', filename)
         topic = filename.split('__topic_')[1].split('__')[0] if '__topic_' in filename else 'unknown'
         style = filename.split('__style_')[1].split('.')[0] if '__style_' in filename else 'unknown'
         
         # Extract keywords
-        keywords = extract_keywords(prompt_text)
+        keywords = advanced_keywords(features["counts"])
         
         high_scorers.append({
             'filename': filename,
             'score': total_score,
             'topic': topic,
             'style': style,
-            'length': len(prompt_text),
-            'prompt_preview': prompt_text[:300] + '...' if len(prompt_text) > 300 else prompt_text,
+            'length': features["length"],
             'keywords': {k: v for k, v in keywords.items() if v > 0},
             'total_keywords': sum(keywords.values()),
             'field_breakdown': score_data.get('detail_breakdown', {})
@@ -477,6 +404,15 @@ def templates_by_score(min_score: float = 90):
     # Sort by score
     high_scorers.sort(key=lambda x: x['score'], reverse=True)
     
+    # Preview nur für die ausgelieferten Templates lesen
+    for h in high_scorers[:10]:
+        try:
+            with open(PROCESSED_DIR / h['filename'], 'r', encoding='utf-8') as f:
+                prompt_text = f.read(301)
+        except OSError:
+            prompt_text = ""
+        h['prompt_preview'] = prompt_text[:300] + '...' if len(prompt_text) > 300 else prompt_text
+    
     # Extract patterns
     if high_scorers:
         avg_length = sum(h['length'] for h in high_scorers) / len(high_scorers)
@@ -3,12 +3,17 @@ SYNTX Prompts API
 Clean flows. No patches. Field-based thinking.
 """
 from fastapi import APIRouter, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from pathlib import Path
+import base64
 import json
 from typing import Optional, Dict, List
 from datetime import datetime
 from collections import defaultdict, Counter
 
+from utils.job_store import load_all_processed, job_index, blob_store, search_index
+from syntex_injector.syntex.utils.blob_store import resolve_text
+
 router = APIRouter(prefix="/prompts", tags=["prompts"])
 
 QUEUE_DIR = Path("/opt/syntx-workflow-api-get-prompts/queue")
@@ -17,25 +22,7 @@ LOGS_DIR = Path("/opt/syntx-workflow-api-get-prompts/logs")
 # ============================================================================
 # CORE HELPERS - THE FOUNDATION
 # ============================================================================
-
-def load_all_processed() -> List[Dict]:
-    """Load all processed prompts - SAFE"""
-    processed = []
-    processed_dir = QUEUE_DIR / "processed"
-    
-    if not processed_dir.exists():
-        return processed
-    
-    for file in processed_dir.glob("*.json"):
-        try:
-            with open(file) as f:
-                data = json.load(f)
-                if data and isinstance(data, dict):
-                    processed.append(data)
-        except:
-            continue
-    
-    return processed
+# load_all_processed() kommt aus dem Job Index (utils.job_store)
 
 def safe_get_score(prompt: dict) -> float:
     """Extract score - SAFE"""
@@ -102,20 +89,22 @@ async def get_all_prompts(limit: int = Query(100, le=500)):
 
 @router.get("/by-job/{job_id}")
 async def get_by_job(job_id: str):
-    """Get specific job by ID"""
-    processed = load_all_processed()
-    
-    # Sort by timestamp (newest first)
-    processed.sort(key=lambda x: x.get("processed_at", ""), reverse=True)
+    """
+    Get specific job by ID
     
-    for p in processed:
-        if job_id in str(p.get('filename', '')):
-            return {
-                "status": "JOB_FOUND",
-                "data": p
-            }
+    job_id: Filename, Prefix oder Timestamp - processed/ und archive/
+    (Job Index Lookup statt Full Scan)
+    """
+    found = job_index().lookup(job_id)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    raise HTTPException(status_code=404, detail="Job not found")
+    _, state, p = found
+    return {
+        "status": "JOB_FOUND",
+        "state": state,
+        "data": p
+    }
 
 @router.get("/best")
 async def get_best_prompts(limit: int = Query(20, le=100)):
@@ -211,32 +200,61 @@ async def total_costs():
     }
 
 @router.get("/search")
-async def search_prompts(q: str = Query(..., min_length=2)):
-    """Search in prompts"""
-    processed = load_all_processed()
+def search_prompts(
+    q: str = Query(..., min_length=2),
+    page: int = Query(1, ge=1, description="Page number (1-based)"),
+    page_size: int = Query(20, ge=1, le=100, description="Results per page"),
+    scope: str = Query("all", description="processed | archive | all"),
+    language: Optional[str] = Query(None, description="Filter by language (de, en, ru, ...)")
+):
+    """
+    🔎 SEARCH - Volltext über Topic/Style/Category, Prompt und Response
     
-    # Sort by timestamp (newest first)
-    processed.sort(key=lambda x: x.get("processed_at", ""), reverse=True)
+    - Umlaute/Akzente egal: "stromung" findet "Strömung", "strasse" findet "Straße"
+    - Alle Wörter müssen vorkommen, letztes Wort als Prefix ("drif" → "drift")
+    - "in Anführungszeichen" → Phrase
+    - Ranking per BM25 (Topic-Treffer zählen mehr), processed/ + archive/
+    - Plain def → läuft im Threadpool; Index wird im Hintergrund aktuell gehalten
+    """
+    states = {"processed": ("processed",), "archive": ("archive",), "all": ("processed", "archive")}.get(scope)
+    if states is None:
+        raise HTTPException(status_code=400, detail="scope must be processed, archive or all")
     
-    q_lower = q.lower()
-    results = []
+    total, hits = search_index().search(
+        q, states=states, language=language,
+        limit=page_size, offset=(page - 1) * page_size,
+        sync=False
+    )
     
-    for p in processed:
-        # Search in topic, style, category
-        searchable = f"{p.get('topic', '')} {p.get('style', '')} {p.get('category', '')}".lower()
-        if q_lower in searchable:
-            results.append({
-                "id": p.get('filename', 'unknown'),
-                "topic": p.get('topic', 'unknown'),
-                "style": p.get('style', 'unknown'),
-                "score": safe_get_score(p),
-                "match": "metadata"
-            })
+    index = job_index()
+    results = []
+    for hit in hits:
+        found = index.get(hit['filename'], full=False)
+        p = found[2] if found else {}
+        results.append({
+            "id": p.get('filename', hit['filename']),
+            "topic": p.get('topic', 'unknown'),
+            "style": p.get('style', 'unknown'),
+            "score": safe_get_score(p),
+            "match": hit['matched_in'][0] if hit['matched_in'] else "metadata",
+            "matched_in": hit['matched_in'],
+            "snippets": hit['snippets'],
+            "rank": hit['rank'],
+            "state": hit['state'],
+            "language": hit['language']
+        })
     
     return {
         "status": "SEARCH_COMPLETE",
         "query": q,
-        "total_results": len(results),
+        "total_results": total,
+        "pagination": {
+            "page": page,
+            "page_size": page_size,
+            "total_pages": (total + page_size - 1) // page_size,
+            "has_next": page * page_size < total,
+            "has_prev": page > 1
+        },
         "results": results
     }
 
@@ -326,23 +344,19 @@ async def get_full_prompt_text(filename: str):
     Use Case: User clicks row in table → loads details
     """
     
-    # Find metadata file
-    processed_file = QUEUE_DIR / "processed" / filename
-    if not processed_file.exists() and not filename.endswith('.json'):
-        processed_file = QUEUE_DIR / "processed" / f"{filename}.json"
-    
-    if not processed_file.exists():
+    # Find job (Job Index: processed/ + archive/, exakt oder Prefix)
+    found = job_index().lookup(filename)
+    if found is None:
         raise HTTPException(status_code=404, detail=f"File not found: {filename}")
     
-    # Load metadata
-    with open(processed_file) as f:
-        data = json.load(f)
+    indexed_filename, state, data = found
+    job_dir = QUEUE_DIR / state
     
     # Load prompt text file
     prompt_text = ""
-    txt_filename = data.get('filename', '')
+    txt_filename = data.get('filename', indexed_filename)
     if txt_filename:
-        prompt_file = QUEUE_DIR / "processed" / txt_filename
+        prompt_file = job_dir / txt_filename
         if prompt_file.exists():
             try:
                 with open(prompt_file) as f:
@@ -356,7 +370,8 @@ async def get_full_prompt_text(filename: str):
     response_text = "[Response not stored in metadata]"
     result = data.get('syntex_result')
     if result and isinstance(result, dict):
-        response_text = result.get('response_text', response_text)
+        # Inline (response_text) oder Blob-Referenz (response_text_ref)
+        response_text = resolve_text(result, 'response_text', blob_store()) or response_text
     
     return {
         "status": "FULL_TEXT_LOADED",
@@ -385,60 +400,109 @@ async def get_full_prompt_text(filename: str):
 # COMPLETE EXPORT - ALLES MIT VOLLTEXT + PAGINATION
 # ============================================================================
 
-def load_all_calibrations() -> Dict[str, Dict]:
-    """Load all calibrations and index by timestamp for matching"""
-    calibrations_file = LOGS_DIR / "syntex_calibrations.jsonl"
-    calibrations = []
+def _read_text(path: Path) -> Optional[str]:
+    """Liest eine Textdatei - None wenn nicht vorhanden/lesbar"""
+    try:
+        with open(path) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def build_export_item(filename: str, p: dict) -> dict:
+    """
+    Ein Export-Eintrag inkl. Volltext (Prompt + Response)
     
-    if not calibrations_file.exists():
-        return {}
+    filename: .txt Name aus dem Job Index (Dateien liegen in processed/)
+    """
+    # Load prompt text
+    prompt_text = ""
+    txt_filename = filename
+    if txt_filename:
+        try:
+            prompt_text = _read_text(QUEUE_DIR / "processed" / txt_filename) or ""
+        except:
+            prompt_text = "[Error reading prompt]"
     
-    try:
-        with open(calibrations_file, 'r') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    if entry.get('response') and entry.get('timestamp'):
-                        calibrations.append(entry)
-                except:
-                    continue
-    except:
-        pass
+    # Get response from _response.txt file (new format) or JSON (backfilled)
+    response_text = '[Response not available]'
     
-    return calibrations
-
-def find_response_by_timestamp(processed_timestamp: str, calibrations: list) -> str:
-    """Find calibration response by nearest timestamp match"""
-    if not processed_timestamp or not calibrations:
-        return "[No response available]"
+    # Try 1: Load from _response.txt file (NEW FORMAT)
+    if txt_filename:
+        try:
+            stored = _read_text(QUEUE_DIR / "processed" / txt_filename.replace('.txt', '_response.txt'))
+            if stored is not None:
+                response_text = stored
+        except:
+            pass
     
-    try:
-        # Parse processed timestamp (format: 2025-12-06T00:26:05.595595)
-        proc_dt = datetime.fromisoformat(processed_timestamp.replace('Z', '+00:00'))
+    # Try 2: Fallback to JSON (BACKFILLED DATA)
+    if response_text == '[Response not available]':
+        result = p.get('syntex_result')
+        if result and isinstance(result, dict):
+            response_text = resolve_text(result, 'response_text', blob_store()) or '[Response not stored]'
+    # Kein Fallback über den nächstgelegenen Timestamp im Calibration Log -
+    # bei parallelen Workern wäre das die Response eines anderen Jobs
+    
+    # Get fields
+    fields = safe_get_fields(p)
+    
+    # Get result safely
+    result = p.get('syntex_result')
+    if not result or not isinstance(result, dict):
+        result = {}
+    
+    # Build export item
+    return {
+        "id": p.get('filename', 'unknown'),
+        "timestamp": p.get('processed_at', ''),
         
-        # Find nearest calibration by time
-        best_match = None
-        min_diff = float('inf')
+        # Prompt Data
+        "prompt": {
+            "text": prompt_text,
+            "topic": p.get('topic', 'unknown'),
+            "style": p.get('style', 'unknown'),
+            "category": p.get('category', 'unknown'),
+            "language": p.get('language', 'de')
+        },
         
-        for cal in calibrations:
-            try:
-                # Parse calibration timestamp (format: 2025-12-10T00:19:55.093607Z)
-                cal_dt = datetime.fromisoformat(cal['timestamp'].replace('Z', '+00:00'))
-                diff = abs((proc_dt - cal_dt).total_seconds())
-                
-                # Only match if within 5 minutes (300 seconds)
-                if diff < min_diff and diff < 300:
-                    min_diff = diff
-                    best_match = cal
-            except:
-                continue
+        # Response Data
+        "response": {
+            "text": response_text,
+            "wrapper": result.get('wrapper', 'unknown'),
+            "duration_ms": result.get('duration_ms', 0)
+        },
         
-        if best_match:
-            return best_match.get('response', '[Response found but empty]')
+        # Quality Assessment
+        "quality": {
+            "total_score": safe_get_score(p),
+            "fields_fulfilled": [k for k, v in fields.items() if v],
+            "fields_missing": [k for k, v in fields.items() if not v],
+            "field_breakdown": fields,
+            "completion_rate": f"{len([v for v in fields.values() if v])}/{len(fields) if fields else 6}"
+        },
         
-        return "[No matching response found]"
-    except Exception as e:
-        return f"[Error matching: {e}]"
+        # GPT Metadata
+        "gpt_metadata": {
+            "quality_assessment": p.get('gpt_quality', {}),
+            "cost": p.get('gpt_cost', {})
+        }
+    }
+
+
+def encode_cursor(sort_key) -> str:
+    """Sort-Key (processed_at, filename) → opaker URL-sicherer Cursor"""
+    return base64.urlsafe_b64encode(json.dumps(list(sort_key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Cursor → (processed_at, filename), HTTP 400 bei Müll"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        processed_at, filename = json.loads(base64.urlsafe_b64decode(padded))
+        return str(processed_at), str(filename)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 
 @router.get("/complete-export")
@@ -454,7 +518,7 @@ async def complete_export(
     
     Returns:
     - Full prompt text (from .txt files)
-    - Full response text (from syntex_calibrations.jsonl)
+    - Full response text (from _response.txt or the job JSON)
     - All SYNTEX fields breakdown
     - All quality scores
     - All metadata
@@ -463,38 +527,21 @@ async def complete_export(
     - page: Which page (1, 2, 3, ...)
     - page_size: Items per page (max 200)
     
+    Filter, Sortierung und Seite laufen im Job Index (SQLite),
+    Volltexte werden nur für die Items der Seite gelesen.
+    Für komplette Exporte: /prompts/complete-export/stream
+    
     Example:
     - /prompts/complete-export?page=1&page_size=50
     - /prompts/complete-export?page=2&page_size=50&min_score=80
     """
+    index = job_index()
     
-    # Load all data
-    processed = load_all_processed()
-    
-    # Sort by timestamp (newest first)
-    processed.sort(key=lambda x: x.get("processed_at", ""), reverse=True)
-    
-    if not processed:
+    if not index.count("processed"):
         return {"status": "NO_DATA"}
     
-    # Filters
-    if min_score > 0:
-        processed = [p for p in processed if safe_get_score(p) >= min_score]
-    
-    if topic:
-        processed = [p for p in processed if p.get('topic', '').lower() == topic.lower()]
-    
-    if wrapper:
-        filtered = []
-        for p in processed:
-            result = p.get('syntex_result')
-            if result and isinstance(result, dict):
-                if result.get('wrapper', '').lower() == wrapper.lower():
-                    filtered.append(p)
-        processed = filtered
-    
     # Calculate pagination
-    total_items = len(processed)
+    total_items = index.count_matching("processed", min_score, topic, wrapper)
     total_pages = (total_items + page_size - 1) // page_size  # Ceiling division
     
     # Validate page
@@ -506,93 +553,14 @@ async def complete_export(
             "total_items": total_items
         }
     
-    # Get page slice
-    start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
-    page_items = processed[start_idx:end_idx]
-    
-    # Build complete export
-    exports = []
-    
-    for p in page_items:
-        # Load prompt text
-        prompt_text = ""
-        txt_filename = p.get('filename', '')
-        if txt_filename:
-            prompt_file = QUEUE_DIR / "processed" / txt_filename
-            if prompt_file.exists():
-                try:
-                    with open(prompt_file) as f:
-                        prompt_text = f.read()
-                except:
-                    prompt_text = "[Error reading prompt]"
-        
-        # Get response from _response.txt file (new format) or JSON (backfilled)
-        response_text = '[Response not available]'
-        
-        # Try 1: Load from _response.txt file (NEW FORMAT)
-        txt_filename = p.get('filename', '')
-        if txt_filename:
-            response_file = QUEUE_DIR / "processed" / txt_filename.replace('.txt', '_response.txt')
-            if response_file.exists():
-                try:
-                    with open(response_file) as f:
-                        response_text = f.read()
-                except:
-                    pass
-        
-        # Try 2: Fallback to JSON (BACKFILLED DATA)
-        if response_text == '[Response not available]':
-            result = p.get('syntex_result')
-            if result and isinstance(result, dict):
-                response_text = result.get('response_text', '[Response not stored]')
-        
-        # Get fields
-        fields = safe_get_fields(p)
-        
-        # Get result safely
-        result = p.get('syntex_result')
-        if not result or not isinstance(result, dict):
-            result = {}
-        
-        # Build export item
-        export_item = {
-            "id": p.get('filename', 'unknown'),
-            "timestamp": p.get('processed_at', ''),
-            
-            # Prompt Data
-            "prompt": {
-                "text": prompt_text,
-                "topic": p.get('topic', 'unknown'),
-                "style": p.get('style', 'unknown'),
-                "category": p.get('category', 'unknown'),
-                "language": p.get('language', 'de')
-            },
-            
-            # Response Data
-            "response": {
-                "text": response_text,
-                "wrapper": result.get('wrapper', 'unknown'),
-                "duration_ms": result.get('duration_ms', 0)
-            },
-            
-            # Quality Assessment
-            "quality": {
-                "total_score": safe_get_score(p),
-                "fields_fulfilled": [k for k, v in fields.items() if v],
-                "fields_missing": [k for k, v in fields.items() if not v],
-                "field_breakdown": fields,
-                "completion_rate": f"{len([v for v in fields.values() if v])}/{len(fields) if fields else 6}"
-            },
-            
-            # GPT Metadata
-            "gpt_metadata": {
-                "quality_assessment": p.get('gpt_quality', {}),
-                "cost": p.get('gpt_cost', {})
-            }
-        }
-        
-        exports.append(export_item)
+    # Build complete export (nur die Seite, sortiert: neueste zuerst)
+    exports = [
+        build_export_item(filename, p)
+        for filename, _, p in index.iter_sorted(
+            "processed", min_score, topic, wrapper,
+            limit=page_size, offset=(page - 1) * page_size, full=True
+        )
+    ]
     
     return {
         "status": "COMPLETE_EXPORT",
@@ -612,3 +580,56 @@ async def complete_export(
         "exports": exports
     }
 
+
+@router.get("/complete-export/stream")
+def complete_export_stream(
+    cursor: Optional[str] = Query(None, description="Cursor aus der letzten Zeile (next_cursor)"),
+    limit: Optional[int] = Query(None, ge=1, description="Max Items (leer = alles)"),
+    min_score: float = Query(0, description="Minimum score filter"),
+    topic: Optional[str] = Query(None, description="Filter by topic"),
+    wrapper: Optional[str] = Query(None, description="Filter by wrapper")
+):
+    """
+    🌊 STREAMING EXPORT - NDJSON, Cursor-Pagination, konstanter Speicher
+    
+    Eine JSON-Zeile pro Job (gleiches Format wie exports[] in
+    /complete-export), sortiert neueste zuerst. Prompt- und Response-Text
+    werden erst gelesen wenn der Client die Zeile abholt.
+    
+    Letzte Zeile:
+        {"status": "END", "count": 1000, "next_cursor": "..." | null}
+    next_cursor != null → mit ?cursor=... weitermachen
+    
+    Example:
+    - curl -N /prompts/complete-export/stream > export.ndjson
+    - /prompts/complete-export/stream?limit=500&cursor=WyIyMDI1LTEy...
+    """
+    after = decode_cursor(cursor) if cursor else None
+    index = job_index()
+    
+    def generate():
+        count = 0
+        last_key = None
+        # limit + 1 holen → wissen ob es weitergeht ohne COUNT(*)
+        rows = index.iter_sorted(
+            "processed", min_score, topic, wrapper,
+            after=after, limit=limit + 1 if limit else None, full=True
+        )
+        has_more = False
+        for filename, sort_key, p in rows:
+            if limit and count >= limit:
+                has_more = True
+                break
+            yield json.dumps(build_export_item(filename, p), ensure_ascii=False) + "\n"
+            count += 1
+            last_key = sort_key
+        rows.close()
+        
+        yield json.dumps({
+            "status": "END",
+            "count": count,
+            "next_cursor": encode_cursor(last_key) if has_more and last_key else None
+        }) + "\n"
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
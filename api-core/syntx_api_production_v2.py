@@ -4,8 +4,10 @@ Advanced Analytics, Predictions, Performance
 """
 from strom_router import router as strom_router
 from feld_router import router as feld_router
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Query, Path
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from typing import Optional, List, Dict, Any
 import json
 from pathlib import Path as FilePath
@@ -16,6 +18,7 @@ import sys
 sys.path.append('/opt/syntx-workflow-api-get-prompts/api-core')
 
 from utils.log_loader import load_field_flow, load_evolution, get_queue_counts, QUEUE_DIR
+from utils.metrics import MetricsMiddleware, get_metrics_registry, CONTENT_TYPE as METRICS_CONTENT_TYPE
 
 # Import all routers
 from analytics.dashboard import router as analytics_dashboard_router
@@ -31,7 +34,16 @@ from prompts.evolution_api import router as evolution_router
 from prompts.analytics_api import router as analytics_new_router
 from formats.formats_api import router as formats_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Queue/Index/Consumer-Metriken im Hintergrund sammeln"""
+    registry = get_metrics_registry()
+    registry.start()
+    yield
+    registry.stop()
+
 app = FastAPI(
+    lifespan=lifespan,
     title="SYNTX PRODUCTION API",
     description="Feld-basierte API · Analytics · Predictions · Performance · Comparisons",
     version="2.1.0"
@@ -45,6 +57,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request-Latenz pro Route → /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(analytics_dashboard_router)
 app.include_router(analytics_success_router)
@@ -204,6 +219,11 @@ async def get_evolution_progress():
         "trend": "STEIGEND" if improvement > 0 else "STABIL" if improvement == 0 else "FALLEND"
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus Scrape-Endpoint - rendert nur aus dem Speicher"""
+    return PlainTextResponse(get_metrics_registry().render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health_check():
     """System Health"""
@@ -228,7 +248,8 @@ async def root():
             "resonanz": "/resonanz/*",
             "generation": "/generation/*",
             "analytics": "/analytics/* (dashboard, success-rate, trends, performance, correlation, outliers)",
-            "compare": "/compare/*"
+            "compare": "/compare/*",
+            "metrics": "/metrics (Prometheus)"
         },
         "docs": "/docs"
     }
@@ -6,9 +6,14 @@ from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional, List
 import json
+import sys
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from syntex_injector.syntex.utils.jsonl_reader import get_jsonl_reader
+from syntex_injector.syntex.utils.segmented_log import get_segmented_log, segmented_dir
+
 # SYNTX APP FELD
 app = FastAPI(
     title="SYNTX FELDER API",
@@ -204,15 +209,10 @@ class QueueStromMonitor:
         self.analysis_log = self.batch_path / "logs/syntex_calibrations.jsonl"
         
     def _count_entries(self, file_path):
-        """Zähle Einträge in JSONL"""
+        """Zähle Einträge in JSONL (nicht-leere Zeilen aus dem Offset-Index)"""
         if not file_path.exists():
             return 0
-        count = 0
-        with open(file_path, 'r') as f:
-            for line in f:
-                if line.strip():
-                    count += 1
-        return count
+        return get_jsonl_reader(file_path).count()
     
     def get_queue_status(self):
         """Zeigt aktuellen Queue-Status"""
@@ -232,20 +232,30 @@ class QueueStromMonitor:
         """Zeigt Processing History"""
         verlauf = []
         
-        if self.analysis_log.exists():
-            with open(self.analysis_log, 'r') as f:
-                lines = f.readlines()
-                for line in lines[-limit:]:
-                    try:
-                        entry = json.loads(line)
-                        verlauf.append({
-                            "timestamp": entry.get('timestamp', 'UNKNOWN'),
-                            "topic": entry.get('topic', 'UNKNOWN'),
-                            "quality_score": entry.get('quality_score', 0),
-                            "status": "VERARBEITET"
-                        })
-                    except:
-                        continue
+        # Segmented Log (SYNTX_LOG_SEGMENTED) → aktives Segment + nur nötige Segmente
+        segments = segmented_dir(self.analysis_log)
+        if segments.is_dir():
+            entries = get_segmented_log(segments).tail(limit)
+            if len(entries) < limit and self.analysis_log.exists():
+                # Umstellung auf Segmente: ältere Einträge liegen noch in der JSONL
+                # (gleicher Fallback wie CalibrationLogger.get_last_calibrations)
+                entries = (get_jsonl_reader(self.analysis_log).tail(limit - len(entries)) + entries)[-limit:]
+        elif self.analysis_log.exists():
+            # Nur die letzten limit Zeilen lesen (Offset-Index statt readlines)
+            entries = get_jsonl_reader(self.analysis_log).tail(limit)
+        else:
+            entries = []
+        
+        for entry in entries:
+            try:
+                verlauf.append({
+                    "timestamp": entry.get('timestamp', 'UNKNOWN'),
+                    "topic": entry.get('topic', 'UNKNOWN'),
+                    "quality_score": entry.get('quality_score', 0),
+                    "status": "VERARBEITET"
+                })
+            except:
+                continue
         
         return {
             "verlauf_strom": verlauf,
@@ -0,0 +1,319 @@
+"""
+SYNTX Analytics Snapshot - Spaltenbasierter In-Memory Cache
+
+Alle Analytics-Router brauchen dieselben paar Werte pro Job
+(score, duration, timestamp, wrapper, topic). Statt pro Request
+über Python-Dicts zu loopen hält der Snapshot sie als NumPy-Arrays:
+
+    score[i], duration[i], timestamp[i], hour[i]
+    wrapper[i] / topic[i]  → Kategorie-Codes (int32) + Label-Liste
+
+Aufbau einmal pro Prozess, danach nur Deltas aus dem Job Index
+(JobIndex.changes_since). Group-Bys laufen über np.bincount.
+"""
+
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from utils.job_store import job_index
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value) if value is not None else np.nan
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _extract_row(filename: str, data: Dict) -> Dict:
+    """Eine Job-Metadaten-Dict → Spaltenwerte (Semantik wie load_field_flow)"""
+    result = data.get('syntex_result')
+    if not isinstance(result, dict):
+        result = {}
+
+    quality = result.get('quality_score')
+    has_quality = bool(quality) and isinstance(quality, dict)
+    score = _to_float(quality.get('total_score')) if has_quality else np.nan
+
+    timestamp = data.get('processed_at', data.get('created_at'))
+    epoch, hour = np.nan, -1
+    if timestamp:
+        try:
+            dt = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+            epoch, hour = dt.timestamp(), dt.hour
+        except (ValueError, AttributeError):
+            pass
+
+    return {
+        "job_id": data.get('filename', filename[:-4] if filename.endswith('.txt') else filename),
+        "score": score,
+        "has_quality": has_quality,
+        "duration": _to_float(result.get('duration_ms')),
+        "timestamp": epoch,
+        "hour": hour,
+        "wrapper": result.get('wrapper') or 'unknown',
+        "topic": data.get('topic') or 'unknown',
+    }
+
+
+class _Categories:
+    """Label ↔ Code Mapping (Codes bleiben stabil solange der Snapshot lebt)"""
+
+    def __init__(self):
+        self.labels: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = len(self.labels)
+            self._codes[label] = code
+            self.labels.append(label)
+        return code
+
+    def codes_matching_lower(self, label: str) -> np.ndarray:
+        """Alle Codes deren Label case-insensitiv gleich ist"""
+        wanted = label.lower()
+        return np.array([c for c, l in enumerate(self.labels) if l.lower() == wanted], dtype=np.int32)
+
+
+class AnalyticsSnapshot:
+    """
+    Prozessweiter Spalten-Cache über alle processed Jobs
+
+    Reihenfolge der Zeilen = Filename-Reihenfolge (wie load_field_flow),
+    Trends/Outlier-Indizes bleiben damit identisch.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.seq = -1
+        self.job_ids: List[str] = []
+        self.filenames: List[str] = []
+        self._position: Dict[str, int] = {}
+        self.score = np.empty(0, dtype=np.float64)
+        self.duration = np.empty(0, dtype=np.float64)
+        self.timestamp = np.empty(0, dtype=np.float64)
+        self.hour = np.empty(0, dtype=np.int8)
+        self.has_quality = np.empty(0, dtype=bool)
+        self.wrapper = np.empty(0, dtype=np.int32)
+        self.topic = np.empty(0, dtype=np.int32)
+        self.wrappers = _Categories()
+        self.topics = _Categories()
+
+    # ========================================================================
+    # REFRESH
+    # ========================================================================
+
+    def refresh(self) -> "AnalyticsSnapshot":
+        """Holt alle Änderungen seit dem letzten Refresh aus dem Job Index"""
+        index = job_index()
+        index.sync("processed")
+
+        with self._lock:
+            current_seq, delete_seq, rows = index.changes_since(self.seq)
+            if self.seq >= 0 and delete_seq > self.seq:
+                # Jobs verschwunden/archiviert → komplett neu aufbauen
+                self._reset()
+                current_seq, delete_seq, rows = index.changes_since(self.seq)
+
+            if rows:
+                self._apply(rows)
+            self.seq = max(self.seq, current_seq)
+        return self
+
+    def _apply(self, rows: List[Tuple[str, str, Dict]]):
+        """Upsert der geänderten Zeilen, neue Jobs werden angehängt"""
+        new_rows = []
+        for filename, state, data in rows:
+            if state != "processed":
+                continue
+            values = _extract_row(filename, data)
+            position = self._position.get(filename)
+            if position is None:
+                new_rows.append((filename, values))
+                continue
+            # Update in place (z.B. Re-Scoring)
+            self.job_ids[position] = values["job_id"]
+            self.score[position] = values["score"]
+            self.duration[position] = values["duration"]
+            self.timestamp[position] = values["timestamp"]
+            self.hour[position] = values["hour"]
+            self.has_quality[position] = values["has_quality"]
+            self.wrapper[position] = self.wrappers.code(values["wrapper"])
+            self.topic[position] = self.topics.code(values["topic"])
+
+        if not new_rows:
+            return
+
+        needs_sort = bool(self.filenames) and new_rows[0][0] < self.filenames[-1]
+        offset = len(self.filenames)
+        for i, (filename, values) in enumerate(new_rows):
+            self._position[filename] = offset + i
+            self.filenames.append(filename)
+            self.job_ids.append(values["job_id"])
+
+        self.score = np.concatenate([self.score, [v["score"] for _, v in new_rows]])
+        self.duration = np.concatenate([self.duration, [v["duration"] for _, v in new_rows]])
+        self.timestamp = np.concatenate([self.timestamp, [v["timestamp"] for _, v in new_rows]])
+        self.hour = np.concatenate([self.hour, np.array([v["hour"] for _, v in new_rows], dtype=np.int8)])
+        self.has_quality = np.concatenate([self.has_quality, np.array([v["has_quality"] for _, v in new_rows], dtype=bool)])
+        self.wrapper = np.concatenate([self.wrapper, np.array([self.wrappers.code(v["wrapper"]) for _, v in new_rows], dtype=np.int32)])
+        self.topic = np.concatenate([self.topic, np.array([self.topics.code(v["topic"]) for _, v in new_rows], dtype=np.int32)])
+
+        if needs_sort:
+            self._sort()
+
+    def _sort(self):
+        """Stellt Filename-Reihenfolge wieder her (selten: Job mit älterem Namen nachgeliefert)"""
+        order = np.argsort(np.array(self.filenames, dtype=object), kind="stable")
+        self.filenames = [self.filenames[i] for i in order]
+        self.job_ids = [self.job_ids[i] for i in order]
+        self._position = {name: i for i, name in enumerate(self.filenames)}
+        for column in ("score", "duration", "timestamp", "hour", "has_quality", "wrapper", "topic"):
+            setattr(self, column, getattr(self, column)[order])
+
+    # ========================================================================
+    # MASKS + GROUP-BY
+    # ========================================================================
+
+    def __len__(self) -> int:
+        return len(self.filenames)
+
+    @property
+    def has_score(self) -> np.ndarray:
+        """total_score vorhanden (entspricht `score is not None`)"""
+        return ~np.isnan(self.score)
+
+    @property
+    def has_duration(self) -> np.ndarray:
+        """duration_ms truthy (entspricht `if duration:`)"""
+        return ~np.isnan(self.duration) & (self.duration != 0)
+
+    def wrapper_mask(self, wrapper: str) -> np.ndarray:
+        """Case-insensitiver Wrapper-Filter"""
+        return np.isin(self.wrapper, self.wrappers.codes_matching_lower(wrapper))
+
+    def topic_mask(self, topic: str) -> np.ndarray:
+        """Case-insensitiver Topic-Filter"""
+        return np.isin(self.topic, self.topics.codes_matching_lower(topic))
+
+    def group(self, by: str, values: np.ndarray, mask: Optional[np.ndarray] = None) -> Dict[str, Dict[str, float]]:
+        """
+        Vektorisierter Group-By
+
+        Args:
+            by: "wrapper" | "topic"
+            values: Spalte (z.B. self.score)
+            mask: Welche Zeilen zählen
+
+        Returns:
+            {label: {"count", "sum", "mean", "min", "max"}} - nur Gruppen mit count > 0
+        """
+        codes = getattr(self, by)
+        labels = getattr(self, by + "s").labels
+        if mask is not None:
+            codes, values = codes[mask], values[mask]
+
+        n = len(labels)
+        counts = np.bincount(codes, minlength=n)
+        sums = np.bincount(codes, weights=values, minlength=n)
+        mins = np.full(n, np.inf)
+        maxs = np.full(n, -np.inf)
+        np.minimum.at(mins, codes, values)
+        np.maximum.at(maxs, codes, values)
+
+        return {
+            labels[c]: {
+                "count": int(counts[c]),
+                "sum": float(sums[c]),
+                "mean": float(sums[c] / counts[c]),
+                "min": float(mins[c]),
+                "max": float(maxs[c]),
+            }
+            for c in np.nonzero(counts)[0]
+        }
+
+    def group_counts(self, by: str, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        """Anzahl Zeilen pro Label (in Reihenfolge des ersten Auftretens)"""
+        codes = getattr(self, by)
+        labels = getattr(self, by + "s").labels
+        if mask is not None:
+            codes = codes[mask]
+        counts = np.bincount(codes, minlength=len(labels))
+        return {labels[c]: int(counts[c]) for c in np.nonzero(counts)[0]}
+
+    def top_per_group(self, by: str, of: str, mask: Optional[np.ndarray] = None, k: int = 5) -> Dict[str, Dict[str, int]]:
+        """
+        Häufigste `of`-Labels pro `by`-Gruppe (z.B. Top-Topics pro Wrapper)
+
+        Eine 2D-Bincount-Matrix statt Counter pro Gruppe
+        """
+        outer, inner = getattr(self, by), getattr(self, of)
+        outer_labels, inner_labels = getattr(self, by + "s").labels, getattr(self, of + "s").labels
+        if mask is not None:
+            outer, inner = outer[mask], inner[mask]
+
+        n_outer, n_inner = len(outer_labels), len(inner_labels)
+        if n_outer == 0 or n_inner == 0:
+            return {}
+        matrix = np.bincount(outer * n_inner + inner, minlength=n_outer * n_inner).reshape(n_outer, n_inner)
+
+        result = {}
+        for o in np.nonzero(matrix.sum(axis=1))[0]:
+            row = matrix[o]
+            top = np.argsort(-row, kind="stable")[:k]
+            result[outer_labels[o]] = {inner_labels[i]: int(row[i]) for i in top if row[i] > 0}
+        return result
+
+
+# ============================================================================
+# VEKTORISIERTE GEGENSTÜCKE ZU utils.algorithms
+# ============================================================================
+
+def moving_average(values: np.ndarray, window: int = 5) -> np.ndarray:
+    """Wie algorithms.calculate_moving_average (erste window-1 Werte roh)"""
+    if len(values) < window:
+        return values
+    cumsum = np.cumsum(np.insert(values, 0, 0.0))
+    result = values.astype(np.float64).copy()
+    result[window - 1:] = (cumsum[window:] - cumsum[:-window]) / window
+    return result
+
+
+def trend(values: np.ndarray) -> str:
+    """Wie algorithms.calculate_trend (lineare Regression über den Index)"""
+    n = len(values)
+    if n < 2:
+        return "STABIL"
+    x = np.arange(n) - (n - 1) / 2
+    slope = float(np.dot(x, values - values.mean()) / np.dot(x, x))
+    if slope > 0.5:
+        return "STEIGEND"
+    elif slope < -0.5:
+        return "FALLEND"
+    return "STABIL"
+
+
+def outlier_indices(values: np.ndarray, threshold: float = 2.0) -> np.ndarray:
+    """Wie algorithms.detect_outliers (|z-score| > threshold, Sample-Stdev)"""
+    if len(values) < 3:
+        return np.empty(0, dtype=np.int64)
+    stdev = values.std(ddof=1)
+    if stdev == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.nonzero(np.abs((values - values.mean()) / stdev) > threshold)[0]
+
+
+_snapshot = AnalyticsSnapshot()
+
+
+def get_snapshot() -> AnalyticsSnapshot:
+    """Prozessweiter Snapshot, bei jedem Aufruf inkrementell aktualisiert"""
+    return _snapshot.refresh()
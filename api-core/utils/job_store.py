@@ -0,0 +1,84 @@
+"""
+SYNTX Job Store
+Gemeinsamer Zugriff auf den Job Index (queue/.index/jobs.sqlite)
+und die Queue-Zähler statt glob + json.load pro Request
+
+Default sind Summary-Records (ohne response_text), full=True nur
+für Endpoints die wirklich die kompletten Metadaten brauchen
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import List, Dict, Tuple, Iterable
+
+PROJECT_ROOT = Path("/opt/syntx-workflow-api-get-prompts")
+QUEUE_DIR = PROJECT_ROOT / "queue"
+
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.append(str(PROJECT_ROOT))
+
+from queue_system.core.job_index import get_job_index
+from queue_system.core.search_index import get_search_index
+from queue_system.monitoring.queue_counter import get_queue_counter
+from syntex_injector.syntex.utils.blob_store import get_blob_store
+
+
+def job_index():
+    """Prozessweiter JobIndex für die Production Queue"""
+    return get_job_index(QUEUE_DIR)
+
+
+def search_index():
+    """Prozessweiter SearchIndex (FTS5) für die Production Queue
+
+    Startet beim ersten Zugriff den Hintergrund-Sync - Requests syncen nicht selbst
+    """
+    index = get_search_index(QUEUE_DIR)
+    index.start_background_sync()
+    return index
+
+
+def queue_counter():
+    """Prozessweiter QueueCounter (inotify) für die Production Queue"""
+    return get_queue_counter(QUEUE_DIR)
+
+
+def metrics_dir() -> Path:
+    """Stage-Metriken der Consumer-Prozesse (stages-<host>-<pid>.json)"""
+    return Path(os.getenv("SYNTX_METRICS_DIR", str(QUEUE_DIR / ".metrics")))
+
+
+def blob_store():
+    """Blob Store der Production Queue (Referenzen *_ref in Metadaten/Logs)
+
+    Gleicher Default wie Consumer/Cron (blob_store.BLOB_DIR, absolut)
+    """
+    return get_blob_store()
+
+
+def load_all_processed(full: bool = False) -> List[Dict]:
+    """Alle processed Jobs (Summary-Records bzw. Metadaten) - Catch-up Scan inklusive"""
+    return job_index().load_jobs(("processed",), full)
+
+
+def load_job_entries(states: Iterable[str] = ("processed",), full: bool = False) -> List[Tuple[str, str, Dict]]:
+    """
+    Jobs mit Ort auf Disk, sortiert nach Filename
+
+    Returns:
+        List von (filename, state, metadata)
+        Prompt-Text liegt unter QUEUE_DIR / state / filename
+    """
+    return job_index().entries(states, full)
+
+
+def load_feature_entries(states: Iterable[str] = ("processed",)) -> List[Tuple[str, str, Dict, Dict]]:
+    """
+    Jobs mit beim Ingest berechneten Keyword-Features
+
+    Returns:
+        List von (filename, state, summary, features)
+        features["counts"] = {keyword: anzahl}, features["length"] = Prompt-Länge
+    """
+    return job_index().feature_entries(states)
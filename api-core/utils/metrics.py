@@ -0,0 +1,288 @@
+"""
+SYNTX Metrics - Prometheus /metrics für die Production API
+
+=== ZWECK ===
+Die Dashboards rechnen pro Request aus der Disk neu. Für Prometheus
+gibt es jetzt einen Scrape-Endpoint, der NUR aus dem Speicher rendert:
+
+- Request-Latenz pro Route      Middleware, live im API-Prozess
+- Queue-Tiefe pro State         QueueCounter (inotify)
+- Jobs processed/failed         Zähler der Consumer (stages-*.json + totals-*.json)
+- Score-Histogramm pro Wrapper  Job Index, EINE Aggregat-Query
+- Embedding-Cache Hit-Rate      Zähler der Consumer
+- LLM-Call Latenz               Stage "http" der Consumer
+- Retries / Dead Letter         Zähler + letzter Lauf des Retry Schedulers
+
+=== HOT PATH ===
+Middleware: ein perf_counter() + ein Dict-Update unter Lock pro Request.
+Consumer: count_event() / record_stage() → Dict-Update im Prozess,
+Flush alle FLUSH_SECONDS (stage_metrics).
+
+=== SCRAPE ===
+Alles was von Disk/SQLite kommt, sammelt ein Hintergrund-Thread alle
+METRICS_REFRESH_SECONDS und legt fertigen Text ab. /metrics hängt nur
+die Live-Histogramme der Middleware davor → kein Filesystem-Zugriff.
+
+=== CONFIG ===
+SYNTX_METRICS_REFRESH    Sekunden zwischen Refreshes (default 15)
+"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+from utils.job_store import job_index, queue_counter, metrics_dir  # hängt PROJECT_ROOT an sys.path
+from syntex_injector.syntex.utils.stage_metrics import load_metrics, prometheus_text
+from queue_system.core.retry_scheduler import load_last_run
+
+METRICS_REFRESH_SECONDS = float(os.getenv("SYNTX_METRICS_REFRESH", "15"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SCORE_BUCKETS = (10, 20, 30, 40, 50, 60, 70, 80, 90, 100)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs: Tuple[Tuple[str, str], ...]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+def histogram_lines(name: str, labels: Tuple[Tuple[str, str], ...], bounds, cumulative: List[int],
+                    count: int, total: float) -> List[str]:
+    """Prometheus Histogramm-Zeilen (_bucket kumulativ, _sum, _count)"""
+    lines = []
+    for bound, n in zip(bounds, cumulative):
+        lines.append(f"{name}_bucket{_labels(labels + (('le', _format_bound(bound)),))} {n}")
+    lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {count}")
+    lines.append(f"{name}_sum{_labels(labels)} {total:.6f}")
+    lines.append(f"{name}_count{_labels(labels)} {count}")
+    return lines
+
+
+class LatencyHistogram:
+    """
+    Request-Latenz pro (method, route, status) - feste Buckets
+
+    observe() kostet bisect + Listen-Update unter Lock
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # labels → [counts je Bucket (nicht kumulativ) + Overflow, count, sum]
+        self._series: Dict[Tuple, List] = {}
+
+    def observe(self, labels: Tuple[Tuple[str, str], ...], seconds: float) -> None:
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0, 0.0]
+            series[0][index] += 1
+            series[1] += 1
+            series[2] += seconds
+
+    def render(self, name: str, help_text: str) -> List[str]:
+        with self._lock:
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in self._series.items()]
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, counts, count, total in sorted(snapshot):
+            cumulative, running = [], 0
+            for n in counts[:-1]:
+                running += n
+                cumulative.append(running)
+            lines.extend(histogram_lines(name, labels, self.buckets, cumulative, count, total))
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Live-Metriken des API-Prozesses + periodisch gesammelter Hintergrund-Text
+    """
+
+    def __init__(self, refresh_seconds: float = METRICS_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self.request_latency = LatencyHistogram()
+        self._collected = ""
+        self._collected_at = 0.0
+        self._collect_errors = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ========================================================================
+    # HINTERGRUND-SAMMLER
+    # ========================================================================
+
+    def start(self) -> None:
+        """Startet den Refresh-Thread (idempotent)"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="syntx-metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.collect()
+            self._stop.wait(self.refresh_seconds)
+
+    def collect(self) -> None:
+        """Sammelt Queue/Index/Consumer-Metriken → fertiger Text im Speicher"""
+        sections = []
+        for collector in (self._collect_queue, self._collect_scores, self._collect_consumers):
+            try:
+                sections.extend(collector())
+            except Exception as e:
+                self._collect_errors += 1
+                print(f"⚠️  Metrics collect failed ({collector.__name__}): {e}")
+        self._collected = "\n".join(sections) + "\n" if sections else ""
+        self._collected_at = time.time()
+
+    @staticmethod
+    def _collect_queue() -> List[str]:
+        name = "syntx_queue_depth"
+        lines = [f"# HELP {name} Jobs per queue state", f"# TYPE {name} gauge"]
+        for state, n in sorted(queue_counter().counts("jobs").items()):
+            lines.append(f'{name}{{state="{state}"}} {n}')
+        return lines
+
+    @staticmethod
+    def _collect_scores() -> List[str]:
+        name = "syntx_quality_score"
+        lines = [f"# HELP {name} Quality score of processed jobs per wrapper", f"# TYPE {name} histogram"]
+        for wrapper, (cumulative, count, total) in sorted(
+                job_index().score_histogram("processed", SCORE_BUCKETS).items()):
+            lines.extend(histogram_lines(name, (("wrapper", wrapper),), SCORE_BUCKETS, cumulative, count, total))
+        return lines
+
+    @staticmethod
+    def _collect_consumers() -> List[str]:
+        histograms, counters = load_metrics(metrics_dir())
+        lines = []
+
+        for counter, metric, help_text, label in (
+            ("jobs_processed", "syntx_jobs_processed_total", "Jobs processed successfully per wrapper", "wrapper"),
+            ("jobs_failed", "syntx_jobs_failed_total", "Jobs moved to error/ per wrapper", "wrapper"),
+            ("llm_calls", "syntx_llm_calls_total", "LLM calls by outcome", "outcome"),
+            ("retry_requeued", "syntx_retry_requeued_total", "Error jobs re-enqueued by the retry scheduler", "error_class"),
+            ("retry_dead_lettered", "syntx_retry_dead_lettered_total", "Error jobs moved to dead_letter/", "error_class"),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for value, n in sorted(counters.get(counter, {}).items()):
+                lines.append(f'{metric}{{{label}="{_escape(value or "unknown")}"}} {n}')
+
+        hits = sum(counters.get("embedding_cache_hits", {}).values())
+        misses = sum(counters.get("embedding_cache_misses", {}).values())
+        lines += [
+            "# HELP syntx_embedding_cache_hits_total Embedding cache hits",
+            "# TYPE syntx_embedding_cache_hits_total counter",
+            f"syntx_embedding_cache_hits_total {hits}",
+            "# HELP syntx_embedding_cache_misses_total Embedding cache misses",
+            "# TYPE syntx_embedding_cache_misses_total counter",
+            f"syntx_embedding_cache_misses_total {misses}",
+            "# HELP syntx_embedding_cache_hit_ratio Embedding cache hit ratio",
+            "# TYPE syntx_embedding_cache_hit_ratio gauge",
+            f"syntx_embedding_cache_hit_ratio {hits / (hits + misses) if hits + misses else 0:.4f}",
+        ]
+
+        last_run = load_last_run(metrics_dir())
+        if last_run:
+            lines += [
+                "# HELP syntx_retry_waiting Error jobs waiting for their backoff (last scheduler run)",
+                "# TYPE syntx_retry_waiting gauge",
+                f"syntx_retry_waiting {last_run.get('waiting', 0)}",
+            ]
+
+        if "http" in histograms:
+            lines.append(prometheus_text({"http": histograms["http"]}, "syntx_llm_request_duration_seconds",
+                                         "LLM call duration in seconds").rstrip("\n"))
+        if histograms:
+            lines.append(prometheus_text(histograms).rstrip("\n"))
+        return lines
+
+    # ========================================================================
+    # SCRAPE
+    # ========================================================================
+
+    def render(self) -> str:
+        """Prometheus Text Format - nur aus dem Speicher"""
+        lines = self.request_latency.render(
+            "syntx_http_request_duration_seconds", "API request latency per route")
+        lines += [
+            "# HELP syntx_metrics_collected_timestamp_seconds Last background collection",
+            "# TYPE syntx_metrics_collected_timestamp_seconds gauge",
+            f"syntx_metrics_collected_timestamp_seconds {self._collected_at:.3f}",
+            "# HELP syntx_metrics_collect_errors_total Failed background collections",
+            "# TYPE syntx_metrics_collect_errors_total counter",
+            f"syntx_metrics_collect_errors_total {self._collect_errors}",
+        ]
+        return "\n".join(lines) + "\n" + self._collected
+
+
+class MetricsMiddleware:
+    """
+    ASGI-Middleware: Latenz pro Route-Template (/prompts/by-job/{job_id})
+
+    Reines ASGI statt BaseHTTPMiddleware → kein zusätzlicher Task pro Request
+    """
+
+    def __init__(self, app, registry: Optional[MetricsRegistry] = None):
+        self.app = app
+        self.registry = registry or get_metrics_registry()
+
+    @staticmethod
+    def _route(scope) -> str:
+        # FastAPI trägt die gematchte Route in den (geteilten) Scope ein.
+        # Kein Match (404, Mounts) → ein Label statt Route-Scan pro Request
+        # (rohe Pfade mit IDs würden die Label-Kardinalität sprengen)
+        route = scope.get("route")
+        if route is not None and getattr(route, "path", None):
+            return route.path
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = ["500"]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            labels = (("method", scope.get("method", "")), ("route", self._route(scope)),
+                      ("status", status[0]))
+            self.registry.request_latency.observe(labels, time.perf_counter() - start)
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Prozessweite Registry"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
@@ -18,10 +18,11 @@ from evolution.field_analyzer import FieldAnalyzer
 from evolution.pattern_learner import PatternLearner
 from evolution.queue_writer import QueueWriter
 from config.config_loader import get_config
+from syntex_injector.syntex.utils.jsonl_reader import read_tail
 
 # Import GPT Generator
 sys.path.insert(0, str(Path(__file__).parent.parent / "gpt_generator"))
-from gpt_generator.syntx_prompt_generator import generate_prompt
+from gpt_generator.concurrency import GPT_CONCURRENCY, generate_concurrent
 from gpt_generator.topics_database import get_random_topics
 from gpt_generator.prompt_styles import get_all_styles
 
@@ -33,8 +34,8 @@ class EvolutionaryProducer:
     Flow:
     1. Analysiere processed/ Jobs (FieldAnalyzer)
     2. Lerne erfolgreiche Patterns (PatternLearner)
-    3. Generiere optimierte Prompts (GPT-4 mit Meta-Prompts)
-    4. Schreibe in queue/incoming/ (QueueWriter)
+    3. Generiere optimierte Prompts (GPT-4 mit Meta-Prompts, parallel)
+    4. Schreibe jeden fertigen Prompt sofort in queue/incoming/ (QueueWriter)
     5. Archiviere gelernte Jobs
     6. Logge Evolution
     """
@@ -47,6 +48,7 @@ class EvolutionaryProducer:
         
         # Settings
         self.batch_size = get_config('evolution', 'producer', 'generation', 'batch_size', default=20)
+        self.concurrency = get_config('evolution', 'producer', 'generation', 'concurrency', default=GPT_CONCURRENCY)
         self.learning_enabled = get_config('evolution', 'producer', 'learning', 'enabled', default=True)
         self.max_samples = get_config('evolution', 'producer', 'learning', 'max_samples', default=50)
         self.min_score = get_config('evolution', 'producer', 'learning', 'min_score', default=90)
@@ -62,14 +64,11 @@ class EvolutionaryProducer:
         if not evo_log.exists():
             return 1
         
-        # Letzte Generation aus Log
+        # Letzte Generation aus Log (rückwärts lesen statt readlines)
         try:
-            with open(evo_log, 'r') as f:
-                lines = f.readlines()
-                if lines:
-                    import json
-                    last = json.loads(lines[-1])
-                    return last.get('generation', 0) + 1
+            last = read_tail(evo_log, 1)
+            if last:
+                return last[0].get('generation', 0) + 1
         except:
             pass
         
@@ -108,60 +107,66 @@ class EvolutionaryProducer:
                 print(f"   ℹ️  No jobs with score >= {self.min_score} found")
                 print(f"   ℹ️  Generation {self.generation} will explore without learning\n")
         
-        # PHASE 2: GENERATION
-        print(f"🎨 PHASE 2: GENERATING {self.batch_size} OPTIMIZED PROMPTS")
+        # PHASE 2+3: GENERATION → QUEUE
+        # Parallel generieren, jeder fertige Prompt geht sofort nach
+        # queue/incoming/ (Consumer startet schon während der Rest läuft)
+        print(f"🎨 PHASE 2: GENERATING {self.batch_size} OPTIMIZED PROMPTS "
+              f"(concurrency {self.concurrency})")
         
         # Topics holen
         topics = get_random_topics(self.batch_size)
         styles = get_all_styles()
         
-        results = []
-        successful = 0
-        
-        for i, (category, topic) in enumerate(topics, 1):
+        jobs = []
+        for category, topic in topics:
             # Style wählen (aus Patterns wenn vorhanden)
             if analysis and analysis['sample_count'] > 0:
                 # Nutze erfolgreiche Styles
                 top_styles = list(analysis['styles'].keys())[:3]
                 style = random.choice(top_styles) if top_styles else random.choice(styles)
-            else:
-                style = random.choice(styles)
-            
-            print(f"   [{i}/{self.batch_size}] {category}: {topic} ({style})")
-            
-            # Meta-Prompt erstellen wenn Learning aktiv
-            if analysis and analysis['sample_count'] > 0:
-                meta_prompt = self.learner.create_meta_prompt(analysis, topic, style)
                 # Nutze optimierten Meta-Prompt
-                result = generate_prompt(
-                    prompt=meta_prompt,
-                    style=style,
-                    category=category,
-                    max_tokens=500
-                )
+                prompt = self.learner.create_meta_prompt(analysis, topic, style)
             else:
                 # Normaler Prompt ohne Learning
-                result = generate_prompt(
-                    prompt=topic,
-                    style=style,
-                    category=category,
-                    max_tokens=500
-                )
-            
-            results.append(result)
+                style = random.choice(styles)
+                prompt = topic
+            jobs.append({
+                'prompt': prompt,
+                'style': style,
+                'category': category,
+                'max_tokens': 500
+            })
+        
+        successful = 0
+        done = 0
+        write_stats = {'written': 0, 'failed': 0}
+        
+        def write_result(index: int, result: Dict[str, Any]) -> None:
+            """Fertiger GPT-Call → Queue (läuft im Producer-Thread)"""
+            nonlocal successful, done
+            done += 1
+            category, topic = topics[index]
+            print(f"   [{done}/{self.batch_size}] {category}: {topic} ({jobs[index]['style']})")
             
             if result['success']:
                 successful += 1
-                quality = result.get('quality_score', {}).get('total_score', 0)
+                quality = (result.get('quality_score') or {}).get('total_score', 0)
                 print(f"        ✅ Generated (GPT Quality: {quality}/10)")
             else:
                 print(f"        ❌ Failed: {result.get('error', 'Unknown')}")
+            
+            try:
+                batch = self.writer.write_batch([result])
+            except Exception as e:
+                print(f"        ⚠️  Queue Write Failed: {e}")
+                batch = {'written': 0, 'failed': 1}
+            write_stats['written'] += batch['written']
+            write_stats['failed'] += batch['failed']
         
-        print()
+        generate_concurrent(jobs, on_result=write_result, concurrency=self.concurrency)
         
-        # PHASE 3: WRITE TO QUEUE
-        print(f"📝 PHASE 3: WRITING {successful} PROMPTS TO QUEUE")
-        write_stats = self.writer.write_batch(results)
+        print()
+        print(f"📝 PHASE 3: WROTE {write_stats['written']} PROMPTS TO QUEUE")
         print(f"   ✅ Written: {write_stats['written']} to queue/incoming/")
         if write_stats['failed'] > 0:
             print(f"   ⚠️  Failed: {write_stats['failed']}")
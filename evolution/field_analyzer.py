@@ -10,6 +10,8 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.config_loader import get_config
+from queue_system.core.job_index import get_job_index
+from queue_system.core.search_index import get_search_index
 
 
 class FieldAnalyzer:
@@ -181,6 +183,7 @@ class FieldAnalyzer:
         self.archive_dir.mkdir(exist_ok=True)
         
         archived = 0
+        moved = []
         for job in jobs:
             try:
                 file_path = job['file']
@@ -196,12 +199,25 @@ class FieldAnalyzer:
                     archive_txt = self.archive_dir / txt_file.name
                     txt_file.rename(archive_txt)
                 
+                moved.append(txt_file.name)
                 archived += 1
                 
             except Exception as e:
                 print(f"⚠️  Archive error {file_path}: {e}")
                 continue
         
+        # Job Index nachziehen - /prompts/by-job findet archivierte Jobs sofort
+        # Index ist nur Cache → Fehler dürfen die Archivierung nicht kippen
+        try:
+            get_job_index(self.queue_base).move_many(moved, "archive")
+        except Exception as e:
+            print(f"⚠️  Job Index update failed: {e}")
+        # Search Index: nur State umstellen, Texte bleiben gleich
+        try:
+            get_search_index(self.queue_base).move_many(moved, "archive")
+        except Exception as e:
+            print(f"⚠️  Search Index update failed: {e}")
+        
         return archived
 
 
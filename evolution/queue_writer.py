@@ -10,6 +10,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.config_loader import get_config
+from queue_system.core.ready_queue import get_ready_queue
 
 
 class QueueWriter:
@@ -77,6 +78,13 @@ class QueueWriter:
         txt_file.rename(txt_target)
         json_file.rename(json_target)
         
+        # Ready Queue - Consumer findet den Job ohne Directory-Scan
+        # Index ist nur Cache → Fehler dürfen den Job nicht kippen
+        try:
+            get_ready_queue(self.queue_base).add(txt_target.name)
+        except Exception as e:
+            print(f"⚠️  Ready Queue update failed for {txt_target.name}: {e}")
+        
         return True
     
     def write_batch(self, results: list) -> Dict[str, int]:
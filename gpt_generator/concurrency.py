@@ -0,0 +1,142 @@
+"""
+Concurrent Generation - Parallele generate_prompt()-Aufrufe mit geteiltem Rate Limit
+
+=== ZWECK ===
+IntelligentProducer und EvolutionaryProducer haben generate_prompt() in
+einer for-Schleife aufgerufen → 20 Prompts = 20 OpenAI Round-Trips
+nacheinander. Die Wall Time wuchs mit der Batch-Größe.
+
+=== CONCURRENCY ===
+generate_concurrent() verteilt die Aufrufe auf einen ThreadPoolExecutor
+mit SYNTX_GPT_CONCURRENCY Workern (der OpenAI-Client ist synchron und
+blockiert nur im Netzwerk-I/O → Threads reichen, kein asyncio nötig).
+Ergebnisse kommen in Fertigstellungs-Reihenfolge an den Callback
+on_result() - der Aufrufer schreibt sie sofort in die Queue, der
+Consumer kann schon loslegen während der Rest noch generiert wird.
+
+Der Callback läuft im aufrufenden Thread → Queue-Writes brauchen keine
+eigene Synchronisation.
+
+=== RATE LIMIT ===
+Ein Token Bucket pro Prozess (get_rate_limiter), den ALLE API-Calls in
+generate_prompt() durchlaufen - auch Netzwerk- und Refusal-Retries:
+- SYNTX_GPT_RPM Requests pro Minute, Burst bis SYNTX_GPT_CONCURRENCY
+- RateLimitError (429) → pause(): ALLE Worker warten den Backoff ab,
+  nicht nur der Thread der den 429 bekommen hat
+- SYNTX_GPT_RPM=0 → kein Limit
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional
+
+GPT_CONCURRENCY = int(os.getenv("SYNTX_GPT_CONCURRENCY", "4"))
+GPT_REQUESTS_PER_MINUTE = float(os.getenv("SYNTX_GPT_RPM", "60"))
+
+
+class RateLimiter:
+    """
+    Thread-safe Token Bucket
+
+    Verwendung:
+        limiter = get_rate_limiter()
+        limiter.acquire()      # blockiert bis ein Request erlaubt ist
+        limiter.pause(4)       # 429 → alle Aufrufer warten 4s
+    """
+
+    def __init__(self, requests_per_minute: float = GPT_REQUESTS_PER_MINUTE,
+                 burst: int = GPT_CONCURRENCY):
+        self.rate = requests_per_minute / 60.0   # Tokens pro Sekunde
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """
+        Wartet auf ein Token
+
+        Returns:
+            Gewartete Sekunden
+        """
+        if self.rate <= 0:
+            return 0.0
+        start = time.monotonic()
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - start
+                else:
+                    wait = (1 - self._tokens) / self.rate
+                self._cond.wait(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Rate Limit vom Server → alle Aufrufer warten mindestens `seconds`"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+
+# Ein Limiter pro Prozess - alle Producer-Threads teilen sich das API-Kontingent
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Prozessweiter RateLimiter für OpenAI Requests"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
+
+
+def generate_concurrent(
+    jobs: List[Dict[str, Any]],
+    on_result: Optional[Callable[[int, Dict[str, Any]], None]] = None,
+    concurrency: int = GPT_CONCURRENCY,
+) -> List[Dict[str, Any]]:
+    """
+    generate_prompt(**job) für alle Jobs, bis zu `concurrency` gleichzeitig
+
+    === ARGS ===
+    jobs: kwargs für generate_prompt() (prompt, style, category, ...)
+    on_result: Callback(index, result) pro fertigem Job (index in `jobs`),
+        in Fertigstellungs-Reihenfolge und im aufrufenden Thread
+    concurrency: Max. gleichzeitige Requests
+
+    === RETURNS ===
+    Ergebnisse in der Reihenfolge von `jobs`
+    """
+    from .syntx_prompt_generator import generate_prompt
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+    if not jobs:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(jobs))),
+                            thread_name_prefix="syntx-gpt") as pool:
+        futures = {pool.submit(generate_prompt, **job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # generate_prompt() fängt selbst alles ab - nur zur Sicherheit
+                result = {"success": False, "prompt_generated": None, "error": f"Error: {e}",
+                          "style": jobs[i].get("style"), "category": jobs[i].get("category")}
+            results[i] = result
+            if on_result is not None:
+                on_result(i, result)
+    return results
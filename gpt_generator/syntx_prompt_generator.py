@@ -1,6 +1,7 @@
 import os
 import json
 import time
+import threading
 from datetime import datetime
 from pathlib import Path
 from openai import OpenAI, APIError, RateLimitError, APIConnectionError, APITimeoutError
@@ -9,17 +10,37 @@ from openai import OpenAI, APIError, RateLimitError, APIConnectionError, APITime
 from .prompt_scorer import score_prompt
 from .cost_tracker import calculate_cost, save_cost_log
 from .prompt_styles import apply_style
+from .concurrency import get_rate_limiter
+
+
+# Ein Client pro Prozess - thread-safe, Connection Pool wird über alle
+# (parallelen) Requests geteilt statt pro Versuch neu aufgebaut
+_client = None
+_client_lock = threading.Lock()
+
+
+def _get_client() -> OpenAI:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OpenAI(timeout=45.0)
+        return _client
+
+
+_log_lock = threading.Lock()
 
 
 def log_request(log_data: dict) -> None:
-    """Schreibt einen Log-Eintrag in die JSONL-Datei."""
+    """Schreibt einen Log-Eintrag in die JSONL-Datei (thread-safe, parallele Producer)."""
     log_dir = Path("./logs")
     log_dir.mkdir(exist_ok=True)
     
     log_file = log_dir / "gpt_prompts.jsonl"
+    line = json.dumps(log_data, ensure_ascii=False) + "\n"
     
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
+    with _log_lock:
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(line)
 
 
 def is_refusal(text: str) -> bool:
@@ -110,8 +131,10 @@ def generate_prompt(
         # Inner Loop: Network/API Retries
         while retry_count <= max_retries:
             try:
-                # OpenAI Client initialisieren
-                client = OpenAI(timeout=45.0)
+                client = _get_client()
+                
+                # Geteiltes Rate Limit (auch für Retries) - siehe concurrency.py
+                get_rate_limiter().acquire()
                 
                 # API Call
                 response = client.chat.completions.create(
@@ -167,7 +190,7 @@ def generate_prompt(
                         # Neuen Prompt generieren (Variation)
                         current_prompt = f"{prompt} (Versuch {refusal_attempt + 1}: Formuliere es anders)"
                         print(f"  🔄 Refusal erkannt - Neuer Versuch {refusal_attempt + 1}/{max_refusal_retries + 1}")
-                        time.sleep(1)
+                        # Kein sleep - der nächste Versuch wartet im Rate Limiter
                         break  # Raus aus Inner Loop
                     else:
                         # Alle Refusal-Versuche aufgebraucht
@@ -218,7 +241,8 @@ def generate_prompt(
             except RateLimitError as e:
                 retry_count += 1
                 if retry_count <= max_retries:
-                    time.sleep(backoff_times[retry_count - 1])
+                    # Alle Worker bremsen, nicht nur diesen Thread
+                    get_rate_limiter().pause(backoff_times[retry_count - 1])
                     continue
                 else:
                     result = {
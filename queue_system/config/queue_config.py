@@ -11,6 +11,7 @@ QUEUE_PROCESSED = QUEUE_BASE / "processed"
 QUEUE_ERROR = QUEUE_BASE / "error"
 QUEUE_ARCHIVE = QUEUE_BASE / "archive"
 QUEUE_TMP = QUEUE_BASE / ".tmp"
+QUEUE_DEAD_LETTER = QUEUE_BASE / "dead_letter"
 
 # Thresholds
 QUEUE_MIN_THRESHOLD = 5    # Unter 5 → Producer aktiviert
@@ -21,10 +22,51 @@ QUEUE_CRITICAL_THRESHOLD = 100  # Alarm!
 PRODUCER_BATCH_SIZE = 20
 PRODUCER_CHECK_INTERVAL_HOURS = 2
 
+# Adaptive Producer Control (SYNTX_PRODUCER_CONTROL=adaptive)
+PRODUCER_CONTROL_FILE = "producer_control.json"   # liegt unter queue/.index/
+PRODUCER_TARGET_BACKLOG_HOURS = 4   # incoming soll so viele Stunden Arbeit halten
+PRODUCER_MAX_BATCH_SIZE = 40        # Obergrenze pro Lauf
+PRODUCER_DRAIN_TAU_HOURS = 12       # Zeitkonstante der Drain-Rate EWMA
+PRODUCER_YIELD_ALPHA = 0.3          # Gewicht des letzten Laufs in der Yield EWMA
+PRODUCER_MIN_YIELD = 0.2            # Untergrenze (sonst explodiert die Batch-Größe)
+
 # Consumer Settings
 CONSUMER_BATCH_SIZE = 20
 CONSUMER_MAX_WORKERS = 3
-CONSUMER_PROCESSING_TIMEOUT = 3600  # 1 Stunde
+CONSUMER_MAX_INFLIGHT = 2   # Max. gleichzeitige Llama-Calls pro Consumer-Pool
+CONSUMER_PROCESSING_TIMEOUT = 5 * 3600  # Ab Start von process_job; Llama READ_TIMEOUT 3600s × 4 Versuche + Reserve
+                                        # danach kein Heartbeat mehr → Lease läuft aus, Reaper holt den Job
+CONSUMER_CLAIM_BATCH = 4            # Max. Jobs pro Claim-Durchlauf im Pool (nur für wartende Worker)
+CONSUMER_LEASE_SECONDS = 180        # Lease-Dauer, Heartbeat verlängert
+CONSUMER_HEARTBEAT_SECONDS = 30     # Heartbeat-Intervall (Lease-Verlängerung)
+CONSUMER_REAPER_SECONDS = 60        # Abgelaufene Leases → zurück nach incoming/
+CONSUMER_MAX_LEASE_EXPIRATIONS = 3  # Danach Job → error/ (Poison Job)
+
+# Retry Scheduler (error/ → incoming/ bzw. dead_letter/)
+RETRY_MAX_ATTEMPTS = 5             # Fehlversuche bis dead_letter/
+RETRY_BASE_SECONDS = 300           # Backoff nach dem 1. Fehler (verdoppelt sich)
+RETRY_MAX_DELAY_SECONDS = 6 * 3600 # Obergrenze Backoff
+
+# Job Index Settings
+JOB_INDEX_FILE = "jobs.sqlite"          # liegt unter queue/.index/
+JOB_INDEX_FULL_SCAN_SECONDS = 60       # Catch-up Scan auch ohne Dir-Änderung
+JOB_INDEX_MAX_TOMBSTONES = 50000      # Löschungen für abgeleitete Indizes (danach Full-Diff)
+JOB_INDEX_BACKFILL_BATCH = 500        # Feature-Backfill: Zeilen pro Commit
+
+# Ready Queue (sortierter Index über incoming/)
+READY_QUEUE_FILE = "ready.sqlite"       # liegt unter queue/.index/
+READY_QUEUE_RESCAN_SECONDS = 60         # Abgleich mit incoming/ (manuell verschobene Jobs)
+
+# Bulk Re-Scoring Settings
+RESCORE_WORKERS = 4           # Prozesse im Pool (1 = im aktuellen Prozess)
+RESCORE_CHUNK_SIZE = 64       # Responses pro Worker-Aufgabe / Embedding-Batch
+RESCORE_HISTORY_LIMIT = 10    # Alte Scores pro Job in score_history
+
+# Volltext-Suche (SQLite FTS5 über Prompt + Response)
+SEARCH_INDEX_FILE = "search.sqlite"     # liegt unter queue/.index/
+SEARCH_PAGE_SIZE = 20
+SEARCH_SYNC_BATCH = 500       # Dokumente pro Commit beim (Erst-)Aufbau
+SEARCH_SYNC_SECONDS = 30      # Hintergrund-Sync der API (Requests syncen nicht selbst)
 
 # Cleanup Settings
 ARCHIVE_AFTER_DAYS = 30
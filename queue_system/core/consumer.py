@@ -18,11 +18,18 @@ File-Based Locking via Atomic Rename:
 - incoming/job.txt → processing/job.txt = Lock acquired
 - Wenn rename fails → Job bereits von anderem Worker gelocked
 - Ermöglicht parallele Worker ohne Koordination
+
+=== LEASES ===
+Jeder geclaimte Job bekommt processing/<stem>.lease, ein Heartbeat
+verlängert es. Abgelaufene Leases (Worker tot) holt der Reaper
+automatisch zurück nach incoming/ (siehe leases.py). Vor dem finalen
+Move prüft der Worker ob das Lease noch seins ist - sonst wird das
+Ergebnis verworfen (Job läuft bereits woanders)
 """
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 from dataclasses import dataclass
 
 # Add parent for SYNTX imports
@@ -35,7 +42,12 @@ from queue_system.utils.wrapper_patcher import patch_wrapper_system
 patched_wrappers = patch_wrapper_system()
 
 from .file_handler import FileHandler
+from .search_index import get_search_index
+from .ready_queue import get_ready_queue
+from .leases import LeaseLost, get_lease_manager
 from ..config.queue_config import *
+from syntex_injector.syntex.utils.blob_store import BLOB_STORE_ENABLED, get_blob_store
+from syntex_injector.syntex.utils.stage_metrics import stage, count_event
 
 
 @dataclass
@@ -89,69 +101,120 @@ class QueueConsumer:
         # File Handler
         self.file_handler = FileHandler()
         
+        # Ready Queue - sortierter Index über incoming/
+        self.ready_queue = get_ready_queue()
+        
+        # Leases: Heartbeat + Reaper (ein Thread pro Prozess)
+        self.leases = get_lease_manager()
+        self.leases.start_heartbeat()
+        
         print(f"🔧 Consumer [{self.worker_id}] initialized (wrapper: {wrapper_name})")
     
     def get_next_job(self) -> Optional[Job]:
         """
         Holt nächsten Job aus Queue MIT LOCK
         
+        Genau ein Job - ein einzelner Worker kann nur einen sofort starten.
+        Jeder weitere geclaimte Job läge mit Heartbeat-Lease in processing/,
+        ohne dass andere Consumer ihn nehmen könnten.
+        
+        === RETURNS ===
+        Job object wenn erfolgreich gelocked
+        None wenn Queue leer
+        """
+        jobs = self.claim_jobs(1)
+        return jobs[0] if jobs else None
+    
+    def claim_jobs(self, limit: int = CONSUMER_CLAIM_BATCH) -> List[Job]:
+        """
+        Claimt bis zu `limit` Jobs in einem Durchlauf, jeder mit Lease
+        
         === LOCK MECHANISM ===
-        1. Liste alle .txt Files in incoming/ (sortiert nach Timestamp)
-        2. Versuche älteste Datei: incoming/ → processing/
-        3. Wenn rename() erfolgreich → Lock acquired, return Job
-        4. Wenn FileNotFoundError → anderer Worker war schneller, try next
-        5. Wenn keine Files mehr → return None (Queue leer)
+        1. Älteste Kandidaten aus der Ready Queue nehmen (O(log n),
+           kein glob + sort über incoming/ mehr)
+        2. Pro Kandidat: incoming/ → processing/
+        3. Wenn rename() erfolgreich → Lock acquired, Lease-Sidecar schreiben
+        4. Wenn FileNotFoundError → anderer Worker war schneller
+           (oder Eintrag veraltet), try next
+        5. Wenn keine Kandidaten mehr → weniger (oder keine) Jobs
         
         === WARUM ATOMIC ===
         rename() ist atomic auf POSIX filesystems
         Entweder: File ist verschoben (Lock acquired)
         Oder: FileNotFoundError (Lock von anderem Worker)
         Niemals: Partial state oder doppeltes Processing
+        Die Ready Queue liefert nur Kandidaten - Besitz entscheidet rename()
         
-        === RETURNS ===
-        Job object wenn erfolgreich gelocked
-        None wenn Queue leer
+        === LEASE ===
+        Heartbeat-Thread (LeaseManager) verlängert die Leases bis
+        process_job() fertig ist. Stirbt der Prozess, holt der Reaper
+        die Jobs nach CONSUMER_LEASE_SECONDS zurück nach incoming/.
         """
-        # Alle .txt Files in incoming/ (sortiert = älteste zuerst)
-        # Get all .txt files EXCEPT _response.txt files!
-        all_txt_files = sorted(QUEUE_INCOMING.glob("*.txt"))
-        incoming_files = [f for f in all_txt_files if not f.name.endswith('_response.txt')]
+        jobs: List[Job] = []
+        failed = set()
+        while len(jobs) < limit:
+            candidates = [name for name in self.ready_queue.pop(limit - len(jobs)) if name not in failed]
+            if not candidates:
+                # Queue leer - oder nur noch Jobs die schon nicht zu locken waren
+                # (Abgleich hat sie wieder eingetragen → nächster Aufruf)
+                break
+            
+            for filename in candidates:
+                file_path = QUEUE_INCOMING / filename
+                try:
+                    jobs.append(self._claim(file_path))
+                except FileNotFoundError:
+                    # Anderer Worker war schneller
+                    # Try next file
+                    continue
+                except Exception as e:
+                    print(f"⚠️  Error locking {file_path.name}: {e}")
+                    failed.add(file_path.name)
+                    continue
+        return jobs
+    
+    def _claim(self, file_path: Path) -> Job:
+        """Ein Kandidat: atomic rename → Lease → Metadaten nachziehen → Job"""
+        # === ATOMIC LOCK ===
+        # Target in processing/
+        processing_path = QUEUE_PROCESSING / file_path.name
+        
+        # Atomic rename = Lock
+        # Wenn das wirft FileNotFoundError → anderer Worker hat's
+        file_path.rename(processing_path)
+        
+        # === LOCK ACQUIRED! ===
+        self.leases.acquire(processing_path, self.worker_id)
         
-        if not incoming_files:
-            return None  # Queue leer
+        # Metadata auch verschieben
+        meta_path_incoming = file_path.with_suffix('.json')
+        meta_path_processing = processing_path.with_suffix('.json')
         
-        # Versuche jedes File zu locken (älteste zuerst)
-        for file_path in incoming_files:
+        if meta_path_incoming.exists():
+            meta_path_incoming.rename(meta_path_processing)
+        
+        # Job laden
+        return self._load_job(processing_path, meta_path_processing)
+    
+    def return_jobs(self, jobs: List[Job]) -> int:
+        """
+        Gibt geclaimte, noch nicht gestartete Jobs zurück nach incoming/
+        (z.B. Pool-Puffer am Batch-Ende) - sonst warten sie bis ihr Lease abläuft
+        """
+        returned = 0
+        for job in jobs:
+            target = QUEUE_INCOMING / job.filename
             try:
-                # === ATOMIC LOCK ===
-                # Target in processing/
-                processing_path = QUEUE_PROCESSING / file_path.name
-                
-                # Atomic rename = Lock
-                # Wenn das wirft FileNotFoundError → anderer Worker hat's
-                file_path.rename(processing_path)
-                
-                # === LOCK ACQUIRED! ===
-                # Metadata auch verschieben
-                meta_path_incoming = file_path.with_suffix('.json')
-                meta_path_processing = processing_path.with_suffix('.json')
-                
-                if meta_path_incoming.exists():
-                    meta_path_incoming.rename(meta_path_processing)
-                
-                # Job laden
-                return self._load_job(processing_path, meta_path_processing)
-                
+                job.file_path.rename(target)
+                if job.meta_path.exists():
+                    job.meta_path.rename(target.with_suffix('.json'))
             except FileNotFoundError:
-                # Anderer Worker war schneller
-                # Try next file
-                continue
-            except Exception as e:
-                print(f"⚠️  Error locking {file_path.name}: {e}")
                 continue
-        
-        # Alle Files waren bereits gelocked
-        return None
+            finally:
+                self.leases.release(job.filename)
+            self.ready_queue.add(job.filename)
+            returned += 1
+        return returned
     
     def _load_job(self, file_path: Path, meta_path: Path) -> Job:
         """
@@ -185,6 +248,27 @@ class QueueConsumer:
         )
     
     def process_job(self, job: Job) -> bool:
+        """
+        Verarbeitet einen Job - Gesamtdauer landet in der Stage-Metrik 'job',
+        Ergebnis im Zähler jobs_processed / jobs_failed / jobs_lost pro Wrapper
+        """
+        # Hard Timeout (CONSUMER_PROCESSING_TIMEOUT) ab jetzt, nicht ab Claim
+        self.leases.start(job.filename)
+        try:
+            with stage("job"):
+                success = self._process_job(job)
+        except LeaseLost as e:
+            # Reaper hat den Job zurückgegeben → er gehört jemand anderem
+            print(f"⚠️  {job.filename}: Job verloren, Ergebnis verworfen ({e})")
+            count_event("jobs_lost", self.wrapper_name)
+            return False
+        finally:
+            # Job liegt in processed/ bzw. error/ → Lease-Sidecar weg
+            self.leases.release(job.filename)
+        count_event("jobs_processed" if success else "jobs_failed", self.wrapper_name)
+        return success
+    
+    def _process_job(self, job: Job) -> bool:
         """
         Verarbeitet einen Job durch SYNTX Pipeline
         
@@ -227,16 +311,39 @@ class QueueConsumer:
                     'response_text': response  # ← RESPONSE SPEICHERN!
                 }
                 
-                # Move zu processed/ FIRST!
-                self.file_handler.move_to_processed(job)
+                # Blob Store: Response einmal speichern, JSON hält nur die Referenz
+                response_ref = None
+                if BLOB_STORE_ENABLED and response:
+                    response_ref = get_blob_store().put(response)
+                    del job.metadata['syntex_result']['response_text']
+                    job.metadata['syntex_result']['response_text_ref'] = response_ref
+                
+                with stage("file_move"):
+                    # Move zu processed/ FIRST! (nur wenn das Lease noch unseres ist)
+                    self._final_move(self.file_handler.move_to_processed, job)
+                    
+                    # THEN save response in processed/ (not processing/!)
+                    # Job ist ab hier fertig → Fehler dürfen ihn nicht mehr
+                    # nach error/ schicken (Response steht auch im JSON/Blob)
+                    if response:
+                        # Use QUEUE_PROCESSED - file is now in processed/!
+                        response_file = QUEUE_PROCESSED / (job.filename.replace('.txt', '_response.txt'))
+                        try:
+                            if response_ref:
+                                get_blob_store().copy_to(response_ref, response_file)
+                            else:
+                                with open(response_file, 'w', encoding='utf-8') as f:
+                                    f.write(response)
+                            print(f"  💾 Response saved to: {response_file}")
+                        except Exception as e:
+                            print(f"⚠️  Response file write failed for {job.filename}: {e}")
                 
-                # THEN save response in processed/ (not processing/!)
-                if response:
-                    # Use QUEUE_PROCESSED - file is now in processed/!
-                    response_file = QUEUE_PROCESSED / (job.filename.replace('.txt', '_response.txt'))
-                    with open(response_file, 'w', encoding='utf-8') as f:
-                        f.write(response)
-                    print(f"  💾 Response saved to: {response_file}")
+                # Volltext-Index - Job sofort über /prompts/search auffindbar
+                # Index ist nur Cache → Fehler dürfen den Job nicht kippen
+                try:
+                    get_search_index().index_job(job.filename, "processed")
+                except Exception as e:
+                    print(f"⚠️  Search Index update failed for {job.filename}: {e}")
                 
                 return True
                 
@@ -252,10 +359,13 @@ class QueueConsumer:
                 print(f"❌ Kalibrierung fehlgeschlagen: {error_info['error']}")
                 
                 # Move zu error/ (mit retry-count)
-                self.file_handler.move_to_error(job, error_info)
+                with stage("file_move"):
+                    self._final_move(self.file_handler.move_to_error, job, error_info)
                 
                 return False
                 
+        except LeaseLost:
+            raise
         except Exception as e:
             # === EXCEPTION PATH ===
             print(f"❌ Exception während Processing: {e}")
@@ -267,10 +377,23 @@ class QueueConsumer:
             }
             
             # Move zu error/
-            self.file_handler.move_to_error(job, error_info)
+            self._final_move(self.file_handler.move_to_error, job, error_info)
             
             return False
     
+    def _final_move(self, move, job: Job, *args) -> Path:
+        """
+        processing/ → processed/ bzw. error/ nur mit eigenem Lease
+        
+        Lease fremd ODER Rename verliert (Reaper war schneller) → LeaseLost,
+        die Dateien des neuen Besitzers bleiben unangetastet
+        """
+        self.leases.ensure_owned(job.file_path)
+        try:
+            return move(job, *args)
+        except FileNotFoundError as e:
+            raise LeaseLost(f"{job.filename}: Rename verloren ({e})") from e
+    
     def process_batch(self, batch_size: int = 20) -> dict:
         """
         Verarbeitet Batch von Jobs
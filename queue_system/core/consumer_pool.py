@@ -0,0 +1,279 @@
+"""
+Consumer Pool - Mehrere SYNTX Worker in einem Prozess
+
+=== ZWECK ===
+Ein QueueConsumer verarbeitet einen Job nach dem anderen, jeder Job
+blockiert bis zu READ_TIMEOUT im Llama-Call. Der Pool startet N Worker-
+Threads mit demselben Wrapper, die parallel Jobs aus incoming/ ziehen.
+
+=== LOCKING ===
+Claims laufen über claim_jobs() mit dem bestehenden Atomic-Rename Lock,
+gegen andere Prozesse konkurrieren die Worker wie separate Cron-
+Prozesse. Leases aller Worker verlängert ein gemeinsamer Heartbeat-
+Thread (LeaseManager, einer pro Prozess).
+
+=== CLAIM-PUFFER ===
+Ein Puffer für den ganzen Pool: wer einen Job braucht und den Puffer
+leer findet, claimt so viele Jobs wie gerade Worker warten (max.
+CONSUMER_CLAIM_BATCH). Jeder geclaimte Job startet sofort - nie liegt
+ein Job geleast in processing/ während alle Worker beschäftigt sind.
+
+=== IN-FLIGHT LIMIT ===
+Alle Worker teilen sich einen Semaphore vor APIClient.send()
+→ höchstens CONSUMER_MAX_INFLIGHT Requests gleichzeitig am Llama-Endpoint
+→ Worker können trotzdem parallel Jobs laden, parsen, scoren, verschieben
+
+=== VERWENDUNG ===
+    pool = ConsumerPool("sigma", workers=3, max_inflight=2)
+    stats = pool.process_batch(20)
+    # → {"processed": 18, "failed": 2, "total": 20, "workers": {...}}
+
+    # CLI (aus Repo-Root):
+    python3 -m queue_system.core.consumer_pool sigma 3 20
+"""
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Optional, Tuple
+
+from .consumer import Job, QueueConsumer
+from ..config.queue_config import *
+
+
+class BoundedClient:
+    """
+    Proxy um APIClient mit geteiltem Semaphore
+
+    === WARUM PROXY ===
+    Calibrator ruft self.client.send() - Proxy ersetzt nur den Client,
+    Calibrator und APIClient bleiben unverändert
+
+    === WARTEZEIT ===
+    last_wait = Sekunden die der letzte send() auf den Semaphore gewartet
+    hat → Calibrator zieht sie von der "http" Stufe ab (ein Proxy pro
+    Worker-Thread, daher ohne Lock)
+    """
+
+    def __init__(self, client, semaphore: threading.Semaphore):
+        self._client = client
+        self._semaphore = semaphore
+        self.last_wait = 0.0
+
+    def send(self, prompt: str) -> Tuple[Optional[str], Optional[str], int]:
+        start = time.perf_counter()
+        with self._semaphore:
+            self.last_wait = time.perf_counter() - start
+            return self._client.send(prompt)
+
+    def __getattr__(self, name):
+        # endpoint, params, ... vom echten Client
+        return getattr(self._client, name)
+
+
+class ConsumerPool:
+    """
+    Supervisor für N QueueConsumer-Threads
+
+    === DESIGN ===
+    - Jeder Worker hat seinen eigenen QueueConsumer (eigener Calibrator,
+      eigene Session) mit gleicher Wrapper-Konfiguration
+    - Gemeinsames Job-Budget: Pool verarbeitet max. batch_size Jobs gesamt
+    - Worker beendet sich wenn Queue leer oder Budget aufgebraucht
+
+    === STATS ===
+    Pro Worker: processed, failed, total, busy_seconds, jobs_per_minute
+    """
+
+    def __init__(
+        self,
+        wrapper_name: str = "human",
+        workers: int = CONSUMER_MAX_WORKERS,
+        max_inflight: int = CONSUMER_MAX_INFLIGHT,
+        pool_id: Optional[str] = None
+    ):
+        """
+        === ARGS ===
+        wrapper_name: Wrapper für alle Worker
+        workers: Anzahl Worker-Threads
+        max_inflight: Max. gleichzeitige Llama-Calls
+        pool_id: Prefix für Worker-IDs (default: pool_<PID>)
+        """
+        self.wrapper_name = wrapper_name
+        self.pool_id = pool_id or f"pool_{os.getpid()}"
+        self.max_inflight = max(1, min(max_inflight, workers))
+        self._inflight = threading.Semaphore(self.max_inflight)
+
+        # Budget + Stats werden von allen Workern geteilt
+        self._lock = threading.Lock()
+        self._remaining = 0
+
+        # Geteilter Claim-Puffer (siehe CLAIM-PUFFER), ein Claimer gleichzeitig
+        self._claim_lock = threading.Lock()
+        self._buffer: Deque[Job] = deque()
+        self._waiting = 0
+
+        # Scorer V2: Embedding Model vor dem Thread-Start bereitstellen
+        # (Embedding Server oder einmal lokal laden statt im ersten Job)
+        if os.getenv("SYNTX_SCORER_V2", "false").lower() == "true":
+            from syntex_injector.syntex.analysis.embeddings import warmup
+            print(f"🔥 Embedding Model: {warmup()}")
+
+        self.consumers = []
+        for i in range(max(1, workers)):
+            consumer = QueueConsumer(wrapper_name, worker_id=f"{self.pool_id}_w{i + 1}")
+            consumer.calibrator.client = BoundedClient(consumer.calibrator.client, self._inflight)
+            self.consumers.append(consumer)
+
+        print(f"🧵 Consumer Pool [{self.pool_id}] ready "
+              f"({len(self.consumers)} workers, max {self.max_inflight} in-flight)")
+
+    def _take_slot(self) -> bool:
+        """Reserviert einen Job aus dem Budget"""
+        with self._lock:
+            if self._remaining <= 0:
+                return False
+            self._remaining -= 1
+            return True
+
+    def _release_slot(self) -> None:
+        """Gibt reservierten Slot zurück (Queue war leer)"""
+        with self._lock:
+            self._remaining += 1
+
+    def _next_job(self, consumer: QueueConsumer) -> Optional[Job]:
+        """
+        Job aus dem Pool-Puffer, sonst Claim für alle gerade wartenden Worker
+
+        Wartende Worker haben ihren Budget-Slot schon → der Claim bleibt
+        innerhalb des Budgets, und jeder gepufferte Job hat einen Worker,
+        der ihn direkt nach dem Claim-Lock übernimmt
+        """
+        with self._lock:
+            self._waiting += 1
+        try:
+            with self._claim_lock:
+                with self._lock:
+                    if self._buffer:
+                        return self._buffer.popleft()
+                    limit = min(CONSUMER_CLAIM_BATCH, self._waiting)
+                jobs = consumer.claim_jobs(limit)
+                if not jobs:
+                    return None
+                with self._lock:
+                    self._buffer.extend(jobs[1:])
+                return jobs[0]
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    def _run_worker(self, consumer: QueueConsumer, stats: Dict) -> None:
+        """Worker-Loop: Job holen → verarbeiten, bis Queue leer / Budget weg"""
+        while self._take_slot():
+            job = self._next_job(consumer)
+            if not job:
+                self._release_slot()
+                break
+
+            job_start = time.time()
+            try:
+                success = consumer.process_job(job)
+            except Exception as e:
+                # process_job fängt selbst ab - hier nur gegen Thread-Tod
+                print(f"❌ [{consumer.worker_id}] Unerwarteter Fehler: {e}")
+                success = False
+            stats['busy_seconds'] += time.time() - job_start
+
+            stats['total'] += 1
+            if success:
+                stats['processed'] += 1
+            else:
+                stats['failed'] += 1
+
+    def process_batch(self, batch_size: int = CONSUMER_BATCH_SIZE) -> dict:
+        """
+        Verarbeitet bis zu batch_size Jobs mit allen Workern parallel
+
+        === RETURNS ===
+        dict wie QueueConsumer.process_batch, plus:
+        - workers: {worker_id: {processed, failed, total, busy_seconds, jobs_per_minute}}
+        - jobs_per_minute: Durchsatz des ganzen Pools
+        """
+        start_time = datetime.now()
+        self._remaining = batch_size
+
+        print(f"\n🚀 Starting pool batch (max: {batch_size} jobs, "
+              f"{len(self.consumers)} workers, wrapper: {self.wrapper_name})\n")
+
+        worker_stats = {
+            consumer.worker_id: {'processed': 0, 'failed': 0, 'total': 0, 'busy_seconds': 0.0}
+            for consumer in self.consumers
+        }
+
+        threads = [
+            threading.Thread(
+                target=self._run_worker,
+                args=(consumer, worker_stats[consumer.worker_id]),
+                name=consumer.worker_id,
+                daemon=True
+            )
+            for consumer in self.consumers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Nur zur Sicherheit: übrig gebliebene Claims nicht bis zum Lease-Ablauf blockieren
+        with self._lock:
+            leftover = list(self._buffer)
+            self._buffer.clear()
+        if leftover:
+            self.consumers[0].return_jobs(leftover)
+
+        duration = (datetime.now() - start_time).total_seconds()
+
+        for ws in worker_stats.values():
+            ws['busy_seconds'] = round(ws['busy_seconds'], 1)
+            ws['jobs_per_minute'] = round(ws['total'] / duration * 60, 2) if duration > 0 else 0
+
+        stats = {
+            'processed': sum(ws['processed'] for ws in worker_stats.values()),
+            'failed': sum(ws['failed'] for ws in worker_stats.values()),
+            'total': sum(ws['total'] for ws in worker_stats.values()),
+            'duration_seconds': duration,
+            'workers': worker_stats
+        }
+        stats['jobs_per_minute'] = round(stats['total'] / duration * 60, 2) if duration > 0 else 0
+
+        # Summary
+        print(f"\n{'='*60}")
+        print(f"POOL BATCH COMPLETE")
+        print(f"{'='*60}")
+        for worker_id, ws in worker_stats.items():
+            print(f"{worker_id}: {ws['processed']} ok / {ws['failed']} failed "
+                  f"({ws['jobs_per_minute']} jobs/min, busy {ws['busy_seconds']}s)")
+        print(f"Processed: {stats['processed']}")
+        print(f"Failed: {stats['failed']}")
+        print(f"Total: {stats['total']}")
+        print(f"Duration: {duration:.1f}s ({stats['jobs_per_minute']} jobs/min)")
+        print(f"{'='*60}\n")
+
+        return stats
+
+
+# === MAIN BLOCK ===
+# python3 -m queue_system.core.consumer_pool [wrapper] [workers] [batch_size]
+if __name__ == "__main__":
+    import json
+    import sys
+
+    wrapper = sys.argv[1] if len(sys.argv) > 1 else "human"
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else CONSUMER_MAX_WORKERS
+    batch_size = int(sys.argv[3]) if len(sys.argv) > 3 else CONSUMER_BATCH_SIZE
+
+    pool = ConsumerPool(wrapper, workers=workers)
+    stats = pool.process_batch(batch_size)
+
+    print(json.dumps(stats, indent=2))
@@ -6,9 +6,13 @@ import json
 import shutil
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
 
 from ..config.queue_config import *
+from .job_index import get_job_index
+from .ready_queue import get_ready_queue
+from .retry_scheduler import original_stem
+from syntex_injector.syntex.utils.blob_store import BLOB_STORE_ENABLED, get_blob_store
 
 # Job Type Hint (forward reference)
 try:
@@ -30,8 +34,12 @@ class FileHandler:
         temp_path = QUEUE_TMP / filename
         temp_path.parent.mkdir(parents=True, exist_ok=True)
         
-        with open(temp_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        if BLOB_STORE_ENABLED:
+            # Prompt einmal im Blob Store, Queue-Datei ist eine Kopie (Reflink wo möglich)
+            metadata['prompt_ref'] = get_blob_store().write_file(content, temp_path)
+        else:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
         
         meta_path = temp_path.with_suffix('.json')
         with open(meta_path, 'w', encoding='utf-8') as f:
@@ -45,6 +53,14 @@ class FileHandler:
         temp_path.rename(final_path)
         meta_path.rename(final_meta)
         
+        # Ready Queue - Consumer findet den Job ohne Directory-Scan
+        # Index ist nur Cache → Fehler dürfen den Job nicht kippen
+        if target_dir.resolve() == QUEUE_INCOMING.resolve():
+            try:
+                get_ready_queue().add(filename)
+            except Exception as e:
+                print(f"⚠️  Ready Queue update failed for {filename}: {e}")
+        
         return final_path
     
     def move_to_processed(self, job) -> Path:
@@ -71,16 +87,22 @@ class FileHandler:
         metadata['processed_at'] = datetime.now().isoformat()
         metadata['status'] = 'success'
         
-        with open(meta_path, 'w') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
-        
+        # Rename zuerst - entscheidet gegen den Reaper (FileNotFoundError
+        # → Job gehört nicht mehr uns), erst danach Metadaten am Ziel
         job_path.rename(target)
-        if meta_path.exists():
-            meta_path.rename(target_meta)
+        self._finish_meta(meta_path, target_meta, metadata)
+        
+        # Job Index updaten - API sieht Job sofort ohne Catch-up Scan
+        # Index ist nur Cache → Fehler dürfen den Job nicht kippen
+        try:
+            get_job_index().record(target_meta, metadata, state="processed")
+        except Exception as e:
+            print(f"⚠️  Job Index update failed for {target.name}: {e}")
         
         return target
     
-    def move_to_error(self, job, error_info: Dict[str, Any]) -> Path:
+    def move_to_error(self, job, error_info: Dict[str, Any],
+                      extra_metadata: Optional[Dict[str, Any]] = None) -> Path:
         """[... KOMMENTAR BLEIBT ...]"""
         # Handle both Job object and Path
         if hasattr(job, 'file_path'):
@@ -103,21 +125,32 @@ class FileHandler:
         metadata['last_error'] = error_info
         metadata['failed_at'] = datetime.now().isoformat()
         metadata['status'] = 'error'
+        if extra_metadata:
+            metadata.update(extra_metadata)
         
-        base = job_path.stem
+        # Vorherige __retryN Suffixe weg (manual_retry.sh) → job__retry2 statt job__retry1__retry2
+        base = original_stem(job_path.stem)
         new_filename = f"{base}__retry{retry_count}.txt"
         
         target = QUEUE_ERROR / new_filename
         target_meta = target.with_suffix('.json')
         
-        with open(meta_path, 'w') as f:
-            json.dump(metadata, f, indent=2, ensure_ascii=False)
-        
+        # Rename zuerst (siehe move_to_processed)
         job_path.rename(target)
-        meta_path.rename(target_meta)
+        self._finish_meta(meta_path, target_meta, metadata)
         
         return target
     
+    @staticmethod
+    def _finish_meta(meta_path: Path, target_meta: Path, metadata: Dict[str, Any]) -> None:
+        """Metadaten nach gewonnenem Rename am Ziel schreiben, Quelle löschen"""
+        with open(target_meta, 'w') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        try:
+            meta_path.unlink()
+        except FileNotFoundError:
+            pass
+    
     def _slugify(self, text: str) -> str:
         """[... BLEIBT GLEICH ...]"""
         text = text.lower()
@@ -0,0 +1,1005 @@
+"""
+Job Index - Persistenter SQLite-Index über processed/ und archive/
+
+=== ZWECK ===
+Jeder API-Request hat bisher processed/*.json komplett geglobbt und
+jede Datei einzeln per json.load() geparsed. Bei zehntausenden Jobs
+ist ein Dashboard-Refresh damit hunderttausende File-Opens.
+
+Der Job Index hält alle Job-Metadaten in EINER SQLite-Datei:
+- Consumer schreibt beim move_to_processed() direkt in den Index
+- API liest nur noch aus dem Index
+- Catch-up Scan hält den Index konsistent mit Dateien die von Hand
+  (queue_cleanup.sh, manual_retry.sh, archive) verschoben wurden
+
+=== CATCH-UP SCAN ===
+Pro Queue-Ordner (processed/, archive/):
+1. Directory-mtime unverändert UND letzter Full-Scan < JOB_INDEX_FULL_SCAN_SECONDS
+   → nichts zu tun (kostet einen stat())
+2. Sonst: scandir() über *.json, mtime pro Datei vergleichen
+   - neue/geänderte Dateien → json.load() + upsert
+   - verschwundene Dateien → delete
+Geöffnet werden also nur Dateien die sich wirklich geändert haben.
+
+=== SUMMARY RECORD ===
+data enthält die komplette Job-JSON inkl. syntex_result.response_text
+(mehrere KB pro Job). Analytics braucht davon nur Topic/Style/Wrapper/
+Score/Dauer/Timestamps → zusätzlich pro Job ein schlanker Summary-Record
+mit festem Schema (summary_record()). Alle Read-Methoden liefern per
+Default den Summary-Record, full=True liefert die vollständigen Metadaten
+(nur /prompts/full-text, /prompts/by-job, Export, Re-Scorer).
+
+=== KEYWORD FEATURES ===
+Beim Upsert wird die Prompt-.txt einmal durch keyword_features
+(Aho-Corasick) gezählt → Spalte features. Bereits vorhandene Features
+der aktuellen Version werden übernommen (Re-Scoring, State-Wechsel lesen
+den Prompt nicht erneut). Fehlende Vektoren älterer Index-Dateien
+rechnet der erste sync() pro State und Prozess einmal nach - Dateien
+lesen außerhalb des Locks, nie im Read-Path. Fehlt die .txt, steht ein
+Sentinel ({"v", "missing": true}) in der Spalte → kein erneuter Versuch
+bei jedem Lesen, feature_entries() lässt den Job aus.
+
+=== CONCURRENCY ===
+SQLite im WAL-Mode: ein Writer, beliebig viele Reader, auch über
+Prozessgrenzen (Consumer + API). Innerhalb eines Prozesses schützt
+ein Lock die geteilte Connection.
+
+=== VERWENDUNG ===
+    index = get_job_index()              # queue/ relativ zum CWD
+    index = get_job_index(Path("/opt/syntx-workflow-api-get-prompts/queue"))
+    jobs = index.load_jobs(("processed",))
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Iterator
+
+from ..config.queue_config import *
+from .keyword_features import extract_features, FEATURE_VERSION
+
+
+# States die der Index kennt → Unterordner in queue/
+INDEXED_STATES = ("processed", "archive")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    filename     TEXT PRIMARY KEY,
+    state        TEXT NOT NULL,
+    json_mtime   REAL NOT NULL,
+    processed_at TEXT,
+    topic        TEXT,
+    style        TEXT,
+    category     TEXT,
+    language     TEXT,
+    wrapper      TEXT,
+    score        REAL,
+    duration_ms  REAL,
+    data         TEXT NOT NULL,
+    seq          INTEGER NOT NULL DEFAULT 0,
+    summary      TEXT,
+    features     TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS deleted (
+    seq      INTEGER PRIMARY KEY,
+    filename TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state_filename ON jobs(state, filename);
+CREATE INDEX IF NOT EXISTS idx_jobs_processed_at ON jobs(processed_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_state_mtime ON jobs(state, json_mtime);
+CREATE INDEX IF NOT EXISTS idx_jobs_state_sort ON jobs(state, COALESCE(processed_at, ''), filename);
+"""
+
+# Export-Reihenfolge: neueste zuerst, Filename als Tie-Breaker (Keyset Cursor)
+_SORT_KEY = "COALESCE(processed_at, '')"
+
+# Fixes Schema des Summary-Records (alles andere bleibt nur in data)
+SUMMARY_FIELDS = (
+    "filename", "topic", "style", "category", "language", "status",
+    "created_at", "processed_at", "retry_count", "gpt_quality", "gpt_cost", "prompt_ref",
+)
+SUMMARY_RESULT_FIELDS = (
+    "quality_score", "duration_ms", "session_id", "wrapper", "worker_id",
+    "score_version", "score_format", "rescored_at", "response_text_ref",
+)
+
+
+def summary_record(metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Schlanker Record für Analytics - ohne response_text, score_history etc.
+
+    Nur vorhandene Keys werden übernommen → .get() Defaults der
+    Router greifen wie bei den vollständigen Metadaten
+    """
+    record = {key: metadata[key] for key in SUMMARY_FIELDS if key in metadata}
+    result = metadata.get('syntex_result')
+    if isinstance(result, dict):
+        record['syntex_result'] = {key: result[key] for key in SUMMARY_RESULT_FIELDS if key in result}
+    elif 'syntex_result' in metadata:
+        record['syntex_result'] = result
+    return record
+
+
+def _py_summary(data):
+    """summary_record() für SQLite (Backfill älterer Index-Dateien)"""
+    try:
+        metadata = json.loads(data)
+    except (TypeError, ValueError):
+        return None
+    if not isinstance(metadata, dict):
+        return None
+    return json.dumps(summary_record(metadata), ensure_ascii=False)
+
+
+# ISO-Timestamp (beliebig genau) → Filename-Prefix %Y%m%d_%H%M%S_%f
+_ISO_PREFIX = re.compile(
+    r"^(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2})(?::(\d{2})(?::(\d{2})(?:\.(\d{1,6}))?)?)?)?"
+)
+
+
+def _lookup_keys(job_id: str) -> Tuple[str, str]:
+    """
+    Job-ID → (exakter Filename, Prefix)
+
+    Akzeptiert: Filename (.txt/.json), Stem, Filename-Prefix
+    ("20251206_0026") und ISO-Timestamps ("2025-12-06T00:26")
+    → Filenames beginnen mit %Y%m%d_%H%M%S_%f
+    """
+    stem = job_id.strip()
+    for suffix in ('.json', '.txt'):
+        if stem.endswith(suffix):
+            stem = stem[:-len(suffix)]
+
+    prefix = stem
+    match = _ISO_PREFIX.match(stem)
+    if match:
+        date, hour, minute, second, micro = "".join(match.group(1, 2, 3)), *match.group(4, 5, 6, 7)
+        time_part = "".join(part for part in (hour, minute, second) if part)
+        prefix = date + (f"_{time_part}" if time_part else "") + (f"_{micro}" if micro else "")
+    return stem + ".txt", prefix
+
+
+# Prompt-.txt fehlte beim Berechnen - aktuelle Version, damit kein Backfill erneut liest
+_MISSING_FEATURES = json.dumps({"v": FEATURE_VERSION, "missing": True})
+
+
+def _parse_features(features: Optional[str]) -> Optional[Dict[str, Any]]:
+    """Gespeicherter Feature-Vektor → Dict, None wenn fehlend oder alte FEATURE_VERSION
+
+    Sentinel für fehlende Prompts → {"v", "missing": True}
+    """
+    if not features:
+        return None
+    try:
+        parsed = json.loads(features)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) and parsed.get("v") == FEATURE_VERSION else None
+
+
+def _data_column(full: bool) -> str:
+    """Vollständige Metadaten oder Summary (Fallback data falls noch nicht gefüllt)"""
+    return "data" if full else "COALESCE(summary, data)"
+
+
+def _py_lower(value):
+    """Python str.lower() für SQLite (lower() dort nur ASCII → Umlaute!)"""
+    return value.lower() if isinstance(value, str) else value
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.create_function("py_lower", 1, _py_lower, deterministic=True)
+    conn.create_function("py_summary", 1, _py_summary, deterministic=True)
+    return conn
+
+
+def _summary_columns(metadata: Dict[str, Any]) -> Tuple:
+    """
+    Extrahiert die Spalten die Analytics direkt brauchen
+
+    === WARUM SPALTEN ===
+    Filter/Sortierung (topic, wrapper, score, processed_at) laufen
+    direkt in SQLite statt über geparste Python-Dicts
+    """
+    result = metadata.get('syntex_result')
+    if not isinstance(result, dict):
+        result = {}
+
+    quality = result.get('quality_score')
+    score = None
+    if isinstance(quality, dict):
+        try:
+            raw = quality.get('total_score')
+            score = float(raw) if raw is not None else None
+        except (TypeError, ValueError):
+            score = None
+
+    duration = result.get('duration_ms')
+    try:
+        duration = float(duration) if duration is not None else None
+    except (TypeError, ValueError):
+        duration = None
+
+    return (
+        metadata.get('processed_at', metadata.get('created_at')),
+        metadata.get('topic'),
+        metadata.get('style'),
+        metadata.get('category'),
+        metadata.get('language'),
+        result.get('wrapper'),
+        score,
+        duration,
+    )
+
+
+class JobIndex:
+    """
+    SQLite-Index über alle abgeschlossenen Jobs
+
+    === DESIGN ===
+    - Key: Job-Filename (.txt Name des Jobs auf Disk)
+    - state: Ordner in dem der Job liegt (processed | archive)
+    - data: Vollständige Job-Metadaten als JSON
+    - summary: Summary-Record (summary_record()) als JSON - Default beim Lesen
+    - Summary-Spalten für Filter + Sortierung
+
+    === GUARANTEES ===
+    - Index ist ein Cache - Filesystem bleibt die Wahrheit
+    - Index kann jederzeit gelöscht werden, nächster Scan baut neu auf
+    """
+
+    def __init__(self, queue_base: Path = QUEUE_BASE, db_path: Optional[Path] = None):
+        """
+        === ARGS ===
+        queue_base: Queue-Root (enthält processed/, archive/, ...)
+        db_path: Optional anderer Ort für die SQLite-Datei
+        """
+        self.queue_base = Path(queue_base)
+        self.db_path = Path(db_path) if db_path else self.queue_base / ".index" / JOB_INDEX_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = _connect(self.db_path)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._migrate()
+            self._conn.commit()
+
+        # Catch-up Scan State pro Ordner
+        self._dir_mtime: Dict[str, float] = {}
+        self._last_full_scan: Dict[str, float] = {}
+        # States deren Feature-Backfill in diesem Prozess schon lief
+        self._features_backfilled: set = set()
+
+    def _migrate(self) -> None:
+        """Ergänzt Spalten die ältere Index-Dateien noch nicht haben"""
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if 'seq' not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN seq INTEGER NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_seq ON jobs(seq)")
+        if 'summary' not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN summary TEXT")
+            # Einmaliger Backfill aus data - danach schreibt _upsert() beides
+            self._conn.execute("UPDATE jobs SET summary = py_summary(data)")
+        if 'features' not in columns:
+            # Kein Backfill hier - der erste sync() pro State rechnet nach
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN features TEXT")
+
+    # ========================================================================
+    # CHANGE SEQUENCE
+    # ========================================================================
+    # Jede Änderung bekommt eine monoton steigende Sequenznummer
+    # → In-Memory Caches (AnalyticsSnapshot) holen nur Deltas
+    # Löschungen/State-Wechsel merken sich ihre Sequenz in meta.delete_seq
+    # → Cache weiß, dass er neu aufbauen muss
+    # Echte Löschungen landen zusätzlich als Tombstone in `deleted`
+    # → abgeleitete Indizes (Search Index) löschen inkrementell
+
+    def _next_seq(self) -> int:
+        """Nächste Sequenznummer (innerhalb der laufenden Transaktion)"""
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('seq', 0)")
+        self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'seq'")
+        return self._conn.execute("SELECT value FROM meta WHERE key = 'seq'").fetchone()[0]
+
+    def _mark_delete(self) -> None:
+        """Merkt sich, dass seit jetzt Einträge verschwunden sind"""
+        seq = self._next_seq()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('delete_seq', ?)", (seq,)
+        )
+
+    def _tombstone(self, filename: str) -> None:
+        """Job ist aus dem Index verschwunden (innerhalb der laufenden Transaktion)"""
+        self._conn.execute("INSERT INTO deleted (seq, filename) VALUES (?, ?)",
+                           (self._next_seq(), filename))
+
+    def _prune_tombstones(self) -> None:
+        """Älteste Tombstones weg, tombstone_floor merkt sich bis wohin"""
+        count = self._conn.execute("SELECT COUNT(*) FROM deleted").fetchone()[0]
+        if count <= JOB_INDEX_MAX_TOMBSTONES:
+            return
+        floor = self._conn.execute(
+            "SELECT seq FROM deleted ORDER BY seq DESC LIMIT 1 OFFSET ?",
+            (JOB_INDEX_MAX_TOMBSTONES // 2,)
+        ).fetchone()[0]
+        self._conn.execute("DELETE FROM deleted WHERE seq <= ?", (floor,))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('tombstone_floor', ?)", (floor,)
+        )
+
+    def _meta(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def changes_since(self, since_seq: int, full: bool = False) -> Tuple[int, int, List[Tuple[str, str, Dict[str, Any]]]]:
+        """
+        Alle Einträge die seit since_seq geschrieben wurden
+
+        === ARGS ===
+        full: Vollständige Metadaten statt Summary-Record
+
+        === RETURNS ===
+        (current_seq, delete_seq, [(filename, state, metadata), ...])
+        delete_seq > since_seq → Caller muss komplett neu aufbauen
+        """
+        with self._lock:
+            current_seq = self._meta('seq')
+            delete_seq = self._meta('delete_seq')
+            rows = self._conn.execute(
+                f"SELECT filename, state, {_data_column(full)} AS data FROM jobs "
+                f"WHERE seq > ? ORDER BY filename",
+                (since_seq,)
+            ).fetchall()
+
+        result = []
+        for row in rows:
+            try:
+                result.append((row['filename'], row['state'], json.loads(row['data'])))
+            except ValueError:
+                continue
+        return current_seq, delete_seq, result
+
+    def file_events_since(self, since_seq: int) -> Tuple[int, List[Tuple[int, str, str, float, Optional[str]]],
+                                                          Optional[List[Tuple[int, str]]]]:
+        """
+        Wie changes_since(), aber nur Ort + mtime - ohne JSON zu dekodieren,
+        plus Löschungen seit since_seq
+
+        === RETURNS ===
+        (current_seq,
+         [(seq, filename, state, json_mtime, language), ...],
+         [(seq, filename), ...] oder None wenn die Tombstones schon
+         aufgeräumt sind → Caller gleicht per locations() ab)
+        """
+        with self._lock:
+            current_seq = self._meta('seq')
+            rows = self._conn.execute(
+                "SELECT seq, filename, state, json_mtime, language FROM jobs WHERE seq > ? ORDER BY seq",
+                (since_seq,)
+            ).fetchall()
+            if since_seq < self._meta('tombstone_floor'):
+                deletions = None
+            else:
+                deletions = [tuple(row) for row in self._conn.execute(
+                    "SELECT seq, filename FROM deleted WHERE seq > ? ORDER BY seq", (since_seq,)
+                )]
+        return current_seq, [tuple(row) for row in rows], deletions
+
+    def locations(self) -> Dict[str, str]:
+        """{filename: state} aller indizierten Jobs (Abgleich für abgeleitete Indizes)"""
+        with self._lock:
+            return {row['filename']: row['state'] for row in self._conn.execute("SELECT filename, state FROM jobs")}
+
+    # ========================================================================
+    # WRITE PATH
+    # ========================================================================
+
+    def record(self, json_path: Path, metadata: Dict[str, Any], state: str = "processed") -> None:
+        """
+        Schreibt/aktualisiert einen Job im Index
+
+        === VERWENDUNG ===
+        FileHandler.move_to_processed() ruft das direkt nach dem Rename
+        → API sieht den Job sofort, ohne Catch-up Scan
+
+        === ARGS ===
+        json_path: Path zur Metadata-Datei (an ihrem finalen Ort)
+        metadata: Bereits geladene Metadaten
+        state: Queue-Ordner in dem der Job liegt
+        """
+        json_path = Path(json_path)
+        try:
+            mtime = json_path.stat().st_mtime
+        except FileNotFoundError:
+            mtime = 0.0
+
+        with self._lock:
+            self._upsert(json_path.stem + ".txt", state, mtime, metadata)
+            self._conn.commit()
+
+    def record_many(self, entries: Iterable[Tuple[Path, Dict[str, Any], str]]) -> int:
+        """
+        Wie record() für viele Jobs - EIN Commit statt einem pro Job
+
+        === VERWENDUNG ===
+        Bulk Re-Scorer schreibt chunkweise zurück
+
+        === ARGS ===
+        entries: (json_path, metadata, state) Tupel
+
+        === RETURNS ===
+        int: Anzahl geschriebener Einträge
+        """
+        rows = []
+        for json_path, metadata, state in entries:
+            json_path = Path(json_path)
+            try:
+                mtime = json_path.stat().st_mtime
+            except FileNotFoundError:
+                mtime = 0.0
+            rows.append((json_path.stem + ".txt", state, mtime, metadata))
+
+        with self._lock:
+            for filename, state, mtime, metadata in rows:
+                self._upsert(filename, state, mtime, metadata)
+            self._conn.commit()
+        return len(rows)
+
+    def move(self, filename: str, state: str) -> None:
+        """Aktualisiert den State eines Jobs (z.B. processed → archive)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET state = ?, seq = ? WHERE filename = ?",
+                (state, self._next_seq(), filename)
+            )
+            self._mark_delete()
+            self._conn.commit()
+
+    def forget(self, filename: str) -> None:
+        """Entfernt einen Job aus dem Index"""
+        with self._lock:
+            if self._conn.execute("DELETE FROM jobs WHERE filename = ?", (filename,)).rowcount:
+                self._tombstone(filename)
+            self._mark_delete()
+            self._conn.commit()
+
+    def _upsert(self, filename: str, state: str, mtime: float, metadata: Dict[str, Any]) -> None:
+        """INSERT OR REPLACE ohne Commit (Caller committed)"""
+        row = self._conn.execute("SELECT features FROM jobs WHERE filename = ?", (filename,)).fetchone()
+        parsed = _parse_features(row['features']) if row else None
+        # Sentinel nicht übernehmen - vielleicht liegt der Prompt inzwischen da
+        features = row['features'] if parsed and not parsed.get("missing") else None
+        if features is None:
+            features = self._compute_features(filename, state)
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO jobs "
+            "(filename, state, json_mtime, processed_at, topic, style, category, "
+            " language, wrapper, score, duration_ms, data, seq, summary, features) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (filename, state, mtime) + _summary_columns(metadata)
+            + (json.dumps(metadata, ensure_ascii=False), self._next_seq(),
+               json.dumps(summary_record(metadata), ensure_ascii=False), features)
+        )
+
+    def _compute_features(self, filename: str, state: str) -> str:
+        """Keyword-Features aus queue/<state>/<filename> (JSON) - Sentinel wenn der Prompt fehlt"""
+        try:
+            with open(self.queue_base / state / filename, 'r', encoding='utf-8') as f:
+                text = f.read()
+        except (OSError, UnicodeDecodeError):
+            return _MISSING_FEATURES
+        return json.dumps(extract_features(text), ensure_ascii=False)
+
+    def _backfill_features(self, state: str) -> int:
+        """
+        Einmal pro State und Prozess: fehlende/veraltete Feature-Vektoren nachrechnen
+
+        Prompts werden außerhalb des Locks gelesen, geschrieben wird in
+        Batches. Nur Zeilen deren features sich seitdem nicht geändert
+        haben werden überschrieben (ein paralleler _upsert gewinnt).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename, features FROM jobs WHERE state = ?", (state,)
+            ).fetchall()
+        stale = [(row['filename'], row['features']) for row in rows
+                 if _parse_features(row['features']) is None]
+
+        for start in range(0, len(stale), JOB_INDEX_BACKFILL_BATCH):
+            chunk = stale[start:start + JOB_INDEX_BACKFILL_BATCH]
+            updates = [(self._compute_features(filename, state), filename, state, old)
+                       for filename, old in chunk]
+            with self._lock:
+                self._conn.executemany(
+                    "UPDATE jobs SET features = ? WHERE filename = ? AND state = ? "
+                    "AND features IS ?", updates)
+                self._conn.commit()
+
+        self._features_backfilled.add(state)
+        return len(stale)
+
+    # ========================================================================
+    # CATCH-UP SCAN
+    # ========================================================================
+
+    def sync(self, state: str = "processed", force: bool = False) -> int:
+        """
+        Gleicht den Index mit dem Ordner queue/<state>/ ab
+
+        === ABLAUF ===
+        1. Directory-mtime Check (billig) → evtl. Early Return
+        2. scandir() *.json → {filename: mtime}
+        3. Neue/geänderte Dateien laden, verschwundene löschen
+
+        === ARGS ===
+        state: "processed" | "archive"
+        force: Full-Scan erzwingen
+
+        === RETURNS ===
+        int: Anzahl geänderter Index-Einträge
+        """
+        if state not in self._features_backfilled:
+            self._backfill_features(state)
+
+        directory = self.queue_base / state
+        try:
+            dir_mtime = directory.stat().st_mtime
+        except FileNotFoundError:
+            dir_mtime = None
+
+        now = time.time()
+        if (not force
+                and dir_mtime is not None
+                and self._dir_mtime.get(state) == dir_mtime
+                and now - self._last_full_scan.get(state, 0) < JOB_INDEX_FULL_SCAN_SECONDS):
+            return 0
+
+        on_disk: Dict[str, Tuple[str, float]] = {}
+        if dir_mtime is not None:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except FileNotFoundError:
+                        continue
+                    on_disk[entry.name[:-5] + ".txt"] = (entry.path, mtime)
+
+        changed = 0
+        with self._lock:
+            indexed = {
+                row['filename']: row['json_mtime']
+                for row in self._conn.execute(
+                    "SELECT filename, json_mtime FROM jobs WHERE state = ?", (state,)
+                )
+            }
+
+            # Neue oder geänderte Dateien
+            for filename, (path, mtime) in on_disk.items():
+                if indexed.get(filename) == mtime:
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        metadata = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if not isinstance(metadata, dict):
+                    continue
+                self._upsert(filename, state, mtime, metadata)
+                changed += 1
+
+            # Verschwundene Dateien
+            vanished = indexed.keys() - on_disk.keys()
+            for filename in vanished:
+                # Nur wenn wirklich gelöscht - liegt der Job inzwischen in
+                # einem anderen State, ist er nicht weg (kein Tombstone)
+                if self._conn.execute(
+                    "DELETE FROM jobs WHERE filename = ? AND state = ?", (filename, state)
+                ).rowcount:
+                    self._tombstone(filename)
+                changed += 1
+            if vanished:
+                self._mark_delete()
+                self._prune_tombstones()
+
+            self._conn.commit()
+
+        self._dir_mtime[state] = dir_mtime
+        self._last_full_scan[state] = now
+        return changed
+
+    # ========================================================================
+    # READ PATH
+    # ========================================================================
+
+    def entries(self, states: Iterable[str] = ("processed",),
+                full: bool = False) -> List[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Alle Jobs der angegebenen States, sortiert nach Filename
+
+        === ARGS ===
+        full: Vollständige Metadaten statt Summary-Record
+
+        === RETURNS ===
+        List von (filename, state, metadata)
+        Filename = .txt Name → Prompt liegt unter queue/<state>/<filename>
+        """
+        states = tuple(states)
+        for state in states:
+            self.sync(state)
+
+        placeholders = ",".join("?" * len(states))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT filename, state, {_data_column(full)} AS data FROM jobs "
+                f"WHERE state IN ({placeholders}) "
+                f"ORDER BY filename",
+                states
+            ).fetchall()
+
+        result = []
+        for row in rows:
+            try:
+                result.append((row['filename'], row['state'], json.loads(row['data'])))
+            except ValueError:
+                continue
+        return result
+
+    def feature_entries(self, states: Iterable[str] = ("processed",)) -> List[Tuple[str, str, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Jobs mit Keyword-Features, sortiert nach Filename
+
+        === VERWENDUNG ===
+        Keyword-Endpoints (advanced + evolution API) aggregieren darüber,
+        statt jede Prompt-.txt zu öffnen
+
+        === RETURNS ===
+        List von (filename, state, summary, features)
+        features = {"v", "length", "counts": {keyword: n}}
+        Jobs ohne Prompt-Datei fehlen (wie früher: .txt fehlt → übersprungen)
+
+        Reiner Index-Read - Features rechnen _upsert() und der Backfill in sync()
+        """
+        states = tuple(states)
+        for state in states:
+            self.sync(state)
+
+        placeholders = ",".join("?" * len(states))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT filename, state, {_data_column(False)} AS data, features FROM jobs "
+                f"WHERE state IN ({placeholders}) ORDER BY filename",
+                states
+            ).fetchall()
+
+        result = []
+        for row in rows:
+            features = _parse_features(row['features'])
+            if features is None or features.get("missing"):
+                continue
+            try:
+                result.append((row['filename'], row['state'], json.loads(row['data']), features))
+            except ValueError:
+                continue
+        return result
+
+    def load_jobs(self, states: Iterable[str] = ("processed",), full: bool = False) -> List[Dict[str, Any]]:
+        """Nur die Metadaten-Dicts (Ersatz für glob + json.load)"""
+        return [data for _, _, data in self.entries(states, full)]
+
+    def recent(self, state: str = "processed", limit: int = 10,
+               since_mtime: Optional[float] = None,
+               full: bool = False) -> List[Tuple[str, float, Dict[str, Any]]]:
+        """
+        Zuletzt geschriebene Jobs (nach JSON-mtime, neueste zuerst)
+
+        === ARGS ===
+        limit: Maximale Anzahl (None = alle)
+        since_mtime: Nur Jobs mit json_mtime > since_mtime
+        full: Vollständige Metadaten statt Summary-Record
+
+        === RETURNS ===
+        List von (filename, json_mtime, metadata)
+        """
+        self.sync(state)
+        query = f"SELECT filename, json_mtime, {_data_column(full)} AS data FROM jobs WHERE state = ?"
+        params: List[Any] = [state]
+        if since_mtime is not None:
+            query += " AND json_mtime > ?"
+            params.append(since_mtime)
+        query += " ORDER BY json_mtime DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        result = []
+        for row in rows:
+            try:
+                result.append((row['filename'], row['json_mtime'], json.loads(row['data'])))
+            except ValueError:
+                continue
+        return result
+
+    def count_since(self, state: str, since_mtime: float) -> int:
+        """Anzahl Jobs mit json_mtime > since_mtime (z.B. Jobs pro Stunde)"""
+        self.sync(state)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = ? AND json_mtime > ?",
+                (state, since_mtime)
+            ).fetchone()[0]
+
+    @staticmethod
+    def _filter_clause(state: str, min_score: Optional[float], topic: Optional[str],
+                       wrapper: Optional[str]) -> Tuple[str, List[Any]]:
+        """WHERE-Klausel für Export-Filter (Semantik wie die alten Python-Filter)"""
+        clauses, params = ["state = ?"], [state]
+        if min_score:
+            clauses.append("COALESCE(score, 0) >= ?")
+            params.append(min_score)
+        if topic:
+            clauses.append("py_lower(topic) = ?")
+            params.append(topic.lower())
+        if wrapper:
+            clauses.append("py_lower(wrapper) = ?")
+            params.append(wrapper.lower())
+        return " AND ".join(clauses), params
+
+    def count_matching(self, state: str = "processed", min_score: Optional[float] = None,
+                       topic: Optional[str] = None, wrapper: Optional[str] = None) -> int:
+        """Anzahl Jobs die den Export-Filtern entsprechen"""
+        self.sync(state)
+        where, params = self._filter_clause(state, min_score, topic, wrapper)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM jobs WHERE {where}", params).fetchone()[0]
+
+    def iter_sorted(
+        self,
+        state: str = "processed",
+        min_score: Optional[float] = None,
+        topic: Optional[str] = None,
+        wrapper: Optional[str] = None,
+        after: Optional[Tuple[str, str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        full: bool = False
+    ) -> Iterator[Tuple[str, Tuple[str, str], Dict[str, Any]]]:
+        """
+        Streamt Jobs sortiert nach processed_at DESC, filename DESC
+
+        === KEYSET PAGINATION ===
+        after = Sort-Key des letzten gelieferten Jobs (Cursor)
+        → nächste Seite startet direkt dahinter, egal wie tief
+
+        === KONSTANTER SPEICHER ===
+        Eigene Read-Connection (WAL: blockiert keine Writer) + fetchmany
+        → es liegen nie mehr als ein paar hundert Rows im Speicher
+        Generator kann über Threads hinweg konsumiert werden (StreamingResponse)
+
+        full=True → vollständige Metadaten statt Summary-Record
+
+        === YIELDS ===
+        (filename, sort_key, metadata) - sort_key als Cursor für die nächste Seite
+        """
+        self.sync(state)
+        where, params = self._filter_clause(state, min_score, topic, wrapper)
+        if after is not None:
+            where += f" AND ({_SORT_KEY}, filename) < (?, ?)"
+            params += list(after)
+        query = (
+            f"SELECT filename, {_SORT_KEY} AS sort_key, {_data_column(full)} AS data "
+            f"FROM jobs WHERE {where} "
+            f"ORDER BY {_SORT_KEY} DESC, filename DESC"
+        )
+        if limit is not None or offset:
+            query += " LIMIT ? OFFSET ?"
+            params += [limit if limit is not None else -1, offset]
+
+        conn = _connect(self.db_path)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(200)
+                if not rows:
+                    break
+                for row in rows:
+                    try:
+                        data = json.loads(row['data'])
+                    except ValueError:
+                        continue
+                    yield row['filename'], (row['sort_key'], row['filename']), data
+        finally:
+            conn.close()
+
+    # ========================================================================
+    # SINGLE JOB LOOKUP
+    # ========================================================================
+
+    def get(self, filename: str, full: bool = True) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Ein Job per Filename (Primary Key, O(1)) - ohne Catch-up Scan
+
+        === RETURNS ===
+        (filename, state, metadata) oder None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT filename, state, {_data_column(full)} AS data FROM jobs WHERE filename = ?",
+                (filename,)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            return row['filename'], row['state'], json.loads(row['data'])
+        except ValueError:
+            return None
+
+    def lookup(self, job_id: str, states: Iterable[str] = INDEXED_STATES,
+               full: bool = True) -> Optional[Tuple[str, str, Dict[str, Any]]]:
+        """
+        Job per ID - exakt, Prefix/Timestamp oder (Fallback) Teilstring
+
+        === REIHENFOLGE ===
+        1. Exakter Filename (.txt/.json/Stem) → Primary Key
+        2. Filename-Prefix bzw. ISO-Timestamp → Range-Scan auf dem PK,
+           neuester Treffer
+        3. Teilstring im Filename (altes /by-job Verhalten) → nur die
+           filename-Spalte, keine JSON-Dekodierung
+
+        === ARGS ===
+        job_id: Filename, Stem, Prefix oder Timestamp
+        states: Ordner in denen gesucht wird (default processed + archive)
+        full: Vollständige Metadaten statt Summary-Record
+
+        === RETURNS ===
+        (filename, state, metadata) oder None
+
+        === SYNC ===
+        Erst der Index (Consumer/Archivierung schreiben direkt hinein),
+        Catch-up Scan der Ordner NUR bei einem Miss
+        """
+        if not job_id or not job_id.strip():
+            return None
+        states = tuple(states)
+
+        filename = self._find(job_id, states)
+        if filename is None:
+            for state in states:
+                self.sync(state)
+            filename = self._find(job_id, states)
+        if filename is None:
+            return None
+        return self.get(filename, full)
+
+    def _find(self, job_id: str, states: Tuple[str, ...]) -> Optional[str]:
+        """Filename zu einer Job-ID (exakt → Prefix → Teilstring), ohne Sync"""
+        exact, prefix = _lookup_keys(job_id)
+        placeholders = ",".join("?" * len(states))
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT filename FROM jobs WHERE filename = ? AND state IN ({placeholders})",
+                (exact,) + states
+            ).fetchone()
+            if row is None:
+                # Prefix: [prefix, prefix + U+FFFF) nutzt den PK-Index
+                row = self._conn.execute(
+                    f"SELECT filename FROM jobs WHERE filename >= ? AND filename < ? "
+                    f"AND state IN ({placeholders}) ORDER BY filename DESC LIMIT 1",
+                    (prefix, prefix + "\uffff") + states
+                ).fetchone()
+                if row is None:
+                    row = self._conn.execute(
+                        f"SELECT filename FROM jobs WHERE instr(filename, ?) > 0 "
+                        f"AND state IN ({placeholders}) ORDER BY {_SORT_KEY} DESC LIMIT 1",
+                        (job_id.strip(),) + states
+                    ).fetchone()
+        return row['filename'] if row is not None else None
+
+    def move_many(self, filenames: Iterable[str], state: str) -> int:
+        """Wie move() für viele Jobs - EIN Commit (z.B. Archivierung)"""
+        filenames = list(filenames)
+        if not filenames:
+            return 0
+        with self._lock:
+            for filename in filenames:
+                self._conn.execute(
+                    "UPDATE jobs SET state = ?, seq = ? WHERE filename = ?",
+                    (state, self._next_seq(), filename)
+                )
+            self._mark_delete()
+            self._conn.commit()
+        return len(filenames)
+
+    def count(self, state: str = "processed") -> int:
+        """Anzahl Jobs in einem State"""
+        self.sync(state)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state = ?", (state,)
+            ).fetchone()[0]
+
+    def count_processed_between(self, since: str, until: str,
+                                states: Iterable[str] = INDEXED_STATES) -> int:
+        """Jobs mit since < processed_at <= until (ISO-Strings, Vergleich lexikografisch)"""
+        states = list(states)
+        for state in states:
+            self.sync(state)
+        placeholders = ",".join("?" * len(states))
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM jobs WHERE state IN ({placeholders}) "
+                f"AND processed_at > ? AND processed_at <= ?",
+                states + [since, until]
+            ).fetchone()[0]
+
+    def score_histogram(self, state: str, bounds: Iterable[float]) -> Dict[str, Tuple[List[int], int, float]]:
+        """
+        Score-Verteilung pro Wrapper in EINER Aggregat-Query (Prometheus Histogramm)
+
+        Returns:
+            wrapper → (kumulative Counts je Bound, Anzahl gescorter Jobs, Score-Summe)
+        """
+        bounds = list(bounds)
+        self.sync(state)
+        buckets = "".join(", SUM(score <= ?)" for _ in bounds)
+        query = (
+            f"SELECT COALESCE(wrapper, 'unknown'), COUNT(score), COALESCE(SUM(score), 0){buckets} "
+            f"FROM jobs WHERE state = ? GROUP BY 1"
+        )
+        with self._lock:
+            rows = self._conn.execute(query, bounds + [state]).fetchall()
+        return {
+            row[0]: ([int(n or 0) for n in tuple(row)[3:]], int(row[1]), float(row[2]))
+            for row in rows
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Ein Index pro Queue-Root und Prozess
+_indexes: Dict[str, JobIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_job_index(queue_base: Path = QUEUE_BASE) -> JobIndex:
+    """
+    Prozessweiter JobIndex für einen Queue-Root
+
+    === WARUM SINGLETON ===
+    Catch-up State (Directory-mtimes) lebt im Objekt
+    → alle Router eines Prozesses teilen sich denselben Scan
+    """
+    key = str(Path(queue_base).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = JobIndex(Path(queue_base))
+        return _indexes[key]
+
+
+# === MAIN BLOCK ===
+if __name__ == "__main__":
+    index = get_job_index()
+
+    start = time.time()
+    for state in INDEXED_STATES:
+        changed = index.sync(state, force=True)
+        print(f"{state}: {index.count(state)} Jobs ({changed} aktualisiert)")
+    print(f"Sync: {(time.time() - start) * 1000:.1f}ms")
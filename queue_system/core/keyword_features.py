@@ -0,0 +1,171 @@
+"""
+Keyword Features - SYNTX Keyword-Zählungen einmal pro Job (Aho-Corasick)
+
+=== ZWECK ===
+keyword_combinations, templates_by_score, predict_score (advanced API)
+und syntx-vs-normal, keywords/power, topics/resonance (evolution API)
+haben pro Request jede Prompt-.txt geöffnet und je Keyword ein
+lower().count() bzw. Regex laufen lassen → O(Jobs × Keywords × Textlänge)
+
+Jetzt: EIN Durchlauf pro Text über einen Aho-Corasick-Automaten mit
+allen Keywords beider APIs. Der Job Index speichert das Ergebnis
+(Spalte features) beim Ingest, die Endpoints aggregieren nur noch.
+
+=== SEMANTIK ===
+Zählung wie str.count() auf text.lower() - Treffer in längeren Wörtern
+zählen mit ("drift" in "driftkörper"), keines der Keywords überlappt
+sich selbst → Ergebnis identisch zu den alten count()-Aufrufen
+
+=== VERSION ===
+FEATURE_VERSION erhöhen wenn sich KEYWORDS ändert → Job Index rechnet
+veraltete Vektoren beim nächsten Lesen neu
+"""
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+FEATURE_VERSION = 1
+
+# Alle Keywords aus prompts_advanced_api.extract_keywords/keyword_combinations
+# und evolution_api.extract_syntx_keywords/is_syntx_prompt
+KEYWORDS = (
+    "tier-", "tier-1", "tier-2", "tier-3", "tier-4",
+    "drift", "driftkörper", "driftkorper",
+    "kalibrierung", "strömung", "stromung",
+    "resonanz", "resonanzfeld", "feld", "feldebene",
+    "system", "mechanismus", "struktur",
+    "semantische einheit", "bedeutungsströme", "bedeutungsstrom",
+    "kohärenz", "fluss", "schwingung",
+)
+
+# evolution_api: is_syntx_prompt() / extract_syntx_keywords() (Reihenfolge bleibt)
+SYNTX_MARKERS = (
+    "resonanzfeld", "resonanz", "driftkörper", "drift",
+    "semantische einheit", "bedeutungsströme", "bedeutungsstrom",
+    "feldebene", "feld", "kohärenz", "kalibrierung",
+    "tier-1", "tier-2", "tier-3", "tier-4",
+)
+SYNTX_KEYWORDS = SYNTX_MARKERS + ("strömung", "fluss", "schwingung")
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick Automat (reines Python, einmal pro Prozess gebaut)
+
+    Zustände als Liste von Dicts: goto[state][char] → state
+    fail[state] → längster echter Suffix, der auch ein Präfix ist
+    out[state] → Keywords die in diesem Zustand enden (inkl. Fail-Kette)
+    """
+
+    def __init__(self, keywords: Tuple[str, ...]):
+        self.keywords = keywords
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        outputs: List[List[int]] = [[]]
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    outputs.append([])
+                state = nxt
+            outputs[state].append(index)
+
+        # BFS: Fail-Links + Outputs der Fail-Kette übernehmen
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                outputs[nxt].extend(outputs[self._fail[nxt]])
+        self._out = [tuple(o) for o in outputs]
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Keyword → Anzahl (nur Keywords mit Treffern)"""
+        goto, fail, out = self._goto, self._fail, self._out
+        counts = [0] * len(self.keywords)
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in out[state]:
+                counts[index] += 1
+        return {keyword: n for keyword, n in zip(self.keywords, counts) if n}
+
+
+_automaton: Optional[KeywordAutomaton] = None
+
+
+def extract_features(text: str) -> Dict:
+    """
+    Feature-Vektor eines Prompts
+
+    Returns:
+        {"v": FEATURE_VERSION, "length": len(text), "counts": {keyword: n}}
+    """
+    global _automaton
+    if _automaton is None:
+        _automaton = KeywordAutomaton(KEYWORDS)
+    return {"v": FEATURE_VERSION, "length": len(text), "counts": _automaton.count(text.lower())}
+
+
+# ============================================================================
+# ABLEITUNGEN FÜR DIE ENDPOINTS (gleiche Semantik wie die alten Helfer)
+# ============================================================================
+
+def syntx_keywords(counts: Dict[str, int]) -> List[str]:
+    """evolution_api.extract_syntx_keywords() aus gespeicherten Counts"""
+    return [keyword for keyword in SYNTX_KEYWORDS if counts.get(keyword)]
+
+
+def is_syntx(counts: Dict[str, int]) -> bool:
+    """evolution_api.is_syntx_prompt() aus gespeicherten Counts"""
+    return any(counts.get(keyword) for keyword in SYNTX_MARKERS)
+
+
+def advanced_keywords(counts: Dict[str, int]) -> Dict[str, int]:
+    """prompts_advanced_api.extract_keywords() aus gespeicherten Counts"""
+    return {
+        'tier': sum(counts.get(f"tier-{n}", 0) for n in range(1, 5)),
+        'drift': counts.get('drift', 0),
+        'driftkörper': counts.get('driftkörper', 0),
+        'kalibrierung': counts.get('kalibrierung', 0),
+        'strömung': counts.get('strömung', 0),
+        'stromung': counts.get('stromung', 0),
+        'resonanz': counts.get('resonanz', 0),
+        'feld': counts.get('feld', 0),
+        'system': counts.get('system', 0),
+        'mechanismus': counts.get('mechanismus', 0),
+        'struktur': counts.get('struktur', 0),
+    }
+
+
+def present_keywords(counts: Dict[str, int]) -> List[str]:
+    """prompts_advanced_api.keyword_combinations(): vorhandene Keywords"""
+    present = []
+    if counts.get('tier-'):
+        present.append('tier')
+    if counts.get('driftkörper') or counts.get('driftkorper'):
+        present.append('driftkörper')
+    if counts.get('drift') and 'driftkörper' not in present:
+        present.append('drift')
+    if counts.get('kalibrierung'):
+        present.append('kalibrierung')
+    if counts.get('strömung') or counts.get('stromung'):
+        present.append('strömung')
+    if counts.get('resonanz'):
+        present.append('resonanz')
+    if counts.get('feld'):
+        present.append('feld')
+    return present
@@ -0,0 +1,380 @@
+"""
+Job Leases - Besitz auf Zeit für Jobs in processing/
+
+=== ZWECK ===
+Stirbt ein Worker, bleibt sein Job in processing/ liegen bis jemand
+scripts/queue_cleanup.sh von Hand startet. CONSUMER_PROCESSING_TIMEOUT
+stand in der Config, wurde aber nie durchgesetzt.
+
+=== LEASE ===
+Nach dem Claim (atomic rename incoming/ → processing/) schreibt der
+Worker ein Sidecar neben den Job:
+
+    processing/<stem>.lease   {"worker_id", "host", "pid", "token",
+                               "claimed_at", "started_at", "expires_at"}
+
+Ein Heartbeat-Thread pro Prozess verlängert alle Leases des Prozesses
+alle CONSUMER_HEARTBEAT_SECONDS um CONSUMER_LEASE_SECONDS - auch die von
+gepufferten, noch nicht gestarteten Jobs.
+
+=== HARD TIMEOUT ===
+Die Uhr startet mit start() (process_job beginnt), nicht beim Claim.
+Nach CONSUMER_PROCESSING_TIMEOUT verlängert der Heartbeat das Lease
+nicht mehr (Worker hängt) → es läuft aus, der Reaper holt den Job.
+
+=== REAPER ===
+Läuft im selben Thread (alle CONSUMER_REAPER_SECONDS, jeder Consumer-
+Prozess darf) und gibt Jobs zurück nach incoming/ wenn:
+- Lease abgelaufen (Worker tot oder Hard Timeout → kein Heartbeat mehr)
+- Kein Lease und ctime älter als CONSUMER_PROCESSING_TIMEOUT
+  (Claim von vor der Umstellung / Absturz direkt nach dem Rename)
+Ein Lease das noch verlängert wird, wird NIE gereapt.
+
+=== BESITZ ===
+Der Rename aus processing/ heraus entscheidet - Reaper und Worker
+benennen zuerst die .txt um, erst danach werden Metadaten geschrieben.
+Vor dem finalen Move prüft der Worker mit ensure_owned() ob das Lease
+noch seins ist (Token) - sonst LeaseLost, Ergebnis wird verworfen.
+
+=== POISON JOBS ===
+Jeder Reap zählt metadata["lease_expirations"] hoch. Ab
+CONSUMER_MAX_LEASE_EXPIRATIONS geht der Job nach error/ statt zurück in
+die Queue - ein Job der Worker abstürzen lässt, kreist nicht endlos.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from ..config.queue_config import *
+from .ready_queue import get_ready_queue, is_job_file
+
+LEASE_SUFFIX = ".lease"
+
+
+class LeaseLost(Exception):
+    """Job gehört nicht mehr diesem Worker (Reaper hat ihn zurückgegeben)"""
+
+
+def lease_path(job_path: Path) -> Path:
+    """processing/<stem>.txt → processing/<stem>.lease"""
+    return job_path.with_suffix(LEASE_SUFFIX)
+
+
+def read_lease(job_path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(lease_path(job_path), 'r', encoding='utf-8') as f:
+            lease = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return lease if isinstance(lease, dict) else None
+
+
+class LeaseManager:
+    """
+    Leases der Jobs dieses Prozesses + Heartbeat + Reaper
+
+    Thread-safe; ein Manager pro Prozess (get_lease_manager)
+    """
+
+    def __init__(self, queue_base: Path = QUEUE_BASE,
+                 lease_seconds: float = CONSUMER_LEASE_SECONDS,
+                 heartbeat_seconds: float = CONSUMER_HEARTBEAT_SECONDS):
+        self.queue_base = Path(queue_base)
+        self.processing_dir = self.queue_base / "processing"
+        self.incoming_dir = self.queue_base / "incoming"
+        self.lease_seconds = lease_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+
+        self._lock = threading.Lock()
+        self._held: Dict[str, Dict[str, Any]] = {}   # filename → Lease
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_reap = 0.0
+        self.stats = {"renewed": 0, "reaped": 0, "dead_lettered": 0, "timed_out": 0}
+
+    # ========================================================================
+    # LEASES DIESES PROZESSES
+    # ========================================================================
+
+    def _write(self, job_path: Path, lease: Dict[str, Any]) -> None:
+        target = lease_path(job_path)
+        tmp = target.with_name(f"{target.name}.{threading.get_ident()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(lease, f)
+        os.replace(tmp, target)
+
+    def acquire(self, job_path: Path, worker_id: str) -> Dict[str, Any]:
+        """Lease für einen frisch geclaimten Job (nach dem Rename nach processing/)"""
+        now = time.time()
+        lease = {
+            "worker_id": worker_id,
+            "host": socket.gethostname(),
+            "pid": os.getpid(),
+            "token": uuid.uuid4().hex,
+            "claimed_at": now,
+            "started_at": None,
+            "expires_at": now + self.lease_seconds,
+        }
+        self._write(job_path, lease)
+        with self._lock:
+            self._held[job_path.name] = lease
+        return lease
+
+    def start(self, filename: str) -> None:
+        """process_job() beginnt → ab jetzt läuft CONSUMER_PROCESSING_TIMEOUT"""
+        with self._lock:
+            lease = self._held.get(filename)
+        if lease is None:
+            return
+        now = time.time()
+        updated = dict(lease, started_at=now, expires_at=now + self.lease_seconds)
+        try:
+            self._renew(self.processing_dir / filename, lease, updated)
+        except OSError as e:
+            print(f"⚠️  Lease start failed for {filename}: {e}")
+
+    def owns(self, job_path: Path) -> bool:
+        """Lease auf der Platte ist (noch) das dieses Workers"""
+        with self._lock:
+            held = self._held.get(job_path.name)
+        if held is None:
+            return False
+        lease = read_lease(job_path)
+        return lease is not None and lease.get("token") == held.get("token")
+
+    def ensure_owned(self, job_path: Path) -> None:
+        """Vor dem finalen Move: LeaseLost wenn der Job nicht mehr uns gehört"""
+        if not self.owns(job_path) or not job_path.exists():
+            raise LeaseLost(f"{job_path.name}: Lease verloren (Reaper / anderer Worker)")
+
+    def _renew(self, job_path: Path, lease: Dict[str, Any], updated: Dict[str, Any]) -> bool:
+        """Lease nur schreiben wenn es noch unseres ist (sonst Lease des neuen Besitzers überschreiben)"""
+        current = read_lease(job_path)
+        if current is None or current.get("token") != lease.get("token") or not job_path.exists():
+            # Job schon verschoben (fertig oder vom Reaper zurückgeholt)
+            with self._lock:
+                self._held.pop(job_path.name, None)
+            return False
+        self._write(job_path, updated)
+        lease.update(updated)
+        return True
+
+    def release(self, filename: str) -> None:
+        """Job ist fertig (processed/ bzw. error/) oder zurückgegeben → Sidecar weg"""
+        with self._lock:
+            held = self._held.pop(filename, None)
+        if held is None:
+            # Nicht (mehr) unseres - verwaiste Sidecars räumt der Reaper auf
+            return
+        job_path = self.processing_dir / filename
+        # Nur das eigene Lease löschen - nicht das eines neuen Besitzers
+        current = read_lease(job_path)
+        if current is not None and current.get("token") != held.get("token"):
+            return
+        try:
+            lease_path(job_path).unlink()
+        except FileNotFoundError:
+            pass
+
+    def renew_all(self) -> int:
+        """Heartbeat: alle Leases dieses Prozesses verlängern"""
+        with self._lock:
+            held = list(self._held.items())
+        renewed = 0
+        now = time.time()
+        expires_at = now + self.lease_seconds
+        for filename, lease in held:
+            started_at = lease.get("started_at")
+            if started_at is not None and now - started_at > CONSUMER_PROCESSING_TIMEOUT:
+                # Worker hängt → Lease auslaufen lassen, Reaper übernimmt
+                if not lease.get("timed_out"):
+                    lease["timed_out"] = True
+                    self.stats["timed_out"] += 1
+                    print(f"⏱️  {filename}: länger als {CONSUMER_PROCESSING_TIMEOUT}s in Arbeit → Lease läuft aus")
+                continue
+            try:
+                if self._renew(self.processing_dir / filename, lease, dict(lease, expires_at=expires_at)):
+                    renewed += 1
+            except OSError as e:
+                print(f"⚠️  Lease renew failed for {filename}: {e}")
+        self.stats["renewed"] += renewed
+        return renewed
+
+    def held(self) -> List[str]:
+        with self._lock:
+            return list(self._held)
+
+    # ========================================================================
+    # REAPER
+    # ========================================================================
+
+    def _expired(self, job_path: Path, now: float) -> bool:
+        lease = read_lease(job_path)
+        if lease is None:
+            try:
+                return now - job_path.stat().st_ctime > CONSUMER_PROCESSING_TIMEOUT
+            except FileNotFoundError:
+                return False
+        # Hard Timeout setzt der Heartbeat durch (keine Verlängerung mehr)
+        # → ein Lease das noch verlängert wird, ist nie abgelaufen
+        return float(lease.get("expires_at", 0)) < now
+
+    def reap(self) -> List[str]:
+        """
+        Abgelaufene Jobs aus processing/ zurück nach incoming/ (bzw. error/)
+
+        Returns:
+            Dateinamen der zurückgegebenen Jobs
+        """
+        now = time.time()
+        self._last_reap = now
+        try:
+            with os.scandir(self.processing_dir) as it:
+                names = [entry.name for entry in it]
+        except FileNotFoundError:
+            return []
+        candidates = [name for name in names if is_job_file(name)]
+
+        # Verwaiste Sidecars (Job weg, release() nie gelaufen) aufräumen
+        jobs = {Path(name).stem for name in candidates}
+        for name in names:
+            if name.endswith(LEASE_SUFFIX) and Path(name).stem not in jobs:
+                lease = read_lease(self.processing_dir / name) or {}
+                if float(lease.get("expires_at", 0)) < now:
+                    try:
+                        (self.processing_dir / name).unlink()
+                    except FileNotFoundError:
+                        pass
+
+        reaped = []
+        for filename in candidates:
+            job_path = self.processing_dir / filename
+            if not self._expired(job_path, now):
+                continue
+            try:
+                if self._return_job(job_path):
+                    reaped.append(filename)
+            except Exception as e:
+                print(f"⚠️  Reaper failed for {filename}: {e}")
+        return reaped
+
+    def _return_job(self, job_path: Path) -> bool:
+        """Ein abgelaufener Job → incoming/ (oder error/ als Poison Job)"""
+        from .file_handler import FileHandler
+
+        meta_path = job_path.with_suffix('.json')
+        lease = read_lease(job_path) or {}
+        metadata: Dict[str, Any] = {}
+        if meta_path.exists():
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        expirations = int(metadata.get('lease_expirations', 0)) + 1
+
+        if expirations >= CONSUMER_MAX_LEASE_EXPIRATIONS:
+            # move_to_error() benennt zuerst um (Rename entscheidet),
+            # Metadaten werden erst danach am Ziel geschrieben
+            try:
+                target = FileHandler().move_to_error(job_path, {
+                    'error': f"Lease expired {expirations}x (worker {lease.get('worker_id', 'unknown')})",
+                    'exception_type': 'LeaseExpired',
+                    'worker_id': lease.get('worker_id'),
+                }, extra_metadata={'lease_expirations': expirations})
+            except FileNotFoundError:
+                return False  # Worker war schneller
+            self._drop_lease(job_path, lease)
+            self.stats["dead_lettered"] += 1
+            print(f"☠️  {job_path.name}: Lease {expirations}x abgelaufen → error/{target.name}")
+            return True
+
+        # Rename zuerst - wer verliert (Worker gerade fertig), bekommt FileNotFoundError
+        target = self.incoming_dir / job_path.name
+        try:
+            job_path.rename(target)
+        except FileNotFoundError:
+            return False
+        self._drop_lease(job_path, lease)
+
+        metadata['lease_expirations'] = expirations
+        metadata['reaped_at'] = datetime.now().isoformat()
+        with open(target.with_suffix('.json'), 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+        try:
+            meta_path.unlink()
+        except FileNotFoundError:
+            pass
+
+        # Index ist nur Cache → Fehler dürfen den Reap nicht kippen
+        try:
+            get_ready_queue(self.queue_base).add(target.name)
+        except Exception as e:
+            print(f"⚠️  Ready Queue update failed for {target.name}: {e}")
+
+        self.stats["reaped"] += 1
+        print(f"♻️  {job_path.name}: Lease abgelaufen "
+              f"(worker {lease.get('worker_id', 'unknown')}) → incoming/")
+        return True
+
+    def _drop_lease(self, job_path: Path, lease: Dict[str, Any]) -> None:
+        """Sidecar des gereapten Leases weg (direkt nach dem gewonnenen Rename)"""
+        with self._lock:
+            self._held.pop(job_path.name, None)
+        current = read_lease(job_path)
+        if current is not None and current.get("token") == lease.get("token"):
+            try:
+                lease_path(job_path).unlink()
+            except FileNotFoundError:
+                pass
+
+    # ========================================================================
+    # HEARTBEAT-THREAD
+    # ========================================================================
+
+    def start_heartbeat(self) -> None:
+        """Startet Heartbeat + Reaper (idempotent, Daemon-Thread)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="syntx-lease-heartbeat", daemon=True)
+            self._thread.start()
+
+    def stop_heartbeat(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.heartbeat_seconds):
+            try:
+                self.renew_all()
+                if time.time() - self._last_reap >= CONSUMER_REAPER_SECONDS:
+                    self.reap()
+            except Exception as e:
+                print(f"⚠️  Lease heartbeat failed: {e}")
+
+
+# Ein Manager pro Queue-Root und Prozess
+_managers: Dict[str, LeaseManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_lease_manager(queue_base: Path = QUEUE_BASE) -> LeaseManager:
+    """Prozessweiter LeaseManager - ein Heartbeat-Thread für alle Worker"""
+    key = str(Path(queue_base).resolve())
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = LeaseManager(Path(queue_base))
+        return _managers[key]
+
+
+# === MAIN BLOCK ===
+if __name__ == "__main__":
+    manager = get_lease_manager()
+    returned = manager.reap()
+    print(f"Reaper: {len(returned)} Jobs zurückgegeben")
+    for name in returned:
+        print(f"  → {name}")
@@ -9,14 +9,15 @@ Nutzt FileHandler für Atomic Writes
 === FLOW ===
 1. Check: Soll produziert werden? (QueueManager)
 2. Ja → Wähle Topics aus
-3. Generiere via GPT
-4. Schreibe in Queue (FileHandler)
+3. Generiere via GPT (parallel, siehe gpt_generator/concurrency.py)
+4. Schreibe jeden fertigen Prompt sofort in die Queue (FileHandler)
 5. Log Production Event
 
 === KEIN BLIND PRODUCING ===
 Nicht: "Generiere immer 20"
 Sondern: "Frag Queue ob nötig, dann wie viel"
 """
+import random
 import sys
 from pathlib import Path
 from datetime import datetime
@@ -25,11 +26,12 @@ from typing import List, Tuple
 # Add parent to path für GPT Generator Import
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from gpt_generator.syntx_prompt_generator import generate_prompt
+from gpt_generator.concurrency import GPT_CONCURRENCY, generate_concurrent
 from gpt_generator.topics_database import get_random_topics
 
 from .queue_manager import QueueManager
 from .file_handler import FileHandler
+from ..config.queue_config import QUEUE_INCOMING
 
 
 class IntelligentProducer:
@@ -46,12 +48,16 @@ class IntelligentProducer:
     - Topics Database: Für Topic Selection
     """
     
-    def __init__(self):
+    def __init__(self, concurrency: int = GPT_CONCURRENCY):
         """
         Initialisiert Producer mit Dependencies
+        
+        === ARGS ===
+        concurrency: Max. gleichzeitige GPT-Requests
         """
         self.queue_manager = QueueManager()
         self.file_handler = FileHandler()
+        self.concurrency = concurrency
     
     def run(self, force: bool = False) -> dict:
         """
@@ -105,56 +111,58 @@ class IntelligentProducer:
         # Topics wählen
         topics = get_random_topics(count)
         
+        # Style random wählen (wie in batch_generator)
+        jobs = [
+            {
+                "prompt": topic,
+                "style": random.choice(['technisch', 'kreativ', 'akademisch', 'casual']),
+                "category": category,
+                "max_tokens": 400,
+                "max_refusal_retries": 3
+            }
+            for category, topic in topics
+        ]
+        
         success_count = 0
         failed_count = 0
         
-        # Für jeden Topic: GPT → Queue
-        for i, (category, topic) in enumerate(topics, 1):
-            print(f"[{i}/{count}] {category}: {topic}")
+        def write_result(index: int, result: dict) -> None:
+            """Fertiger GPT-Call → sofort in die Queue (läuft im Producer-Thread)"""
+            nonlocal success_count, failed_count
+            job = jobs[index]
+            done = success_count + failed_count + 1
+            print(f"[{done}/{count}] {job['category']}: {job['prompt']}")
             
-            # Style random wählen (wie in batch_generator)
-            import random
-            style = random.choice(['technisch', 'kreativ', 'akademisch', 'casual'])
+            if not result['success']:
+                print(f"   ❌ GPT Failed: {result.get('error')}")
+                failed_count += 1
+                return
             
-            # GPT generieren
-            result = generate_prompt(
-                prompt=topic,
-                style=style,
-                category=category,
-                max_tokens=400,
-                max_refusal_retries=3
-            )
+            metadata = {
+                "topic": job['prompt'],
+                "style": job['style'],
+                "category": job['category'],
+                "gpt_quality": result['quality_score'],
+                "gpt_cost": result['cost'],
+                "producer_run": datetime.now().isoformat()
+            }
             
-            if result['success']:
-                # In Queue schreiben (atomic)
-                meta_prompt = result['prompt_generated']
-                
-                metadata = {
-                    "topic": topic,
-                    "style": style,
-                    "category": category,
-                    "gpt_quality": result['quality_score'],
-                    "gpt_cost": result['cost'],
-                    "producer_run": datetime.now().isoformat()
-                }
-                
-                try:
-                    # Atomic write to queue
-                    from ..config.queue_config import QUEUE_INCOMING
-                    self.file_handler.atomic_write(
-                        content=meta_prompt,
-                        metadata=metadata,
-                        target_dir=QUEUE_INCOMING
-                    )
-                    success_count += 1
-                    print(f"   ✅ In Queue geschrieben")
-                except Exception as e:
-                    print(f"   ❌ Queue Write Failed: {e}")
-                    failed_count += 1
-            else:
-                print(f"   ❌ GPT Failed: {result.get('error')}")
+            try:
+                # Atomic write to queue
+                self.file_handler.atomic_write(
+                    content=result['prompt_generated'],
+                    metadata=metadata,
+                    target_dir=QUEUE_INCOMING
+                )
+                success_count += 1
+                print(f"   ✅ In Queue geschrieben")
+            except Exception as e:
+                print(f"   ❌ Queue Write Failed: {e}")
                 failed_count += 1
         
+        # GPT parallel (SYNTX_GPT_CONCURRENCY, geteiltes Rate Limit)
+        generate_concurrent(jobs, on_result=write_result, concurrency=self.concurrency)
+        
         # === STATS ===
         duration = (datetime.now() - start_time).total_seconds()
         
@@ -167,6 +175,9 @@ class IntelligentProducer:
             "duration_seconds": duration
         }
         
+        # Yield-Schätzer (adaptive Producer Control)
+        self.queue_manager.record_production(count, success_count)
+        
         print(f"\n✅ Production Complete:")
         print(f"   Success: {success_count}/{count}")
         print(f"   Failed: {failed_count}")
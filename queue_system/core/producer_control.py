@@ -0,0 +1,212 @@
+"""
+Producer Control - Rate-basierte Batch-Größe für den Producer
+
+=== ZWECK ===
+should_produce() bildet incoming auf feste Batches ab (20/15/10/0). Wie
+schnell die Consumer die Queue wirklich leeren, spielt keine Rolle →
+die Queue pendelt zwischen STARVING und HIGH.
+
+=== SCHÄTZER ===
+drain_rate  Abgeschlossene Jobs pro Stunde, EWMA über processed_at
+            (Job Index, processed/ + archive/). Zeitgewichtet:
+                alpha = 1 - exp(-Δt / PRODUCER_DRAIN_TAU_HOURS)
+            → egal ob alle 5 Minuten oder alle 2 Stunden beobachtet wird
+yield       Anteil erfolgreicher generate_prompt()-Aufrufe pro
+            Producer-Lauf, EWMA mit PRODUCER_YIELD_ALPHA
+
+=== BATCH ===
+    ziel   = drain_rate · PRODUCER_TARGET_BACKLOG_HOURS
+    fehlt  = ziel - incoming
+    batch  = ceil(fehlt / yield), begrenzt auf PRODUCER_MAX_BATCH_SIZE
+
+=== ZENSIERTE BEOBACHTUNG ===
+Bei leerer Queue misst die Completion-Rate die Nachfrage, nicht die
+Kapazität der Consumer → solche Intervalle dürfen die Rate nur erhöhen
+
+=== STATE ===
+Producer laufen als Cron-Prozesse → der Schätzer liegt in
+queue/.index/producer_control.json (atomic replace). Load → Update →
+Save läuft unter fcntl.flock auf producer_control.json.lock (wie der
+Retry Scheduler) → überlappende Cron-Läufe und API-Status-Aufrufe
+verlieren keine Updates.
+"""
+import fcntl
+import json
+import math
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from ..config.queue_config import *
+from .job_index import get_job_index
+
+# Unter diesem Abstand wird nicht neu beobachtet (API-Status-Aufrufe)
+_MIN_OBSERVE_SECONDS = 60
+
+
+class ProducerController:
+    """
+    EWMA-Schätzer für Drain Rate + Producer Yield → Batch-Größe
+
+    Verwendung:
+        controller = ProducerController()
+        controller.observe(incoming=12)
+        batch = controller.batch_size(incoming=12)
+        ...
+        controller.record_production(requested=batch, produced=17)
+    """
+
+    def __init__(self, queue_base: Path = QUEUE_BASE, state_path: Optional[Path] = None,
+                 target_hours: float = PRODUCER_TARGET_BACKLOG_HOURS):
+        self.queue_base = Path(queue_base)
+        self.state_path = Path(state_path) if state_path else self.queue_base / ".index" / PRODUCER_CONTROL_FILE
+        self.target_hours = target_hours
+        self._lock = threading.Lock()
+        self._lock_path = self.state_path.with_name(f"{self.state_path.name}.lock")
+        self._state = self._load()
+
+    # ========================================================================
+    # STATE
+    # ========================================================================
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if isinstance(state, dict):
+                return state
+        except (OSError, ValueError):
+            pass
+        return {"drain_rate": None, "yield": None, "observed_at": None, "runs": 0}
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """
+        Thread-Lock + flock über Prozesse, lädt den aktuellen State
+
+        Lock-Datei nicht anlegbar → nur Thread-Lock (Steuerung, kein Abbruch)
+        """
+        with self._lock:
+            lock_file = None
+            try:
+                self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+                lock_file = open(self._lock_path, 'w')
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            except OSError as e:
+                print(f"⚠️  Producer Control lock failed: {e}")
+            try:
+                self._state = self._load()  # anderer Prozess kann inzwischen geschrieben haben
+                yield
+            finally:
+                if lock_file is not None:
+                    lock_file.close()
+
+    def _save(self) -> None:
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, indent=2)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            # Schätzer ist nur Steuerung → Fehler dürfen den Producer nicht kippen
+            print(f"⚠️  Producer Control state save failed: {e}")
+
+    # ========================================================================
+    # SCHÄTZER
+    # ========================================================================
+
+    def observe(self, incoming: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Drain-Rate EWMA mit den Completions seit der letzten Beobachtung updaten
+
+        Erste Beobachtung: Rate der letzten PRODUCER_DRAIN_TAU_HOURS als Startwert
+        """
+        now = now or datetime.now()
+        with self._locked():
+            observed_at = self._state.get("observed_at")
+            last = datetime.fromisoformat(observed_at) if observed_at else None
+            if last is not None and (now - last).total_seconds() < _MIN_OBSERVE_SECONDS:
+                return self.state()
+
+            if last is None:
+                last = now - timedelta(hours=PRODUCER_DRAIN_TAU_HOURS)
+            hours = max((now - last).total_seconds() / 3600, 1e-6)
+            completions = get_job_index(self.queue_base).count_processed_between(
+                last.isoformat(), now.isoformat()
+            )
+            rate = completions / hours
+
+            current = self._state.get("drain_rate")
+            if current is None:
+                new_rate = rate
+            elif incoming == 0 and rate < current:
+                # Queue leer → Rate begrenzt durch Nachfrage, nicht Kapazität
+                new_rate = current
+            else:
+                alpha = 1 - math.exp(-hours / PRODUCER_DRAIN_TAU_HOURS)
+                new_rate = alpha * rate + (1 - alpha) * current
+
+            self._state.update({
+                "drain_rate": round(new_rate, 4),
+                "last_completions": completions,
+                "last_interval_hours": round(hours, 4),
+                "observed_at": now.isoformat(),
+            })
+            self._save()
+            return self.state()
+
+    def record_production(self, requested: int, produced: int) -> None:
+        """Ergebnis eines Producer-Laufs → Yield EWMA"""
+        if requested <= 0:
+            return
+        observed = max(0.0, min(1.0, produced / requested))
+        with self._locked():
+            current = self._state.get("yield")
+            self._state["yield"] = round(
+                observed if current is None else
+                PRODUCER_YIELD_ALPHA * observed + (1 - PRODUCER_YIELD_ALPHA) * current, 4
+            )
+            self._state["runs"] = int(self._state.get("runs", 0)) + 1
+            self._state["last_run"] = {
+                "requested": requested, "produced": produced, "at": datetime.now().isoformat()
+            }
+            self._save()
+
+    @property
+    def ready(self) -> bool:
+        """Schätzer hat Daten (sonst greift die statische Steuerung)"""
+        return bool(self._state.get("drain_rate"))
+
+    # ========================================================================
+    # ENTSCHEIDUNG
+    # ========================================================================
+
+    def target_backlog(self) -> float:
+        return (self._state.get("drain_rate") or 0.0) * self.target_hours
+
+    def batch_size(self, incoming: int) -> int:
+        """Prompts für diesen Lauf, damit incoming ≈ target_backlog"""
+        deficit = self.target_backlog() - incoming
+        if deficit <= 0:
+            return 0
+        yield_rate = max(self._state.get("yield") or 1.0, PRODUCER_MIN_YIELD)
+        return min(PRODUCER_MAX_BATCH_SIZE, math.ceil(deficit / yield_rate))
+
+    def state(self) -> Dict[str, Any]:
+        """Schätzer-Zustand für get_system_status()"""
+        drain_rate = self._state.get("drain_rate")
+        return {
+            "drain_rate_per_hour": drain_rate,
+            "yield": self._state.get("yield"),
+            "target_backlog_hours": self.target_hours,
+            "target_backlog": round(self.target_backlog(), 1),
+            "observed_at": self._state.get("observed_at"),
+            "last_completions": self._state.get("last_completions"),
+            "last_interval_hours": self._state.get("last_interval_hours"),
+            "runs": self._state.get("runs", 0),
+            "last_run": self._state.get("last_run"),
+        }
@@ -128,6 +128,9 @@ class MultilingualProducer:
         
         duration = (datetime.now() - start_time).total_seconds()
         
+        # Yield-Schätzer (adaptive Producer Control)
+        self.queue_manager.record_production(batch_size, produced)
+        
         print(f"\n✅ Production Complete:")
         print(f"   Success: {produced}/{batch_size}")
         print(f"   Failed: {failed}")
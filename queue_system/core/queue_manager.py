@@ -17,13 +17,24 @@ State-basiert:
 - BALANCED → Produziere MIN (10)
 - HIGH → Produziere nichts
 - OVERFLOW → Produziere nichts + Alert
+
+=== ADAPTIVE CONTROL (SYNTX_PRODUCER_CONTROL=adaptive) ===
+Rate-basiert statt State-basiert (siehe producer_control.py):
+- Drain Rate der Consumer (EWMA Completions/Stunde)
+- Yield des Producers (EWMA Erfolgsquote generate_prompt)
+→ Batch so groß, dass incoming PRODUCER_TARGET_BACKLOG_HOURS Arbeit hält
+Ohne Messdaten (frische Installation) greift die State-Logik.
 """
+import os
 from datetime import datetime, timedelta
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, Optional
 
 # Imports
 from ..monitoring.queue_monitor import QueueMonitor
 from ..config.queue_config import *
+from .producer_control import ProducerController
+
+PRODUCER_CONTROL_MODE = os.getenv("SYNTX_PRODUCER_CONTROL", "static").lower()
 
 
 class QueueManager:
@@ -49,11 +60,14 @@ class QueueManager:
         """
         Initialisiert Manager mit Monitor
         
-        Monitor ist stateless - kann jederzeit neu erstellt werden
+        Monitor hält keinen eigenen State - Zähler kommen vom
+        prozessweiten QueueCounter, neu erstellen ist billig
         """
         self.monitor = QueueMonitor()
+        self.control_mode = PRODUCER_CONTROL_MODE
+        self.controller = ProducerController() if self.control_mode == "adaptive" else None
     
-    def should_produce(self) -> Tuple[bool, int]:
+    def should_produce(self, status: Optional[Dict] = None) -> Tuple[bool, int]:
         """
         Entscheidet ob produziert werden soll
         
@@ -84,6 +98,9 @@ class QueueManager:
             → Consumer kommt nicht hinterher
             → Monitoring sollte Alert senden
         
+        === ARGS ===
+        status: Bereits geholter Monitor-Status (spart zweiten Aufruf)
+        
         === RETURNS ===
         (should_produce, how_many)
         - should_produce: bool - Soll GPT aktiviert werden?
@@ -96,11 +113,17 @@ class QueueManager:
         Queue hat 30 → (False, 0)
         Queue hat 100 → (False, 0)
         """
-        # Status vom Monitor holen
-        status = self.monitor.get_status()
+        # Status vom Monitor holen (falls nicht übergeben)
+        if status is None:
+            status = self.monitor.get_status()
         queue_count = status['queue']['incoming']
         state = status['state']
         
+        if self.controller is not None:
+            decision = self._should_produce_adaptive(queue_count, state)
+            if decision is not None:
+                return decision
+        
         # Decision basierend auf State
         if state == "STARVING":
             # CRITICAL: Keine Arbeit
@@ -127,6 +150,42 @@ class QueueManager:
             # Keine Produktion + Alert
             return False, 0
     
+    def _should_produce_adaptive(self, incoming: int, state: str) -> Optional[Tuple[bool, int]]:
+        """
+        Batch-Größe aus Drain Rate + Yield
+        
+        === RETURNS ===
+        (should_produce, how_many) oder None → Schätzer ohne Daten,
+        State-Logik entscheidet
+        """
+        try:
+            self.controller.observe(incoming)
+        except Exception as e:
+            print(f"⚠️  Producer Control observe failed: {e}")
+            return None
+        if not self.controller.ready:
+            return None
+        
+        # Sicherheitsnetz: Consumer kommt sichtbar nicht hinterher
+        if state == "OVERFLOW":
+            return False, 0
+        
+        batch_size = self.controller.batch_size(incoming)
+        return batch_size > 0, batch_size
+    
+    def record_production(self, requested: int, produced: int) -> None:
+        """
+        Ergebnis eines Producer-Laufs melden (Yield-Schätzer)
+        
+        Nur im adaptive Mode relevant - sonst No-Op
+        """
+        if self.controller is None:
+            return
+        try:
+            self.controller.record_production(requested, produced)
+        except Exception as e:
+            print(f"⚠️  Producer Control update failed: {e}")
+    
     def get_system_status(self) -> Dict[str, Any]:
         """
         Vollständiger System-Status für Monitoring
@@ -149,7 +208,8 @@ class QueueManager:
             "state": "BALANCED",
             "producer": {
                 "should_run": true,
-                "batch_size": 10
+                "batch_size": 10,
+                "control": {"mode": "static"}   # adaptive: + drain_rate_per_hour, yield, ...
             },
             "health": "OK"
         }
@@ -160,8 +220,8 @@ class QueueManager:
         # Queue Status vom Monitor
         status = self.monitor.get_status()
         
-        # Producer Decision
-        should_run, batch_size = self.should_produce()
+        # Producer Decision (gleicher Snapshot wie oben)
+        should_run, batch_size = self.should_produce(status)
         
         # Health Check
         health = self._determine_health(status)
@@ -173,11 +233,21 @@ class QueueManager:
             "state": status['state'],
             "producer": {
                 "should_run": should_run,
-                "batch_size": batch_size
+                "batch_size": batch_size,
+                "control": self._control_status()
             },
             "health": health
         }
     
+    def _control_status(self) -> Dict[str, Any]:
+        """Modus + Schätzer-Zustand (adaptive) für get_system_status()"""
+        if self.controller is None:
+            return {"mode": "static"}
+        return {
+            "mode": "adaptive" if self.controller.ready else "adaptive (warmup → static)",
+            **self.controller.state()
+        }
+    
     def _determine_health(self, status: Dict) -> str:
         """
         Bestimmt System-Health
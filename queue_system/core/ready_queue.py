@@ -0,0 +1,237 @@
+"""
+Ready Queue - Persistenter, nach Timestamp sortierter Index über incoming/
+
+=== ZWECK ===
+get_next_job() hat pro Claim sorted(incoming.glob("*.txt")) gemacht
+→ N Claims aus einem Backlog von B Jobs = O(N · B log B) Directory-Reads
+und Sortierungen.
+
+Die Ready Queue hält die Dateinamen wartender Jobs in einer SQLite-Tabelle
+(B-Tree auf filename). Filenames beginnen mit %Y%m%d_%H%M%S_%f → die
+Sortierung nach filename IST die Sortierung nach Timestamp (wie sorted()).
+Nächster Kandidat = erster Eintrag im B-Tree → O(log n).
+
+=== SCHREIBER ===
+FileHandler.atomic_write() und QueueWriter.write_prompt() tragen neue
+Jobs NACH dem Rename nach incoming/ ein (Datei + Metadaten liegen schon da)
+
+=== CLAIM ===
+pop() entnimmt Kandidaten in einer Transaktion (BEGIN IMMEDIATE) →
+zwei Worker bekommen nie denselben Kandidaten. Der atomic rename
+incoming/ → processing/ bleibt trotzdem der EINZIGE Besitz-Nachweis:
+- Datei weg (FileNotFoundError) → veralteter Eintrag, nächster Kandidat
+- Worker stirbt zwischen pop() und rename() → Datei liegt noch in
+  incoming/, der nächste Abgleich trägt sie wieder ein
+
+=== ABGLEICH ===
+Dateien die von Hand kommen (manual_retry.sh, queue_cleanup.sh) kennt
+der Index nicht. reconcile() gleicht per scandir() ab (ohne Sortierung):
+- spätestens alle READY_QUEUE_RESCAN_SECONDS
+- sofort wenn der Index leer ist (bevor "Queue leer" gemeldet wird)
+
+=== GUARANTEES ===
+Index ist ein Cache - Filesystem bleibt die Wahrheit, die Datei kann
+jederzeit gelöscht werden
+"""
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..config.queue_config import *
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ready (
+    filename TEXT PRIMARY KEY
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+"""
+
+
+def is_job_file(name: str) -> bool:
+    """Job-Prompt in incoming/ (wie glob("*.txt") ohne _response.txt)"""
+    return name.endswith('.txt') and not name.endswith('_response.txt')
+
+
+class ReadyQueue:
+    """
+    Wartende Jobs in incoming/, älteste zuerst
+
+    Verwendung:
+        ready = get_ready_queue()
+        ready.add(filename)                 # nach dem Rename nach incoming/
+        for filename in ready.pop(5): ...   # Kandidaten, rename entscheidet
+    """
+
+    def __init__(self, queue_base: Path = QUEUE_BASE, db_path: Optional[Path] = None):
+        """
+        === ARGS ===
+        queue_base: Queue-Root (enthält incoming/)
+        db_path: Optional anderer Ort für die SQLite-Datei
+        """
+        self.queue_base = Path(queue_base)
+        self.incoming_dir = self.queue_base / "incoming"
+        self.db_path = Path(db_path) if db_path else self.queue_base / ".index" / READY_QUEUE_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # isolation_level=None → Transaktionen explizit (BEGIN IMMEDIATE in pop())
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30,
+                                     check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+
+    # ========================================================================
+    # WRITE
+    # ========================================================================
+
+    def add(self, filename: str) -> None:
+        """Neuer Job liegt in incoming/"""
+        self.add_many((filename,))
+
+    def add_many(self, filenames: Iterable[str]) -> int:
+        rows = [(name,) for name in filenames if is_job_file(name)]
+        if rows:
+            with self._lock:
+                self._conn.executemany("INSERT OR IGNORE INTO ready (filename) VALUES (?)", rows)
+        return len(rows)
+
+    def discard(self, filename: str) -> None:
+        """Eintrag entfernen (Job wurde anderweitig verschoben)"""
+        with self._lock:
+            self._conn.execute("DELETE FROM ready WHERE filename = ?", (filename,))
+
+    # ========================================================================
+    # CLAIM
+    # ========================================================================
+
+    def pop(self, limit: int = 1) -> List[str]:
+        """
+        Entnimmt die ältesten `limit` Kandidaten
+
+        Leerer Index → erst Abgleich mit incoming/, dann erneut versuchen.
+        Die Kandidaten gehören dem Aufrufer erst nach erfolgreichem rename().
+        """
+        self._reconcile_if_due()
+        candidates = self._take(limit)
+        if not candidates and self.reconcile():
+            candidates = self._take(limit)
+        return candidates
+
+    def _take(self, limit: int) -> List[str]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT filename FROM ready ORDER BY filename LIMIT ?", (limit,)
+                ).fetchall()
+                self._conn.executemany("DELETE FROM ready WHERE filename = ?", rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [row[0] for row in rows]
+
+    # ========================================================================
+    # ABGLEICH MIT DEM FILESYSTEM
+    # ========================================================================
+
+    def _last_reconcile(self) -> float:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'reconciled_at'").fetchone()
+        return row[0] if row else 0.0
+
+    def _reconcile_if_due(self) -> None:
+        with self._lock:
+            due = time.time() - self._last_reconcile() >= READY_QUEUE_RESCAN_SECONDS
+        if due:
+            self.reconcile()
+
+    def reconcile(self) -> int:
+        """
+        scandir() über incoming/ → fehlende Jobs eintragen, verschwundene löschen
+
+        Returns:
+            Anzahl neu eingetragener Jobs
+        """
+        names: Set[str] = set()
+        try:
+            with os.scandir(self.incoming_dir) as it:
+                for entry in it:
+                    if is_job_file(entry.name):
+                        names.add(entry.name)
+        except FileNotFoundError:
+            pass
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                known = {row[0] for row in self._conn.execute("SELECT filename FROM ready")}
+                added = names - known
+                self._conn.executemany("INSERT INTO ready (filename) VALUES (?)",
+                                       [(name,) for name in added])
+                # Seit dem scandir() eingetragene Jobs nicht wegwerfen
+                gone = [(name,) for name in known - names
+                        if not (self.incoming_dir / name).exists()]
+                self._conn.executemany("DELETE FROM ready WHERE filename = ?", gone)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('reconciled_at', ?)",
+                    (time.time(),)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(added)
+
+    # ========================================================================
+    # READ
+    # ========================================================================
+
+    def peek(self, limit: int = 10) -> List[str]:
+        """Älteste wartende Jobs, ohne sie zu entnehmen"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT filename FROM ready ORDER BY filename LIMIT ?", (limit,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM ready").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Eine Ready Queue pro Queue-Root und Prozess
+_queues: Dict[str, ReadyQueue] = {}
+_queues_lock = threading.Lock()
+
+
+def get_ready_queue(queue_base: Path = QUEUE_BASE) -> ReadyQueue:
+    """Prozessweite ReadyQueue für einen Queue-Root"""
+    key = str(Path(queue_base).resolve())
+    with _queues_lock:
+        if key not in _queues:
+            _queues[key] = ReadyQueue(Path(queue_base))
+        return _queues[key]
+
+
+# === MAIN BLOCK ===
+if __name__ == "__main__":
+    ready = get_ready_queue()
+
+    start = time.time()
+    added = ready.reconcile()
+    print(f"Abgleich: {added} neu, {len(ready)} wartend ({(time.time() - start) * 1000:.1f}ms)")
+    for name in ready.peek(5):
+        print(f"  → {name}")
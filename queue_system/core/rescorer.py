@@ -0,0 +1,432 @@
+"""
+Bulk Re-Scorer - Historische Responses neu bewerten
+
+=== ZWECK ===
+Nach SYNTX_SCORER_V2 Umschalten oder Format-Änderung (PUT /formats/{name})
+behalten alle bestehenden Jobs ihren alten quality_score. Der Re-Scorer
+läuft über processed/ + archive/, parsed jede _response.txt neu und
+schreibt den neuen Score versioniert zurück (JSON + Job Index).
+
+=== PIPELINE ===
+1. Job Index streamt Jobs (iter_sorted, konstanter Speicher)
+2. Responses werden in Chunks (RESCORE_CHUNK_SIZE) an einen Prozess-Pool
+   verteilt - Parse + Score ist CPU-Arbeit, Threads bringen hier nichts
+3. Worker encoden alle Texte eines Chunks in EINEM Batch (Scorer V2)
+   → score_all_fields() findet danach alles im Embedding Cache
+4. Hauptprozess schreibt zurück: JSON atomic replace + Index record_many
+   (ein Writer → keine SQLite Lock-Konkurrenz zwischen Workern)
+
+=== VERSIONIERUNG ===
+syntex_result.score_version = "v1" | "v2:<model>:<hash der Feld-Definitionen>"
+Jobs mit aktueller Version werden übersprungen (außer force=True).
+Alter Score wandert nach syntex_result.score_history.
+
+=== VERWENDUNG ===
+    rescorer = Rescorer(use_v2=True, workers=4)
+    stats = rescorer.run()
+    # → {"rescored": 812, "skipped": 40, "responses_per_second": 57.3, ...}
+
+    # CLI (aus Repo-Root):
+    python3 -m queue_system.core.rescorer --scorer v2 --workers 4
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Add parent for SYNTX imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from .job_index import get_job_index
+from ..config.queue_config import *
+from syntex_injector.syntex.utils.blob_store import resolve_text
+
+RESCORE_STATES = ("processed", "archive")
+
+
+# ============================================================================
+# VERSION
+# ============================================================================
+
+_versions: Dict[Tuple[str, bool], str] = {}
+
+
+def score_version(format_type: Optional[str], use_v2: bool) -> str:
+    """
+    Versions-String eines Scores
+
+    V2 hängt vom Embedding Model und den Feld-Definitionen des Formats ab
+    → Format-Update ergibt automatisch eine neue Version
+    """
+    if not use_v2:
+        return "v1"
+    key = (format_type or "", use_v2)
+    if key not in _versions:
+        from syntex_injector.syntex.analysis.field_definitions import get_fields_for_format
+        from syntex_injector.syntex.analysis.embeddings import get_model_name
+
+        definitions = get_fields_for_format(format_type or "SYNTEX_SYSTEM")
+        digest = hashlib.sha1(
+            json.dumps(definitions, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()[:12]
+        _versions[key] = f"v2:{get_model_name()}:{digest}"
+    return _versions[key]
+
+
+def reset_versions() -> None:
+    """Feld-Definitionen neu lesen (nach Format-Änderung im selben Prozess)"""
+    from syntex_injector.syntex.analysis.field_definitions import clear_format_cache
+
+    clear_format_cache()
+    _versions.clear()
+
+
+# ============================================================================
+# WORKER (läuft im Pool-Prozess)
+# ============================================================================
+
+_parser = None
+_scorer = None
+
+
+def _init_worker(use_v2: bool) -> None:
+    """Parser/Scorer einmal pro Prozess, Embedding Model vorab bereitstellen"""
+    global _parser, _scorer
+    from syntex_injector.syntex.core.parser import SyntexParser
+    from syntex_injector.syntex.analysis.scorer import SyntexScorer
+
+    _parser = SyntexParser()
+    _scorer = SyntexScorer()
+    if use_v2:
+        from syntex_injector.syntex.analysis.embeddings import warmup
+        warmup()
+
+
+def _score_chunk(items: List[Tuple[str, str]], use_v2: bool) -> List[Tuple[str, Optional[Dict], Optional[str], Optional[str]]]:
+    """
+    Parsed + scored einen Chunk Responses
+
+    === ARGS ===
+    items: (filename, response_text)
+
+    === RETURNS ===
+    (filename, quality_score dict, score_version, error) pro Item
+    """
+    if _parser is None:
+        _init_worker(use_v2)
+
+    parsed = []
+    results = []
+    for filename, response in items:
+        try:
+            parsed.append((filename, response, _parser.parse(response)))
+        except Exception as e:
+            results.append((filename, None, None, f"Parse Error: {e}"))
+
+    if use_v2:
+        from syntex_injector.syntex.analysis.scorer_v2 import score_all_fields
+        from syntex_injector.syntex.analysis.field_definitions import get_field_definition, get_all_field_names
+        from syntex_injector.syntex.analysis.embeddings import cached_encode
+
+        # Alle Feld-Texte + Referenzen des Chunks in EINEM Forward Pass
+        # → score_all_fields() trifft danach nur noch den Embedding Cache
+        texts, references = [], set()
+        for _, _, fields in parsed:
+            texts.extend(v for v in fields.to_dict().values() if v and v.strip())
+            for field_name in get_all_field_names(fields.get_format()):
+                field_def = get_field_definition(field_name) or {}
+                references.update(
+                    t for t in (field_def.get("description", ""), field_def.get("ideal_response", ""))
+                    if t and t.strip()
+                )
+        texts.extend(references)
+        if texts:
+            cached_encode(list(dict.fromkeys(texts)), persist=references)
+
+    for filename, response, fields in parsed:
+        try:
+            format_type = fields.get_format()
+            if use_v2:
+                fields_dict = {k: v for k, v in fields.to_dict().items() if v}
+                quality_score = score_all_fields(fields_dict, format_type)
+            else:
+                quality_score = _scorer.score(fields, response)
+            results.append((filename, quality_score.to_dict(), score_version(format_type, use_v2), None))
+        except Exception as e:
+            results.append((filename, None, None, f"Score Error: {e}"))
+
+    return results
+
+
+def _chunk_results(future, states: Dict[str, str]) -> List:
+    """Ergebnis eines Pool-Tasks - abgestürzter Worker → ganzer Chunk failed"""
+    try:
+        return future.result()
+    except Exception as e:
+        return [(filename, None, None, f"Worker Error: {e}") for filename in states]
+
+
+# ============================================================================
+# RESCORER
+# ============================================================================
+
+class Rescorer:
+    """
+    Re-Scoring aller historischen Jobs einer Queue
+
+    === DESIGN ===
+    - Hauptprozess: Index lesen, Responses laden, Ergebnisse zurückschreiben
+    - Pool-Prozesse: Parse + Score (spawn → kein geforkter Torch/SQLite State)
+    - Max. 2 Chunks pro Worker in-flight → Speicher bleibt konstant
+    """
+
+    def __init__(
+        self,
+        queue_base: Path = QUEUE_BASE,
+        use_v2: Optional[bool] = None,
+        workers: int = RESCORE_WORKERS,
+        chunk_size: int = RESCORE_CHUNK_SIZE,
+        states: Tuple[str, ...] = RESCORE_STATES,
+        force: bool = False
+    ):
+        """
+        === ARGS ===
+        queue_base: Queue-Root
+        use_v2: Scorer V2 (default: SYNTX_SCORER_V2)
+        workers: Pool-Prozesse (<= 1 → alles im aktuellen Prozess)
+        chunk_size: Responses pro Worker-Aufgabe
+        states: Queue-Ordner die neu bewertet werden
+        force: Auch Jobs mit aktueller score_version neu bewerten
+        """
+        if use_v2 is None:
+            use_v2 = os.getenv("SYNTX_SCORER_V2", "false").lower() == "true"
+        self.queue_base = Path(queue_base)
+        self.use_v2 = use_v2
+        self.workers = max(1, workers)
+        self.chunk_size = max(1, chunk_size)
+        self.states = tuple(states)
+        self.force = force
+        self.index = get_job_index(self.queue_base)
+
+    # ========================================================================
+    # INPUT
+    # ========================================================================
+
+    def _load_response(self, state: str, filename: str, metadata: Dict) -> Optional[str]:
+        """_response.txt oder (ältere Jobs) syntex_result.response_text / _ref"""
+        response_file = self.queue_base / state / filename.replace('.txt', '_response.txt')
+        try:
+            with open(response_file, 'r', encoding='utf-8') as f:
+                response = f.read()
+        except OSError:
+            response = resolve_text(metadata.get('syntex_result'), 'response_text')
+        return response if response and response.strip() else None
+
+    def _is_current(self, metadata: Dict) -> bool:
+        """Score hat bereits die aktuelle Version?"""
+        result = metadata.get('syntex_result')
+        if self.force or not isinstance(result, dict) or not result.get('score_version'):
+            return False
+        return result['score_version'] == score_version(result.get('score_format'), self.use_v2)
+
+    def _chunks(self, stats: Dict) -> Iterator[List[Tuple[str, str, str]]]:
+        """Streamt (state, filename, response) in Chunks"""
+        chunk = []
+        for state in self.states:
+            for filename, _, metadata in self.index.iter_sorted(state, full=True):
+                if self._is_current(metadata):
+                    stats['skipped'] += 1
+                    continue
+                response = self._load_response(state, filename, metadata)
+                if response is None:
+                    stats['no_response'] += 1
+                    continue
+                chunk.append((state, filename, response))
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+        if chunk:
+            yield chunk
+
+    # ========================================================================
+    # OUTPUT
+    # ========================================================================
+
+    def _write_back(self, states: Dict[str, str], results: List, stats: Dict) -> None:
+        """Neue Scores in JSON (atomic replace) + Index schreiben"""
+        rescored_at = datetime.now().isoformat()
+        records = []
+
+        for filename, quality_score, version, error in results:
+            if error is not None:
+                stats['failed'] += 1
+                print(f"  ⚠️  {filename}: {error}")
+                continue
+
+            state = states[filename]
+            json_path = self.queue_base / state / filename.replace('.txt', '.json')
+            try:
+                # Frisch von Disk, nicht aus dem Index → keine fremden Änderungen überschreiben
+                with open(json_path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+            except (OSError, ValueError) as e:
+                stats['failed'] += 1
+                print(f"  ⚠️  {filename}: {e}")
+                continue
+
+            result = metadata.get('syntex_result')
+            if not isinstance(result, dict):
+                result = metadata['syntex_result'] = {}
+
+            old_score = result.get('quality_score')
+            if isinstance(old_score, dict):
+                history = result.get('score_history') or []
+                history.append({
+                    'score_version': result.get('score_version', 'unversioned'),
+                    'total_score': old_score.get('total_score'),
+                    'rescored_at': rescored_at
+                })
+                result['score_history'] = history[-RESCORE_HISTORY_LIMIT:]
+                try:
+                    if old_score.get('total_score') != quality_score.get('total_score'):
+                        stats['changed'] += 1
+                        stats['delta_sum'] += float(quality_score['total_score']) - float(old_score['total_score'])
+                except (TypeError, ValueError, KeyError):
+                    pass
+
+            result['quality_score'] = quality_score
+            result['score_version'] = version
+            result['score_format'] = quality_score.get('format')  # nur V2, V1 ist formatunabhängig
+            result['rescored_at'] = rescored_at
+
+            tmp_path = json_path.with_name(json_path.name + f".{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(metadata, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_path, json_path)
+            except OSError as e:
+                stats['failed'] += 1
+                print(f"  ⚠️  {filename}: {e}")
+                continue
+
+            records.append((json_path, metadata, state))
+            stats['rescored'] += 1
+
+        if records:
+            self.index.record_many(records)
+
+    # ========================================================================
+    # RUN
+    # ========================================================================
+
+    def run(self, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Bewertet alle Jobs neu
+
+        === ARGS ===
+        progress: Callback mit Zwischen-Stats nach jedem Chunk (z.B. API Status)
+
+        === RETURNS ===
+        dict: rescored, skipped, no_response, failed, changed, mean_delta,
+              duration_seconds, responses_per_second
+        """
+        if self.use_v2:
+            reset_versions()
+
+        stats = {
+            'scorer': "v2" if self.use_v2 else "v1",
+            'rescored': 0, 'skipped': 0, 'no_response': 0, 'failed': 0,
+            'changed': 0, 'delta_sum': 0.0
+        }
+        start = time.time()
+
+        print(f"\n🔁 Re-Scoring {', '.join(self.states)} "
+              f"(scorer: {stats['scorer']}, {self.workers} workers, chunk: {self.chunk_size})\n")
+
+        def finish_chunk(states: Dict[str, str], results: List) -> None:
+            self._write_back(states, results, stats)
+            elapsed = time.time() - start
+            stats['duration_seconds'] = round(elapsed, 1)
+            stats['responses_per_second'] = round(stats['rescored'] / elapsed, 2) if elapsed > 0 else 0
+            print(f"  ✅ {stats['rescored']} rescored ({stats['responses_per_second']}/s)")
+            if progress:
+                progress(dict(stats))
+
+        if self.workers == 1:
+            for chunk in self._chunks(stats):
+                results = _score_chunk([(filename, response) for _, filename, response in chunk], self.use_v2)
+                finish_chunk({filename: state for state, filename, _ in chunk}, results)
+        else:
+            # spawn: Pool-Prozesse erben weder SQLite-Connections noch Model-Threads
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.use_v2,)
+            ) as executor:
+                pending = {}
+                for chunk in self._chunks(stats):
+                    future = executor.submit(
+                        _score_chunk, [(filename, response) for _, filename, response in chunk], self.use_v2
+                    )
+                    pending[future] = {filename: state for state, filename, _ in chunk}
+                    if len(pending) >= self.workers * 2:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            chunk_states = pending.pop(future)
+                            finish_chunk(chunk_states, _chunk_results(future, chunk_states))
+                for future in list(pending):
+                    chunk_states = pending.pop(future)
+                    finish_chunk(chunk_states, _chunk_results(future, chunk_states))
+
+        duration = time.time() - start
+        stats['duration_seconds'] = round(duration, 1)
+        stats['responses_per_second'] = round(stats['rescored'] / duration, 2) if duration > 0 else 0
+        delta_sum = stats.pop('delta_sum')
+        stats['mean_delta'] = round(delta_sum / stats['changed'], 2) if stats['changed'] else 0.0
+
+        # Summary
+        print(f"\n{'='*60}")
+        print(f"RE-SCORING COMPLETE")
+        print(f"{'='*60}")
+        print(f"Rescored: {stats['rescored']} ({stats['changed']} changed, mean Δ {stats['mean_delta']})")
+        print(f"Skipped (current version): {stats['skipped']}")
+        print(f"No response: {stats['no_response']}")
+        print(f"Failed: {stats['failed']}")
+        print(f"Duration: {duration:.1f}s ({stats['responses_per_second']} responses/s)")
+        print(f"{'='*60}\n")
+
+        return stats
+
+
+# === MAIN BLOCK ===
+# python3 -m queue_system.core.rescorer [--scorer v1|v2] [--workers N] [--chunk N] [--force]
+if __name__ == "__main__":
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(description="SYNTX Bulk Re-Scorer")
+    arg_parser.add_argument("--scorer", choices=["v1", "v2"], help="default: SYNTX_SCORER_V2")
+    arg_parser.add_argument("--workers", type=int, default=RESCORE_WORKERS)
+    arg_parser.add_argument("--chunk", type=int, default=RESCORE_CHUNK_SIZE)
+    arg_parser.add_argument("--states", default=",".join(RESCORE_STATES))
+    arg_parser.add_argument("--queue", default=str(QUEUE_BASE))
+    arg_parser.add_argument("--force", action="store_true", help="auch aktuelle Versionen neu bewerten")
+    args = arg_parser.parse_args()
+
+    rescorer = Rescorer(
+        queue_base=Path(args.queue),
+        use_v2=None if args.scorer is None else args.scorer == "v2",
+        workers=args.workers,
+        chunk_size=args.chunk,
+        states=tuple(s for s in args.states.split(",") if s),
+        force=args.force
+    )
+    stats = rescorer.run()
+
+    print(json.dumps(stats, indent=2))
@@ -0,0 +1,307 @@
+"""
+Retry Scheduler - Automatische Wiederholung von Jobs aus error/
+
+=== ZWECK ===
+FileHandler.move_to_error() legt fehlgeschlagene Jobs als __retryN.txt
+in error/ ab - zurück in die Queue kamen sie nur per manual_retry.sh.
+Ein Llama-Timeout um 3 Uhr nachts war damit verlorene Kapazität.
+
+=== ABLAUF (pro Lauf, z.B. alle 5 Minuten per Cron) ===
+Für jeden Job in error/:
+1. Fehlerklasse bestimmen (classify_error)
+2. Nicht wiederholbar ODER retry_count >= RETRY_MAX_ATTEMPTS
+   → dead_letter/ (mit Grund in den Metadaten)
+3. Wiederholbar, noch kein retry_at → retry_at = failed_at + Backoff
+   (wird in die Metadaten geschrieben → stabil über Läufe hinweg)
+4. retry_at erreicht → zurück nach incoming/ unter dem Original-Namen
+   (Timestamp-Prefix → Job steht wieder vorne in der Ready Queue)
+
+=== BACKOFF ===
+Exponentiell mit Jitter ("equal jitter"):
+    delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_SECONDS · 2^(n-1))
+    wait  = delay/2 + uniform(0, delay/2)
+→ kein Thundering Herd wenn nach einem Llama-Ausfall alle Jobs
+gleichzeitig in error/ gelandet sind
+
+=== FEHLERKLASSEN ===
+Wiederholt:  timeout, connection, server_error (5xx), rate_limited (429)
+Dead Letter: parse (Response-Format), client_error (4xx), config
+             (Wrapper fehlt), lease_expired (Poison Job), exception, unknown
+
+=== STATS ===
+Zähler retry_requeued / retry_dead_lettered pro Fehlerklasse
+(stage_metrics → /metrics) + Ergebnis des letzten Laufs in
+<metrics_dir>/retry-scheduler.json
+"""
+import fcntl
+import json
+import os
+import random
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config.queue_config import *
+from .ready_queue import get_ready_queue, is_job_file
+from syntex_injector.syntex.utils.stage_metrics import METRICS_DIR, count_event
+
+RETRYABLE_ERROR_CLASSES = ("timeout", "connection", "server_error", "rate_limited")
+
+_RETRY_SUFFIX = re.compile(r"(?:__retry\d+)+$")
+
+
+def original_stem(stem: str) -> str:
+    """job__retry1__retry2 → job"""
+    return _RETRY_SUFFIX.sub("", stem)
+
+
+def classify_error(error_info: Any) -> str:
+    """
+    last_error aus den Job-Metadaten → Fehlerklasse
+
+    Fehlertexte kommen aus APIClient.send() (_RetryableError, HTTPError,
+    ValueError), dem Calibrator und dem Exception-Pfad des Consumers
+    """
+    if not isinstance(error_info, dict):
+        return "unknown"
+    exception_type = error_info.get('exception_type')
+    if exception_type == 'LeaseExpired':
+        return "lease_expired"
+
+    error = str(error_info.get('error') or '')
+    lowered = error.lower()
+    if lowered.startswith("timeout") or "timed out" in lowered or "max retries exceeded" in lowered:
+        return "timeout"
+    if lowered.startswith("connection failed") or "connectionerror" in lowered:
+        return "connection"
+    if "client error 429" in lowered:
+        return "rate_limited"
+    if "server error" in lowered:
+        return "server_error"
+    if "client error" in lowered:
+        return "client_error"
+    if "invalid response format" in lowered or "parse" in lowered:
+        return "parse"
+    if "wrapper" in lowered and "not found" in lowered:
+        return "config"
+    if exception_type:
+        return "exception"
+    return "unknown"
+
+
+def backoff_seconds(retry_count: int, rng: random.Random = random) -> float:
+    """Exponentieller Backoff mit Equal Jitter für den n-ten Fehlschlag"""
+    delay = min(RETRY_MAX_DELAY_SECONDS, RETRY_BASE_SECONDS * 2 ** max(0, retry_count - 1))
+    return delay / 2 + rng.uniform(0, delay / 2)
+
+
+def _epoch(timestamp: Optional[str], fallback: float) -> float:
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return fallback
+
+
+class RetryScheduler:
+    """
+    Ein Lauf über error/ - requeue, warten oder dead_letter/
+
+    Verwendung:
+        stats = RetryScheduler().run()
+        # → {"requeued": 3, "dead_lettered": 1, "waiting": 5, ...}
+    """
+
+    def __init__(self, queue_base: Path = QUEUE_BASE, max_attempts: int = RETRY_MAX_ATTEMPTS,
+                 metrics_dir: Path = METRICS_DIR):
+        self.queue_base = Path(queue_base)
+        self.error_dir = self.queue_base / "error"
+        self.incoming_dir = self.queue_base / "incoming"
+        self.dead_letter_dir = self.queue_base / QUEUE_DEAD_LETTER.name
+        self.max_attempts = max_attempts
+        self.metrics_dir = Path(metrics_dir)
+        self._lock_path = self.queue_base / ".index" / "retry_scheduler.lock"
+
+    # ========================================================================
+    # LAUF
+    # ========================================================================
+
+    def run(self) -> Dict[str, Any]:
+        """
+        Verarbeitet alle Jobs in error/ einmal
+
+        Parallele Läufe (Cron überlappt) → der zweite Lauf tut nichts
+        """
+        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self._lock_path, 'w') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return {"skipped": True, "reason": "Anderer Lauf aktiv"}
+            return self._run()
+
+    def _run(self) -> Dict[str, Any]:
+        start = time.time()
+        stats: Dict[str, Any] = {
+            "run_at": datetime.now().isoformat(),
+            "requeued": 0,
+            "dead_lettered": 0,
+            "waiting": 0,
+            "next_retry_at": None,
+            "by_class": {},
+        }
+
+        try:
+            with os.scandir(self.error_dir) as it:
+                names = sorted(entry.name for entry in it if is_job_file(entry.name))
+        except FileNotFoundError:
+            names = []
+
+        for name in names:
+            try:
+                outcome, error_class, retry_at = self._handle(self.error_dir / name, start)
+            except Exception as e:
+                print(f"⚠️  Retry Scheduler failed for {name}: {e}")
+                continue
+            if outcome is None:
+                continue
+            stats[outcome] += 1
+            by_class = stats["by_class"].setdefault(error_class, {"requeued": 0, "dead_lettered": 0, "waiting": 0})
+            by_class[outcome] += 1
+            if outcome == "waiting" and (stats["next_retry_at"] is None or retry_at < stats["next_retry_at"]):
+                stats["next_retry_at"] = retry_at
+
+        if stats["next_retry_at"] is not None:
+            stats["next_retry_at"] = datetime.fromtimestamp(stats["next_retry_at"]).isoformat()
+        stats["duration_ms"] = round((time.time() - start) * 1000, 1)
+        self._publish(stats)
+        return stats
+
+    def _handle(self, job_path: Path, now: float):
+        """Ein Job → ("requeued" | "dead_lettered" | "waiting" | None, Klasse, retry_at)"""
+        meta_path = job_path.with_suffix('.json')
+        metadata: Dict[str, Any] = {}
+        if meta_path.exists():
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+
+        error_class = classify_error(metadata.get('last_error'))
+        retry_count = int(metadata.get('retry_count', 0))
+
+        if error_class not in RETRYABLE_ERROR_CLASSES:
+            reason = f"Fehlerklasse {error_class} wird nicht wiederholt"
+            return self._dead_letter(job_path, metadata, error_class, reason), error_class, None
+        if retry_count >= self.max_attempts:
+            reason = f"{retry_count} Fehlversuche (max {self.max_attempts})"
+            return self._dead_letter(job_path, metadata, error_class, reason), error_class, None
+
+        retry_at = metadata.get('retry_at')
+        if retry_at is None:
+            failed_at = _epoch(metadata.get('failed_at'), now)
+            retry_at = failed_at + backoff_seconds(retry_count)
+            metadata['retry_at'] = retry_at
+            metadata.setdefault('last_error', {})['error_class'] = error_class
+            self._write_meta(meta_path, metadata)
+
+        if retry_at > now:
+            return "waiting", error_class, retry_at
+        return self._requeue(job_path, metadata, error_class), error_class, retry_at
+
+    # ========================================================================
+    # MOVES
+    # ========================================================================
+
+    @staticmethod
+    def _write_meta(meta_path: Path, metadata: Dict[str, Any]) -> None:
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+
+    def _move(self, job_path: Path, target: Path, metadata: Dict[str, Any]) -> bool:
+        """txt zuerst (rename entscheidet), dann Metadaten an den neuen Ort"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        meta_path = job_path.with_suffix('.json')
+        try:
+            job_path.rename(target)
+        except FileNotFoundError:
+            return False  # Anderer Lauf / manual_retry.sh war schneller
+        self._write_meta(target.with_suffix('.json'), metadata)
+        try:
+            meta_path.unlink()
+        except FileNotFoundError:
+            pass
+        return True
+
+    def _requeue(self, job_path: Path, metadata: Dict[str, Any], error_class: str) -> Optional[str]:
+        target = self.incoming_dir / f"{original_stem(job_path.stem)}.txt"
+        if target.exists():
+            target = self.incoming_dir / job_path.name
+
+        history = metadata.setdefault('retry_history', [])
+        history.append({
+            'failed_at': metadata.get('failed_at'),
+            'error_class': error_class,
+            'error': str((metadata.get('last_error') or {}).get('error', ''))[:200],
+            'requeued_at': datetime.now().isoformat(),
+        })
+        metadata.pop('retry_at', None)
+        metadata['status'] = 'retry'
+
+        if not self._move(job_path, target, metadata):
+            return None
+
+        # Index ist nur Cache → Fehler dürfen den Retry nicht kippen
+        try:
+            get_ready_queue(self.queue_base).add(target.name)
+        except Exception as e:
+            print(f"⚠️  Ready Queue update failed for {target.name}: {e}")
+
+        count_event("retry_requeued", error_class)
+        print(f"🔄 {job_path.name} → incoming/{target.name} ({error_class}, Versuch {metadata.get('retry_count', 0) + 1})")
+        return "requeued"
+
+    def _dead_letter(self, job_path: Path, metadata: Dict[str, Any], error_class: str,
+                     reason: str) -> Optional[str]:
+        metadata['status'] = 'dead_letter'
+        metadata['dead_lettered_at'] = datetime.now().isoformat()
+        metadata['dead_letter_reason'] = reason
+        metadata.setdefault('last_error', {})['error_class'] = error_class
+        metadata.pop('retry_at', None)
+
+        if not self._move(job_path, self.dead_letter_dir / job_path.name, metadata):
+            return None
+        count_event("retry_dead_lettered", error_class)
+        print(f"☠️  {job_path.name} → dead_letter/ ({reason})")
+        return "dead_lettered"
+
+    # ========================================================================
+    # STATS
+    # ========================================================================
+
+    def _publish(self, stats: Dict[str, Any]) -> None:
+        """Letzter Lauf → <metrics_dir>/retry-scheduler.json (atomic replace)"""
+        try:
+            self.metrics_dir.mkdir(parents=True, exist_ok=True)
+            target = self.metrics_dir / "retry-scheduler.json"
+            tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, indent=2)
+            os.replace(tmp, target)
+        except OSError:
+            # Stats dürfen den Lauf nicht kippen
+            pass
+
+
+def load_last_run(metrics_dir: Path = METRICS_DIR) -> Optional[Dict[str, Any]]:
+    """Ergebnis des letzten Scheduler-Laufs (None wenn noch keiner lief)"""
+    try:
+        with open(Path(metrics_dir) / "retry-scheduler.json", 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# === MAIN BLOCK ===
+if __name__ == "__main__":
+    stats = RetryScheduler().run()
+    print(json.dumps(stats, indent=2, ensure_ascii=False))
@@ -0,0 +1,496 @@
+"""
+Search Index - Volltext-Suche über Prompt- und Response-Texte (SQLite FTS5)
+
+=== ZWECK ===
+/prompts/search konnte nur Topic/Style/Category per Substring durchsuchen
+und hat dafür alle Jobs geladen. Der Search Index hält einen invertierten
+Index über:
+- meta:     Topic, Style, Category
+- prompt:   queue/<state>/<job>.txt
+- response: queue/<state>/<job>_response.txt (Fallback: response_text / _ref)
+→ Ranking per BM25, Pagination per LIMIT/OFFSET, processed/ + archive/
+
+=== NORMALISIERUNG ===
+Der Index speichert die ORIGINAL-Texte (Snippets zeigen "Strömung fließt",
+nicht die gefaltete Form). Der Tokenizer unicode61 remove_diacritics 2
+faltet beim Indizieren Groß/Klein und Diakritika lateinischer Zeichen
+("Strömung" → stromung, ç→c, ő→o, è→e). fold_text() macht mit der
+Query dasselbe - nicht-lateinische Schriften (Kyrillisch "й") bleiben
+wie beim Tokenizer unverändert.
+Sonderfall ß: casefold() macht "ss" daraus, der Tokenizer nicht →
+Query-Tokens mit "ss" matchen beide Schreibweisen ("strasse" findet
+"Straße" und "Strasse").
+Damit passt die Suche für alle Sprachen aus language_rotation.LANGUAGES
+(de, en, ru, hu, tr, it) ohne sprachspezifische Stemmer.
+
+=== INKREMENTELL ===
+- Consumer ruft index_job() direkt nachdem die Response gespeichert ist,
+  die Archivierung move_many() (nur State, kein Neu-Lesen)
+- sync() holt alles andere über die Änderungs-Sequenz des Job Index
+  (JobIndex.file_events_since): neue/geänderte/verschobene Jobs und
+  Löschungen (Tombstones) in Sequenz-Reihenfolge
+- Unverändertes json_mtime → Job wird nicht neu gelesen
+- Texte werden AUSSERHALB des Index-Locks gelesen, Commit pro Batch
+  → Suchen blockieren nicht während eines (Erst-)Aufbaus
+
+=== API ===
+Requests syncen nicht selbst: start_background_sync() hält den Index im
+Hintergrund aktuell (SEARCH_SYNC_SECONDS), search(sync=False)
+
+=== VERWENDUNG ===
+    index = get_search_index()
+    total, hits = index.search("strömung drift", limit=20, offset=0)
+
+    python -m queue_system.core.search_index     # Index (neu) aufbauen
+"""
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Iterable
+
+from ..config.queue_config import *
+from .job_index import get_job_index, INDEXED_STATES
+from syntex_injector.syntex.utils.blob_store import resolve_text
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id         INTEGER PRIMARY KEY,
+    filename   TEXT UNIQUE NOT NULL,
+    state      TEXT NOT NULL,
+    json_mtime REAL NOT NULL,
+    language   TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS fts USING fts5(
+    meta, prompt, response,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_docs_state ON docs(state);
+"""
+
+# BM25 Gewichte pro Spalte (meta, prompt, response) - Topic-Treffer zählen mehr
+_BM25_WEIGHTS = (4.0, 1.0, 1.0)
+_COLUMNS = ("metadata", "prompt", "response")
+
+# Snippet-Marker intern (kommen in Texten nicht vor), nach außen [ ]
+_MARK_OPEN, _MARK_CLOSE = "\x01", "\x02"
+
+# Version der gespeicherten Texte - 2 = Original statt gefaltet
+_TEXT_VERSION = 2
+
+# Max. "ss" pro Token die als ß-Variante probiert werden (2^n Varianten)
+_MAX_SS_VARIANTS = 3
+
+
+def _is_latin(char: str) -> bool:
+    """Basis-Zeichen deren Diakritika unicode61 remove_diacritics entfernt"""
+    return char < "\u0250" or "\u1e00" <= char <= "\u1eff"
+
+
+def fold_text(text: str) -> str:
+    """
+    Query so falten wie der Tokenizer die Dokumente:
+    casefold + Diakritika lateinischer Zeichen entfernen
+    """
+    if not text:
+        return ""
+    result = []
+    latin_base = False
+    for char in unicodedata.normalize("NFKD", text.casefold()):
+        if unicodedata.combining(char):
+            if latin_base:
+                continue
+        else:
+            latin_base = _is_latin(char)
+        result.append(char)
+    return unicodedata.normalize("NFC", "".join(result))
+
+
+def _ss_variants(token: str) -> List[str]:
+    """"strasse" → ["strasse", "straße"] (Tokenizer faltet ß nicht zu ss)"""
+    parts = token.split("ss")
+    if len(parts) == 1 or len(parts) - 1 > _MAX_SS_VARIANTS:
+        return [token]
+    variants = [parts[0]]
+    for part in parts[1:]:
+        variants = [v + joiner + part for v in variants for joiner in ("ss", "ß")]
+    return variants
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Freitext → FTS5 MATCH Ausdruck
+
+    - Alle Wörter müssen vorkommen (AND), letztes Wort als Prefix
+    - "in Anführungszeichen" → Phrase
+    - FTS5-Syntax des Users wird nie interpretiert (alles gequotet)
+    """
+    folded = fold_text(query).strip()
+    phrase = len(folded) > 1 and folded[0] == folded[-1] == '"'
+    tokens = re.findall(r"\w+", folded)
+    if not tokens:
+        return None
+    if phrase:
+        phrases = [""]
+        for token in tokens:
+            phrases = [f"{p} {v}".strip() for p in phrases for v in _ss_variants(token)]
+        return " OR ".join(f'"{p}"' for p in phrases[:2 ** _MAX_SS_VARIANTS])
+
+    terms = []
+    for i, token in enumerate(tokens):
+        prefix = "*" if i == len(tokens) - 1 else ""
+        variants = [f'"{v}"{prefix}' for v in _ss_variants(token)]
+        terms.append(variants[0] if len(variants) == 1 else "(" + " OR ".join(variants) + ")")
+    return " AND ".join(terms)
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _read_text(path: Path) -> Optional[str]:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class SearchIndex:
+    """
+    FTS5-Index neben dem Job Index (queue/.index/search.sqlite)
+
+    === GUARANTEES ===
+    - Cache wie der Job Index: löschen → nächster sync() baut neu auf
+    - WAL-Mode: Consumer schreibt, API liest parallel
+    """
+
+    def __init__(self, queue_base: Path = QUEUE_BASE, db_path: Optional[Path] = None):
+        self.queue_base = Path(queue_base)
+        self.db_path = Path(db_path) if db_path else self.queue_base / ".index" / SEARCH_INDEX_FILE
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.job_index = get_job_index(self.queue_base)
+
+        self._lock = threading.RLock()
+        self._sync_lock = threading.Lock()   # ein sync() zur Zeit, Suchen laufen weiter
+        self._sync_thread: Optional[threading.Thread] = None
+        self._conn = _connect(self.db_path)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            if self._meta('text_version') != _TEXT_VERSION:
+                # Alter Index mit gefalteten Texten → neu aufbauen
+                self._conn.execute("DELETE FROM fts")
+                self._conn.execute("DELETE FROM docs")
+                self._set_meta('job_seq', 0)
+                self._set_meta('text_version', _TEXT_VERSION)
+            self._conn.commit()
+
+    def _meta(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_meta(self, key: str, value: int) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    # ========================================================================
+    # WRITE PATH
+    # ========================================================================
+
+    def _document(self, filename: str, state: str) -> Tuple[str, str, str]:
+        """(meta, prompt, response) im Original - faltet der Tokenizer"""
+        directory = self.queue_base / state
+        found = self.job_index.get(filename, full=False)
+        summary = found[2] if found else {}
+
+        meta = " ".join(str(summary.get(key) or "") for key in ("topic", "style", "category"))
+        prompt = _read_text(directory / filename) or ""
+        response = _read_text(directory / filename.replace('.txt', '_response.txt'))
+        if response is None:
+            # Ältere Jobs: Response nur in der JSON (inline oder Blob-Ref)
+            full = self.job_index.get(filename, full=True)
+            response = resolve_text(full[2].get('syntex_result'), 'response_text') if full else None
+
+        return meta, prompt, response or ""
+
+    def _upsert(self, filename: str, state: str, json_mtime: float, language: Optional[str],
+                document: Tuple[str, str, str]) -> None:
+        """Dokument (neu) indizieren - ohne Commit, Texte schon gelesen"""
+        meta, prompt, response = document
+        row = self._conn.execute("SELECT id FROM docs WHERE filename = ?", (filename,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM fts WHERE rowid = ?", (row['id'],))
+            self._conn.execute(
+                "UPDATE docs SET state = ?, json_mtime = ?, language = ? WHERE id = ?",
+                (state, json_mtime, language, row['id'])
+            )
+            doc_id = row['id']
+        else:
+            doc_id = self._conn.execute(
+                "INSERT INTO docs (filename, state, json_mtime, language) VALUES (?, ?, ?, ?)",
+                (filename, state, json_mtime, language)
+            ).lastrowid
+        self._conn.execute(
+            "INSERT INTO fts (rowid, meta, prompt, response) VALUES (?, ?, ?, ?)",
+            (doc_id, meta, prompt, response)
+        )
+
+    def _delete(self, filename: str) -> None:
+        row = self._conn.execute("SELECT id FROM docs WHERE filename = ?", (filename,)).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM fts WHERE rowid = ?", (row['id'],))
+            self._conn.execute("DELETE FROM docs WHERE id = ?", (row['id'],))
+
+    def index_job(self, filename: str, state: str = "processed") -> None:
+        """
+        Einen Job sofort indizieren
+
+        === VERWENDUNG ===
+        Consumer nach move_to_processed() + Response speichern
+        → Job ist direkt suchbar, sync() überspringt ihn (gleiches mtime)
+        """
+        json_path = self.queue_base / state / filename.replace('.txt', '.json')
+        try:
+            json_mtime = json_path.stat().st_mtime
+        except FileNotFoundError:
+            json_mtime = 0.0
+        found = self.job_index.get(filename, full=False)
+        language = found[2].get('language') if found else None
+        document = self._document(filename, state)
+
+        with self._lock:
+            self._upsert(filename, state, json_mtime, language, document)
+            self._conn.commit()
+
+    def move_many(self, filenames: Iterable[str], state: str) -> int:
+        """
+        State-Wechsel ohne Neu-Lesen (z.B. processed → archive)
+
+        json_mtime bleibt beim Rename gleich → sync() überspringt die Jobs
+        """
+        rows = [(state, filename) for filename in filenames]
+        with self._lock:
+            self._conn.executemany("UPDATE docs SET state = ? WHERE filename = ?", rows)
+            self._conn.commit()
+        return len(rows)
+
+    # ========================================================================
+    # CATCH-UP
+    # ========================================================================
+
+    def sync(self, states: Iterable[str] = INDEXED_STATES) -> int:
+        """
+        Gleicht den Search Index mit dem Job Index ab
+
+        === ABLAUF ===
+        1. Job Index Catch-up Scan (billig wenn nichts passiert ist)
+        2. Änderungen + Löschungen seit der letzten Sequenz, in Sequenz-
+           Reihenfolge → nur Jobs mit anderem state/json_mtime werden gelesen
+        3. Batches à SEARCH_SYNC_BATCH: Texte ohne Lock lesen, dann
+           schreiben + committen (Fortschritt bleibt bei Abbruch erhalten)
+        Full-Diff per locations() nur wenn der Job Index neu aufgebaut wurde
+        oder die Tombstones schon aufgeräumt sind
+
+        === RETURNS ===
+        int: Anzahl geänderter Dokumente
+        """
+        for state in states:
+            self.job_index.sync(state)
+
+        with self._sync_lock:
+            with self._lock:
+                last_seq = self._meta('job_seq')
+            current_seq, rows, deletions = self.job_index.file_events_since(last_seq)
+
+            changed = 0
+            if current_seq < last_seq or deletions is None:
+                # Job Index neu aufgebaut / Tombstones weg → einmal komplett abgleichen
+                current_seq, rows, _ = self.job_index.file_events_since(0)
+                deletions = []
+                locations = self.job_index.locations()
+                with self._lock:
+                    indexed = [row['filename'] for row in self._conn.execute("SELECT filename FROM docs")]
+                    for filename in indexed:
+                        if filename not in locations:
+                            self._delete(filename)
+                            changed += 1
+                    self._conn.commit()
+
+            events = sorted(
+                [(seq, filename, (state, json_mtime, language)) for seq, filename, state, json_mtime, language in rows]
+                + [(seq, filename, None) for seq, filename in deletions]
+            )
+            for start in range(0, len(events), SEARCH_SYNC_BATCH):
+                changed += self._apply_events(events[start:start + SEARCH_SYNC_BATCH])
+
+            with self._lock:
+                self._set_meta('job_seq', current_seq)
+                self._conn.commit()
+        return changed
+
+    def _apply_events(self, events: List[Tuple[int, str, Optional[Tuple[str, float, Optional[str]]]]]) -> int:
+        """Ein Batch aus file_events_since() → Index (ein Commit)"""
+        with self._lock:
+            current = {}
+            for _, filename, location in events:
+                if location is not None:
+                    row = self._conn.execute(
+                        "SELECT state, json_mtime FROM docs WHERE filename = ?", (filename,)
+                    ).fetchone()
+                    current[filename] = (row['state'], row['json_mtime']) if row else None
+
+        # Texte lesen ohne Lock - Suchen laufen parallel weiter
+        documents = {}
+        for _, filename, location in events:
+            if location is not None and current.get(filename) != location[:2]:
+                documents[filename] = self._document(filename, location[0])
+
+        changed = 0
+        with self._lock:
+            for _, filename, location in events:
+                if location is None:
+                    self._delete(filename)
+                    changed += 1
+                elif filename in documents:
+                    state, json_mtime, language = location
+                    self._upsert(filename, state, json_mtime, language, documents[filename])
+                    changed += 1
+            self._set_meta('job_seq', events[-1][0])
+            self._conn.commit()
+        return changed
+
+    def start_background_sync(self, interval: float = SEARCH_SYNC_SECONDS) -> None:
+        """Daemon-Thread: sync() alle `interval` Sekunden (idempotent)"""
+        with self._lock:
+            if self._sync_thread is not None and self._sync_thread.is_alive():
+                return
+            self._sync_thread = threading.Thread(
+                target=self._sync_loop, args=(interval,), name="syntx-search-sync", daemon=True
+            )
+            self._sync_thread.start()
+
+    def _sync_loop(self, interval: float) -> None:
+        while True:
+            try:
+                self.sync()
+            except Exception as e:
+                print(f"⚠️  Search Index sync failed: {e}")
+            time.sleep(interval)
+
+    # ========================================================================
+    # READ PATH
+    # ========================================================================
+
+    def search(
+        self,
+        query: str,
+        states: Iterable[str] = INDEXED_STATES,
+        language: Optional[str] = None,
+        limit: int = SEARCH_PAGE_SIZE,
+        offset: int = 0,
+        sync: bool = True
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Ranked Volltext-Suche
+
+        === ARGS ===
+        query: Freitext (alle Wörter, letztes als Prefix) oder "Phrase"
+        states: processed / archive
+        language: Nur Jobs dieser Sprache (de, en, ru, ...)
+        limit/offset: Pagination
+        sync: Vorher sync() - False wenn start_background_sync() läuft (API)
+
+        === RETURNS ===
+        (total, [{filename, state, language, rank, matched_in, snippets}, ...])
+        rank: BM25 (kleiner = besser)
+        """
+        match = build_match_query(query)
+        if match is None:
+            return 0, []
+        states = tuple(states)
+        if sync:
+            self.sync(states)
+
+        where = f"fts MATCH ? AND d.state IN ({','.join('?' * len(states))})"
+        params: List[Any] = [match, *states]
+        if language:
+            where += " AND d.language = ?"
+            params.append(language)
+
+        snippets = ", ".join(
+            f"snippet(fts, {i}, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 12) AS s{i}"
+            for i in range(len(_COLUMNS))
+        )
+        with self._lock:
+            try:
+                total = self._conn.execute(
+                    f"SELECT COUNT(*) FROM fts JOIN docs d ON d.id = fts.rowid WHERE {where}", params
+                ).fetchone()[0]
+                rows = self._conn.execute(
+                    f"SELECT d.filename, d.state, d.language, bm25(fts, {', '.join(map(str, _BM25_WEIGHTS))}) AS rank, "
+                    f"{snippets} FROM fts JOIN docs d ON d.id = fts.rowid "
+                    f"WHERE {where} ORDER BY rank LIMIT ? OFFSET ?",
+                    params + [limit, offset]
+                ).fetchall()
+            except sqlite3.OperationalError:
+                # Query die FTS5 trotz Quoting nicht parsen kann
+                return 0, []
+
+        hits = []
+        for row in rows:
+            matched = {}
+            for i, column in enumerate(_COLUMNS):
+                snippet = row[f"s{i}"] or ""
+                if _MARK_OPEN in snippet:
+                    matched[column] = snippet.replace(_MARK_OPEN, "[").replace(_MARK_CLOSE, "]")
+            hits.append({
+                "filename": row['filename'],
+                "state": row['state'],
+                "language": row['language'],
+                "rank": round(row['rank'], 4),
+                "matched_in": list(matched),
+                "snippets": matched,
+            })
+        return total, hits
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Ein Index pro Queue-Root und Prozess
+_indexes: Dict[str, SearchIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(queue_base: Path = QUEUE_BASE) -> SearchIndex:
+    """Prozessweiter SearchIndex für einen Queue-Root"""
+    key = str(Path(queue_base).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = SearchIndex(Path(queue_base))
+        return _indexes[key]
+
+
+# === MAIN BLOCK ===
+if __name__ == "__main__":
+    index = get_search_index()
+
+    start = time.time()
+    changed = index.sync()
+    print(f"Search Index: {index.count()} Dokumente ({changed} aktualisiert)")
+    print(f"Sync: {(time.time() - start) * 1000:.1f}ms")
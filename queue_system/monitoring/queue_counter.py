@@ -0,0 +1,301 @@
+"""
+Queue Counter - Live-Zähler pro Queue-Ordner
+
+=== ZWECK ===
+QueueMonitor hat bei jedem get_status() vier Ordner geglobbt.
+processed/ wächst unbegrenzt → jeder Status-Call wurde langsamer.
+
+Der Queue Counter scannt jeden Ordner EINMAL und hält danach die
+Dateinamen pro Ordner im Speicher. Änderungen kommen über inotify
+(Linux, via ctypes - keine Extra-Dependency). Status-Calls lesen
+nur noch fertige Zahlen.
+
+=== MODI ===
+- inotify: Watcher-Thread bekommt CREATE/DELETE/MOVED Events
+  → Zähler sind immer aktuell, Lesen kostet nichts
+- polling (Fallback, z.B. kein Linux oder inotify-Limit erreicht):
+  Pro Lesezugriff ein stat() auf den Ordner, Rescan nur wenn sich
+  die Directory-mtime geändert hat
+
+=== WAS WIRD GEZÄHLT ===
+Pro Ordner drei Zähler:
+- "txt":  alle *.txt (Semantik von glob("*.txt"))
+- "jobs": *.txt ohne *_response.txt (1 pro Job)
+- "json": *.json (Metadaten)
+
+=== VERWENDUNG ===
+    counter = get_queue_counter()
+    counter.count("incoming")           # → 12
+    counter.counts()                    # → {"incoming": 12, "processing": 2, ...}
+    counter.counts(kind="jobs")
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from ..config.queue_config import *
+
+
+# States die gezählt werden → Unterordner in queue/
+COUNTED_STATES = ("incoming", "processing", "processed", "error")
+
+COUNT_KINDS = ("txt", "jobs", "json")
+
+# inotify Konstanten (linux/inotify.h)
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_CLOEXEC = 0o2000000
+
+_WATCH_MASK = _IN_CREATE | _IN_DELETE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ONLYDIR
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _kinds(name: str) -> Iterable[str]:
+    """In welche Zähler fällt eine Datei"""
+    if name.endswith(".txt"):
+        yield "txt"
+        if not name.endswith("_response.txt"):
+            yield "jobs"
+    elif name.endswith(".json"):
+        yield "json"
+
+
+def _load_libc():
+    """libc mit inotify Funktionen oder None"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class _DirState:
+    """Dateinamen + Zähler eines Ordners"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.names: Set[str] = set()
+        self.totals: Dict[str, int] = dict.fromkeys(COUNT_KINDS, 0)
+        self.mtime_ns: Optional[int] = None
+        self.watched = False
+
+    def add(self, name: str) -> None:
+        if name in self.names:
+            return
+        kinds = list(_kinds(name))
+        if not kinds:
+            return
+        self.names.add(name)
+        for kind in kinds:
+            self.totals[kind] += 1
+
+    def discard(self, name: str) -> None:
+        if name not in self.names:
+            return
+        self.names.remove(name)
+        for kind in _kinds(name):
+            self.totals[kind] -= 1
+
+    def rescan(self) -> None:
+        """Komplett neu zählen (Start, Overflow, Polling)"""
+        self.names = set()
+        self.totals = dict.fromkeys(COUNT_KINDS, 0)
+        try:
+            self.mtime_ns = self.path.stat().st_mtime_ns
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    self.add(entry.name)
+        except FileNotFoundError:
+            self.mtime_ns = None
+
+
+class QueueCounter:
+    """
+    Live-Zähler über alle Queue-Ordner
+
+    === THREAD-SAFETY ===
+    Ein Lock schützt die Namens-Sets, der Watcher-Thread und
+    beliebig viele Leser können parallel laufen
+
+    === PERFORMANCE ===
+    inotify: count() = Dict-Lookup, unabhängig von der Ordnergröße
+    polling: count() = ein stat(), Rescan nur nach Änderungen
+    """
+
+    def __init__(self, queue_base: Path = QUEUE_BASE, states: Iterable[str] = COUNTED_STATES,
+                 use_inotify: bool = True):
+        self.queue_base = Path(queue_base)
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, _DirState] = {
+            state: _DirState(self.queue_base / state) for state in states
+        }
+        self._wd_to_state: Dict[int, str] = {}
+        self._fd: Optional[int] = None
+
+        if use_inotify:
+            self._start_inotify()
+
+        # Erst nach add_watch scannen → kein Event geht verloren
+        # (Sets machen doppelte Events harmlos)
+        with self._lock:
+            for dir_state in self._dirs.values():
+                dir_state.rescan()
+
+    @property
+    def mode(self) -> str:
+        return "inotify" if self._fd is not None else "polling"
+
+    # ========================================================================
+    # INOTIFY
+    # ========================================================================
+
+    def _start_inotify(self) -> None:
+        libc = _load_libc()
+        if libc is None:
+            return
+
+        fd = libc.inotify_init1(_IN_CLOEXEC)
+        if fd < 0:
+            return
+
+        for state, dir_state in self._dirs.items():
+            wd = libc.inotify_add_watch(fd, os.fsencode(str(dir_state.path)), _WATCH_MASK)
+            if wd >= 0:
+                self._wd_to_state[wd] = state
+                dir_state.watched = True
+
+        if not self._wd_to_state:
+            os.close(fd)
+            return
+
+        self._fd = fd
+        thread = threading.Thread(target=self._watch, name="queue-counter", daemon=True)
+        thread.start()
+
+    def _watch(self) -> None:
+        """Watcher-Thread: liest Events und pflegt die Sets"""
+        while True:
+            try:
+                select.select([self._fd], [], [])
+                buffer = os.read(self._fd, 64 * 1024)
+            except OSError:
+                return
+
+            with self._lock:
+                self._apply_events(buffer)
+
+    def _apply_events(self, buffer: bytes) -> None:
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(buffer):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b"\0").decode(errors="surrogateescape")
+            offset += length
+
+            if mask & _IN_Q_OVERFLOW:
+                # Kernel-Queue übergelaufen → Events verloren, neu zählen
+                for dir_state in self._dirs.values():
+                    dir_state.rescan()
+                continue
+
+            state = self._wd_to_state.get(wd)
+            if state is None:
+                continue
+            dir_state = self._dirs[state]
+
+            if mask & (_IN_IGNORED | _IN_DELETE_SELF | _IN_MOVE_SELF):
+                # Ordner weg → für diesen Ordner auf Polling zurückfallen
+                dir_state.watched = False
+                self._wd_to_state.pop(wd, None)
+                dir_state.rescan()
+            elif mask & (_IN_CREATE | _IN_MOVED_TO):
+                dir_state.add(name)
+            elif mask & (_IN_DELETE | _IN_MOVED_FROM):
+                dir_state.discard(name)
+
+    # ========================================================================
+    # POLLING FALLBACK
+    # ========================================================================
+
+    def _refresh_unwatched(self) -> None:
+        """Rescan nicht-überwachter Ordner deren mtime sich geändert hat"""
+        for dir_state in self._dirs.values():
+            if dir_state.watched:
+                continue
+            try:
+                mtime_ns = dir_state.path.stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime_ns = None
+            if mtime_ns != dir_state.mtime_ns:
+                dir_state.rescan()
+
+    # ========================================================================
+    # READ
+    # ========================================================================
+
+    def count(self, state: str, kind: str = "txt") -> int:
+        """
+        Anzahl Dateien in einem Queue-Ordner
+
+        === ARGS ===
+        state: incoming | processing | processed | error
+        kind: "txt" (wie glob("*.txt")), "jobs" (ohne _response.txt), "json"
+        """
+        with self._lock:
+            self._refresh_unwatched()
+            return self._dirs[state].totals[kind]
+
+    def counts(self, kind: str = "txt") -> Dict[str, int]:
+        """Zähler aller Ordner auf einmal"""
+        with self._lock:
+            self._refresh_unwatched()
+            return {state: dir_state.totals[kind] for state, dir_state in self._dirs.items()}
+
+    def names(self, state: str) -> Set[str]:
+        """Kopie der Dateinamen eines Ordners (z.B. für processing/ Details)"""
+        with self._lock:
+            self._refresh_unwatched()
+            return set(self._dirs[state].names)
+
+
+# Ein Counter pro Queue-Root und Prozess
+_counters: Dict[str, QueueCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_queue_counter(queue_base: Path = QUEUE_BASE) -> QueueCounter:
+    """
+    Prozessweiter QueueCounter für einen Queue-Root
+
+    === WARUM SINGLETON ===
+    Ein Watcher-Thread + ein Satz inotify-Watches pro Prozess
+    """
+    key = str(Path(queue_base).resolve())
+    with _counters_lock:
+        if key not in _counters:
+            _counters[key] = QueueCounter(Path(queue_base))
+        return _counters[key]
+
+
+# === MAIN BLOCK ===
+if __name__ == "__main__":
+    import json
+
+    counter = get_queue_counter()
+    print(f"Modus: {counter.mode}")
+    for kind in COUNT_KINDS:
+        print(f"{kind}: {json.dumps(counter.counts(kind))}")
@@ -6,8 +6,8 @@ Dieses Modul überwacht den Zustand des Queue-Systems in Echtzeit.
 Es zählt Jobs in allen Queue-Ordnern und bestimmt den System-Zustand.
 
 === ARCHITEKTUR ===
-- Keine State-Speicherung (stateless)
-- Jeder Aufruf liest direkt vom Filesystem
+- Zählen macht der QueueCounter (inotify, Polling-Fallback)
+- Monitor selbst hält keinen State - liest nur fertige Zähler
 - Pure Functions - nur Zählen und Analysieren
 - Kein Locking nötig (nur lesend)
 
@@ -22,6 +22,7 @@ from datetime import datetime
 
 # Config importieren (Pfade + Thresholds)
 from ..config.queue_config import *
+from .queue_counter import get_queue_counter
 
 
 class QueueMonitor:
@@ -33,13 +34,21 @@ class QueueMonitor:
     
     === THREAD-SAFETY ===
     Thread-safe weil read-only operations
-    Mehrere Monitor-Instanzen können parallel laufen
+    Mehrere Monitor-Instanzen teilen sich einen QueueCounter
     
     === PERFORMANCE ===
-    O(n) pro count Operation wo n = Anzahl Dateien im Ordner
-    Bei 1000 Dateien: ~1-2ms pro Operation
+    O(1) pro count Operation - Zähler werden per inotify gepflegt
+    Ohne inotify: ein stat() pro Ordner, Rescan nur nach Änderungen
     """
     
+    def __init__(self, queue_base: Path = QUEUE_BASE):
+        """
+        Holt den prozessweiten QueueCounter
+        
+        Erster Aufruf scannt die Ordner einmal, danach nur noch Events
+        """
+        self.counter = get_queue_counter(queue_base)
+    
     def count_incoming(self) -> int:
         """
         Zählt wartende Jobs in incoming/
@@ -63,10 +72,9 @@ class QueueMonitor:
         
         → count = 3
         """
-        # glob("*.txt") findet alle .txt Dateien
-        # list() konvertiert Generator zu Liste
-        # len() zählt Liste
-        return len(list(QUEUE_INCOMING.glob("*.txt")))
+        # Zähler "txt" = gleiche Semantik wie glob("*.txt")
+        # aber ohne Directory-Scan pro Aufruf
+        return self.counter.count("incoming")
     
     def count_processing(self) -> int:
         """
@@ -85,14 +93,15 @@ class QueueMonitor:
         === WARNUNG ===
         Wenn count > 0 für lange Zeit (>1h):
         → Worker ist abgestürzt
-        → Datei manuell zurück nach incoming/ verschieben
+        → Reaper (leases.py) holt den Job nach Lease-Ablauf zurück
+          nach incoming/ - bleibt er trotzdem hängen, läuft kein Consumer
         
         === RETURNS ===
         int: Anzahl Jobs in Bearbeitung
         """
         # Gleiche Logik wie count_incoming
         # Aber anderer Ordner
-        return len(list(QUEUE_PROCESSING.glob("*.txt")))
+        return self.counter.count("processing")
     
     def count_processed(self) -> int:
         """
@@ -116,7 +125,7 @@ class QueueMonitor:
         === RETURNS ===
         int: Anzahl erfolgreicher Jobs (lifetime seit letztem cleanup)
         """
-        return len(list(QUEUE_PROCESSED.glob("*.txt")))
+        return self.counter.count("processed")
     
     def count_error(self) -> int:
         """
@@ -142,7 +151,7 @@ class QueueMonitor:
         === RETURNS ===
         int: Anzahl fehlgeschlagener Jobs
         """
-        return len(list(QUEUE_ERROR.glob("*.txt")))
+        return self.counter.count("error")
     
     def get_status(self) -> dict:
         """
@@ -177,9 +186,12 @@ class QueueMonitor:
         === RETURNS ===
         dict: Status-Snapshot mit allen Metriken
         """
-        # Incoming Count holen für State-Bestimmung
+        # Alle Zähler in einem Lock-Durchgang → konsistenter Snapshot
+        counts = self.counter.counts()
+        
+        # Incoming Count für State-Bestimmung
         # Dieser Wert ist der wichtigste für Producer-Entscheidung
-        incoming = self.count_incoming()
+        incoming = counts["incoming"]
         
         # Status-Dict bauen
         return {
@@ -188,10 +200,10 @@ class QueueMonitor:
             
             # Queue Counts - alle Ordner
             "queue": {
-                "incoming": incoming,           # Wie viel Arbeit wartet
-                "processing": self.count_processing(),  # Wie viel läuft gerade
-                "processed": self.count_processed(),    # Wie viel erfolgreich
-                "error": self.count_error()             # Wie viel fehlgeschlagen
+                "incoming": incoming,                  # Wie viel Arbeit wartet
+                "processing": counts["processing"],    # Wie viel läuft gerade
+                "processed": counts["processed"],      # Wie viel erfolgreich
+                "error": counts["error"]               # Wie viel fehlgeschlagen
             },
             
             # System-Zustand basierend auf incoming count
@@ -274,7 +286,7 @@ if __name__ == "__main__":
     # Monitor-Instanz erstellen
     monitor = QueueMonitor()
     
-    # Status holen (liest vom Filesystem)
+    # Status holen (erster Aufruf scannt einmal)
     status = monitor.get_status()
     
     # Pretty-Print als JSON
@@ -5,7 +5,7 @@ SYNTX Coherence Analyzer - Cross-Field Kohärenz Bewertung
 import logging
 from typing import Dict, List, Tuple, Optional
 
-from .embeddings import semantic_similarity, get_embedding
+from .embeddings import EmbeddingBatch
 
 logger = logging.getLogger("SYNTX.Coherence")
 
@@ -27,9 +27,19 @@ COHERENCE_PAIRS = {
     ]
 }
 
-def analyze_pairwise_coherence(fields: Dict[str, str], format_type: str = "SYNTEX_SYSTEM") -> Dict:
-    """Analysiert Kohärenz zwischen Feldpaaren"""
+def analyze_pairwise_coherence(fields: Dict[str, str], format_type: str = "SYNTEX_SYSTEM",
+                               batch: Optional[EmbeddingBatch] = None) -> Dict:
+    """
+    Analysiert Kohärenz zwischen Feldpaaren
+    
+    batch: Vorberechnete Embeddings (z.B. aus score_all_fields)
+           Ohne batch werden alle Feldtexte einmal gemeinsam encodet
+    """
     pairs = COHERENCE_PAIRS.get(format_type, [])
+    if batch is None:
+        batch = EmbeddingBatch(
+            fields.get(name, "") for pair in pairs for name in pair[:2]
+        ).encode()
     results = []
     total_score = 0.0
     valid_pairs = 0
@@ -39,7 +49,7 @@ def analyze_pairwise_coherence(fields: Dict[str, str], format_type: str = "SYNTE
         text2 = fields.get(field2, "")
         
         if text1 and text2:
-            sim = semantic_similarity(text1, text2)
+            sim = batch.similarity(text1, text2)
             passed = sim >= min_expected
             results.append({
                 "pair": f"{field1} <-> {field2}",
@@ -59,9 +69,10 @@ def analyze_pairwise_coherence(fields: Dict[str, str], format_type: str = "SYNTE
         "details": results
     }
 
-def calculate_coherence_score(fields: Dict[str, str], format_type: str = "SYNTEX_SYSTEM") -> float:
+def calculate_coherence_score(fields: Dict[str, str], format_type: str = "SYNTEX_SYSTEM",
+                              batch: Optional[EmbeddingBatch] = None) -> float:
     """Berechnet einen einzelnen Kohärenz-Score (0.0 - 1.0)"""
-    result = analyze_pairwise_coherence(fields, format_type)
+    result = analyze_pairwise_coherence(fields, format_type, batch)
     return result["average_coherence"]
 
 def detect_incoherence(fields: Dict[str, str], format_type: str = "SYNTEX_SYSTEM") -> List[str]:
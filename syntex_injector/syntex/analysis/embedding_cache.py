@@ -0,0 +1,242 @@
+"""
+SYNTX Embedding Cache - Content-Hash → Vektor, In-Memory LRU + Disk Store
+
+=== ZWECK ===
+Feld-Definitionen und Ideal-Responses (field_definitions.py bzw.
+/opt/syntx-config/formats) sind statisch, wurden aber für jede Response
+neu encodet. Der Cache hält Vektoren nach SHA1 des Textes:
+
+- Memory: LRU (SYNTX_EMBEDDING_CACHE_SIZE Einträge) für alle Texte
+- Disk: Referenz-Texte (persist=True) pro Model als
+      <cache_dir>/<model>/vectors.npy   (float32, per mmap geladen)
+      <cache_dir>/<model>/keys.json     (Hash-Liste, Zeile i = vectors[i])
+
+Format-Änderung → neuer Text → neuer Hash → wird einmal neu berechnet.
+Andere Consumer-Prozesse sehen neue Vektoren beim nächsten Lookup
+(keys.json mtime ändert sich).
+
+Schreiben (Reload → Merge → Replace beider Dateien) läuft unter
+fcntl.flock auf <cache_dir>/<model>/.lock → parallele Consumer verlieren
+keine Vektoren und Keys passen immer zu den Zeilen. Der Store wächst nur
+am Ende, ein Reader zwischen den zwei Replaces sieht höchstens weniger
+Keys als Zeilen (Längen-Check).
+"""
+
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..utils.stage_metrics import count_event
+
+logger = logging.getLogger("SYNTX.EmbeddingCache")
+
+CACHE_DIR = Path(os.getenv("SYNTX_EMBEDDING_CACHE_DIR", "/opt/syntx-config/cache/embeddings"))
+CACHE_SIZE = int(os.getenv("SYNTX_EMBEDDING_CACHE_SIZE", "4096"))
+
+
+def text_key(text: str) -> str:
+    """Content-Hash eines Textes"""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Embedding Cache für ein Model
+
+    Verwendung:
+        cache = EmbeddingCache("paraphrase-multilingual-MiniLM-L12-v2")
+        vectors = cache.encode(texts, encoder=encode_batch, persist={description})
+    """
+
+    def __init__(self, model_name: str, cache_dir: Path = CACHE_DIR, max_size: int = CACHE_SIZE):
+        self.model_name = model_name
+        self.max_size = max_size
+        self.store_dir = Path(cache_dir) / re.sub(r"[^A-Za-z0-9_.-]", "_", model_name)
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+        # Disk Store (read-only mmap + Key → Zeile)
+        self._disk_vectors: Optional[np.ndarray] = None
+        self._disk_rows: Dict[str, int] = {}
+        self._disk_mtime: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+
+    # ========================================================================
+    # DISK STORE
+    # ========================================================================
+
+    @property
+    def _keys_file(self) -> Path:
+        return self.store_dir / "keys.json"
+
+    @property
+    def _vectors_file(self) -> Path:
+        return self.store_dir / "vectors.npy"
+
+    def _reload_disk(self) -> None:
+        """Lädt den Disk Store neu wenn ein anderer Prozess geschrieben hat"""
+        try:
+            mtime = self._keys_file.stat().st_mtime
+        except FileNotFoundError:
+            return
+        if mtime == self._disk_mtime:
+            return
+        try:
+            with open(self._keys_file, "r", encoding="utf-8") as f:
+                keys = json.load(f)
+            vectors = np.load(self._vectors_file, mmap_mode="r")
+            if len(keys) != len(vectors):
+                logger.warning("⚠️ Embedding Store inkonsistent - wird ignoriert")
+                return
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Embedding Store nicht lesbar: {e}")
+            return
+        self._disk_vectors = vectors
+        self._disk_rows = {key: i for i, key in enumerate(keys)}
+        self._disk_mtime = mtime
+
+    def _persist(self, new_vectors: Dict[str, np.ndarray]) -> None:
+        """Hängt neue Vektoren an den Disk Store an (atomic replace, unter flock)"""
+        try:
+            self.store_dir.mkdir(parents=True, exist_ok=True)
+            lock_file = open(self.store_dir / ".lock", "w")
+        except OSError as e:
+            logger.warning(f"⚠️ Embedding Store nicht schreibbar: {e}")
+            return
+        with lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            # Stand des letzten Writers - mtime allein kann gleich geblieben sein
+            self._disk_mtime = None
+            self._reload_disk()
+            self._persist_locked(new_vectors)
+
+    def _persist_locked(self, new_vectors: Dict[str, np.ndarray]) -> None:
+        new_vectors = {k: v for k, v in new_vectors.items() if k not in self._disk_rows}
+        if not new_vectors:
+            return
+
+        keys = list(self._disk_rows.keys()) + list(new_vectors.keys())
+        parts = [np.asarray(v, dtype=np.float32)[None, :] for v in new_vectors.values()]
+        if self._disk_vectors is not None and len(self._disk_vectors):
+            parts.insert(0, np.asarray(self._disk_vectors, dtype=np.float32))
+        matrix = np.concatenate(parts)
+
+        try:
+            suffix = f".{os.getpid()}.tmp"
+            vectors_tmp = self.store_dir / ("vectors.npy" + suffix)
+            keys_tmp = self.store_dir / ("keys.json" + suffix)
+            with open(vectors_tmp, "wb") as f:
+                np.save(f, matrix)
+            with open(keys_tmp, "w", encoding="utf-8") as f:
+                json.dump(keys, f)
+            # Vektoren zuerst, Keys zuletzt → Reader sieht nie Keys ohne Vektoren
+            os.replace(vectors_tmp, self._vectors_file)
+            os.replace(keys_tmp, self._keys_file)
+        except OSError as e:
+            logger.warning(f"⚠️ Embedding Store nicht schreibbar: {e}")
+            return
+
+        self._disk_mtime = None
+        self._reload_disk()
+
+    # ========================================================================
+    # LOOKUP
+    # ========================================================================
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _lookup(self, key: str) -> Optional[np.ndarray]:
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            return vector
+        row = self._disk_rows.get(key)
+        if row is not None:
+            vector = np.array(self._disk_vectors[row])
+            self._remember(key, vector)
+            return vector
+        return None
+
+    def encode(
+        self,
+        texts: List[str],
+        encoder: Callable[[List[str]], Optional[np.ndarray]],
+        persist: Iterable[str] = ()
+    ) -> Optional[np.ndarray]:
+        """
+        Vektoren für texts - nur Cache-Misses gehen an den Encoder
+
+        Args:
+            texts: Texte (nicht leer)
+            encoder: Batch-Encoder (z.B. embeddings.encode_batch)
+            persist: Texte die zusätzlich auf Disk gespeichert werden
+
+        Returns:
+            Matrix (len(texts) x dim) oder None wenn Encoder nicht verfügbar
+        """
+        if not texts:
+            return None
+
+        keys = [text_key(t) for t in texts]
+        persist_keys = {text_key(t) for t in persist}
+
+        with self._lock:
+            self._reload_disk()
+            vectors: List[Optional[np.ndarray]] = [self._lookup(k) for k in keys]
+            missing = [i for i, v in enumerate(vectors) if v is None]
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        count_event("embedding_cache_hits", n=len(texts) - len(missing))
+        count_event("embedding_cache_misses", n=len(missing))
+
+        if missing:
+            encoded = encoder([texts[i] for i in missing])
+            if encoded is None:
+                return None
+            to_persist = {}
+            with self._lock:
+                for i, vector in zip(missing, encoded):
+                    vectors[i] = vector
+                    self._remember(keys[i], vector)
+                    if keys[i] in persist_keys:
+                        to_persist[keys[i]] = vector
+                if to_persist:
+                    self._persist(to_persist)
+
+        return np.vstack(vectors)
+
+    def stats(self) -> Dict:
+        return {
+            "model": self.model_name,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk_rows),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# Ein Cache pro Model und Prozess
+_caches: Dict[str, EmbeddingCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_embedding_cache(model_name: str) -> EmbeddingCache:
+    """Prozessweiter EmbeddingCache für ein Model"""
+    with _caches_lock:
+        if model_name not in _caches:
+            _caches[model_name] = EmbeddingCache(model_name)
+        return _caches[model_name]
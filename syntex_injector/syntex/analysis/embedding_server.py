@@ -0,0 +1,233 @@
+"""
+SYNTX Embedding Server - Ein Model für alle Consumer über Unix Socket
+
+=== ZWECK ===
+Ohne Server lädt jeder Consumer-Prozess (Cron, Pool-Worker, API) sein
+eigenes SentenceTransformer Model: Ladezeit beim ersten Job + eine
+Model-Kopie im RAM pro Prozess.
+
+Der Server lädt das Model EINMAL (inkl. Warm-up) und beantwortet
+Batch-Encode Requests über einen Unix Socket. embeddings.encode_batch()
+fragt zuerst den Server und fällt auf das In-Process Model zurück,
+wenn der Socket nicht existiert oder nicht antwortet.
+
+=== PROTOKOLL ===
+Frames = 4 Byte Länge (big endian) + Payload
+Request:  JSON {"op": "encode", "model": "...", "texts": [...]}  |  {"op": "ping"}
+Response: JSON Header {"ok": true, "shape": [n, dim], "dtype": "float32", "model": "..."}
+          + Frame mit den rohen Vektor-Bytes (nur bei encode)
+
+=== STARTEN ===
+    cd /opt/syntx-workflow-api-get-prompts
+    python3 -m syntex_injector.syntex.analysis.embedding_server
+    # oder als Service: syntx-embeddings.service
+
+=== CONFIG ===
+SYNTX_EMBEDDING_SOCKET          Socket-Pfad (default /tmp/syntx-embeddings.sock)
+SYNTX_EMBEDDING_SERVER=off      Client fragt den Server nie
+SYNTX_EMBEDDING_SOCKET_TIMEOUT  Sekunden pro Request (default 30)
+"""
+
+import json
+import logging
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("SYNTX.EmbeddingServer")
+
+SOCKET_PATH = os.getenv("SYNTX_EMBEDDING_SOCKET", "/tmp/syntx-embeddings.sock")
+SOCKET_TIMEOUT = float(os.getenv("SYNTX_EMBEDDING_SOCKET_TIMEOUT", "30"))
+SERVER_ENABLED = os.getenv("SYNTX_EMBEDDING_SERVER", "on").lower() != "off"
+
+# Nach einem Fehler nicht bei jedem Encode neu verbinden
+RETRY_AFTER_SECONDS = 30
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def _send_frame(sock: socket.socket, payload: bytes) -> None:
+    sock.sendall(_FRAME_HEADER.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Socket closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _FRAME_HEADER.unpack(_recv_exact(sock, _FRAME_HEADER.size))
+    return _recv_exact(sock, size)
+
+
+# ============================================================================
+# CLIENT
+# ============================================================================
+
+_unavailable_until = 0.0
+
+
+def _request(message: Dict) -> Optional[tuple]:
+    """Ein Request/Response Roundtrip - None wenn Server nicht erreichbar"""
+    global _unavailable_until
+    if not SERVER_ENABLED or time.time() < _unavailable_until or not os.path.exists(SOCKET_PATH):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(SOCKET_TIMEOUT)
+            sock.connect(SOCKET_PATH)
+            _send_frame(sock, json.dumps(message).encode("utf-8"))
+            header = json.loads(_recv_frame(sock))
+            payload = _recv_frame(sock) if header.get("ok") and "shape" in header else None
+            return header, payload
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Embedding Server nicht erreichbar ({e}) - nutze lokales Model")
+        _unavailable_until = time.time() + RETRY_AFTER_SECONDS
+        return None
+
+
+def remote_encode(texts: List[str], model_name: str) -> Optional[np.ndarray]:
+    """
+    Encodet texts über den Embedding Server
+
+    Returns:
+        Matrix (len(texts) x dim) oder None → Caller nutzt In-Process Model
+    """
+    result = _request({"op": "encode", "model": model_name, "texts": list(texts)})
+    if result is None:
+        return None
+    header, payload = result
+    if not header.get("ok"):
+        # z.B. Server läuft mit anderem Model → lokale Vektoren sind konsistenter
+        logger.warning(f"⚠️ Embedding Server: {header.get('error')}")
+        return None
+    return np.frombuffer(payload, dtype=header["dtype"]).reshape(header["shape"])
+
+
+def ping() -> Optional[Dict]:
+    """Server-Status (Model, Requests, Uptime) oder None"""
+    result = _request({"op": "ping"})
+    return result[0] if result else None
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+class _EncodeHandler(socketserver.BaseRequestHandler):
+    """Ein Request pro Verbindung"""
+
+    def handle(self):
+        server: "EmbeddingServer" = self.server
+        try:
+            message = json.loads(_recv_frame(self.request))
+        except (OSError, ValueError):
+            return
+
+        try:
+            if message.get("op") == "ping":
+                _send_frame(self.request, json.dumps(server.status()).encode("utf-8"))
+                return
+
+            if message.get("model") and message["model"] != server.model_name:
+                raise ValueError(f"Server Model ist {server.model_name}, nicht {message['model']}")
+
+            vectors = server.encode(message.get("texts", []))
+            header = {
+                "ok": True,
+                "model": server.model_name,
+                "shape": list(vectors.shape),
+                "dtype": "float32"
+            }
+            _send_frame(self.request, json.dumps(header).encode("utf-8"))
+            _send_frame(self.request, vectors.tobytes())
+        except Exception as e:
+            try:
+                _send_frame(self.request, json.dumps({"ok": False, "error": str(e)}).encode("utf-8"))
+            except OSError:
+                pass
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Hält das Model im Speicher und encodet für alle Clients
+
+    Connections laufen in Threads, model.encode() ist per Lock serialisiert
+    (ein Forward Pass nach dem anderen, jeder davon gebatcht)
+    """
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str = SOCKET_PATH):
+        from .embeddings import _get_model, get_model_name
+
+        self.model = _get_model()
+        if self.model is None:
+            raise RuntimeError("Embedding Model konnte nicht geladen werden")
+        self.model_name = get_model_name()
+        self._encode_lock = threading.Lock()
+        self.started = time.time()
+        self.requests = 0
+        self.texts = 0
+
+        # Warm-up: erster Forward Pass initialisiert Tokenizer/Kernels
+        self.encode(["SYNTX warm-up"])
+        logger.info(f"🔥 Model warm: {self.model_name}")
+
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _EncodeHandler)
+        os.chmod(socket_path, 0o660)
+        self.socket_path = socket_path
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        with self._encode_lock:
+            self.requests += 1
+            self.texts += len(texts)
+            if not texts:
+                return np.empty((0, 0), dtype=np.float32)
+            return np.asarray(self.model.encode(texts, convert_to_numpy=True), dtype=np.float32)
+
+    def status(self) -> Dict:
+        return {
+            "ok": True,
+            "model": self.model_name,
+            "requests": self.requests,
+            "texts": self.texts,
+            "uptime_seconds": round(time.time() - self.started, 1)
+        }
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def serve(socket_path: str = SOCKET_PATH) -> None:
+    """Startet den Server (blockiert)"""
+    server = EmbeddingServer(socket_path)
+    logger.info(f"🌊 Embedding Server lauscht auf {socket_path}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+# === MAIN BLOCK ===
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    serve()
@@ -1,24 +1,46 @@
 """
 SYNTX Semantic Embeddings - Sentence Transformers mit Caching
+
+Alle Vektoren laufen über den EmbeddingCache (embedding_cache.py):
+Referenz-Texte (Definitionen, Ideale) werden pro Model einmal berechnet
+und auf Disk gehalten, alles andere liegt im In-Memory LRU.
+
+Cache-Misses gehen an den Embedding Server (embedding_server.py), falls
+er läuft - sonst wird das Model im eigenen Prozess geladen.
 """
 
 import os
 import logging
-from typing import Optional, List, Tuple
-from functools import lru_cache
+import threading
+from typing import Optional, List, Tuple, Dict, Iterable
 
 import numpy as np
 
+from .embedding_cache import get_embedding_cache
+from .embedding_server import remote_encode, ping
+
 # Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("SYNTX.Embeddings")
 
-# Model wird lazy geladen
+# Model wird lazy geladen (Lock: Pool-Worker dürfen nicht parallel laden)
 _model = None
 _model_name = None
+_model_lock = threading.Lock()
+
+def get_model_name() -> str:
+    """Name des konfigurierten Embedding Models (Cache-Namespace)"""
+    return _model_name or os.getenv("SYNTX_EMBEDDING_MODEL", "paraphrase-multilingual-MiniLM-L12-v2")
 
 def _get_model():
     """Lazy Load des Sentence Transformer Models"""
+    if _model is not None:
+        return _model
+    with _model_lock:
+        return _load_model()
+
+def _load_model():
+    """Lädt das Model (nur unter _model_lock aufrufen)"""
     global _model, _model_name
     if _model is None:
         try:
@@ -38,17 +60,130 @@ def _get_model():
     return _model
 
 
-def get_embedding(text: str) -> Optional[np.ndarray]:
-    """Berechnet Embedding für einen Text"""
+def get_embedding(text: str, persist: bool = False) -> Optional[np.ndarray]:
+    """
+    Berechnet Embedding für einen Text (über den Cache)
+    
+    persist: Auch auf Disk speichern (für statische Referenz-Texte)
+    """
+    if not text or not text.strip():
+        return None
+    vectors = cached_encode([text], persist=[text] if persist else ())
+    return vectors[0] if vectors is not None else None
+
+def warmup() -> str:
+    """
+    Model vorab bereitstellen (z.B. beim Consumer-Start statt beim ersten Job)
+    
+    Returns:
+        "server" wenn der Embedding Server antwortet,
+        "local" wenn das Model im Prozess geladen wurde, sonst "unavailable"
+    """
+    status = ping()
+    if status and status.get("model") == get_model_name():
+        return "server"
     model = _get_model()
-    if model is None or not text or not text.strip():
+    if model is None:
+        return "unavailable"
+    encode_batch(["SYNTX warm-up"])
+    return "local"
+
+def encode_batch(texts: List[str]) -> Optional[np.ndarray]:
+    """
+    Berechnet Embeddings für viele Texte in EINEM model.encode Call
+    
+    Reihenfolge: Embedding Server → In-Process Model
+    
+    Returns:
+        Matrix (len(texts) x dim), Zeilen in Input-Reihenfolge
+        None wenn Model nicht verfügbar
+    """
+    if not texts:
+        return None
+    if _model is None:
+        vectors = remote_encode(texts, get_model_name())
+        if vectors is not None:
+            return vectors
+    model = _get_model()
+    if model is None or not texts:
         return None
     try:
-        return model.encode(text, convert_to_numpy=True)
+        return model.encode(list(texts), convert_to_numpy=True)
     except Exception as e:
-        logger.error(f"Embedding error: {e}")
+        logger.error(f"Batch embedding error: {e}")
         return None
 
+
+def cached_encode(texts: List[str], persist: Iterable[str] = ()) -> Optional[np.ndarray]:
+    """
+    encode_batch mit Cache davor - nur unbekannte Texte gehen ans Model
+    
+    persist: Texte die zusätzlich im Disk Store landen
+    """
+    return get_embedding_cache(get_model_name()).encode(list(texts), encode_batch, persist)
+
+
+class EmbeddingBatch:
+    """
+    Sammelt alle Texte einer Bewertung und encodet sie auf einmal
+    
+    Verwendung:
+        batch = EmbeddingBatch()
+        batch.add(field_text)
+        batch.add_reference(description, ideal)  # persistent gecacht
+        batch.encode()                      # 1 Forward Pass für alle Cache-Misses
+        batch.similarity(field_text, ideal) # nur noch Lookup
+    
+    Leere Texte werden nicht encodet (Similarity = 0.0 wie bei
+    semantic_similarity), doppelte Texte nur einmal.
+    """
+    
+    def __init__(self, texts: Iterable[str] = ()):
+        self._index: Dict[str, int] = {}
+        self._texts: List[str] = []
+        self._references: set = set()
+        self._cosines: Optional[np.ndarray] = None
+        self.add(*texts)
+    
+    def add(self, *texts: str) -> "EmbeddingBatch":
+        for text in texts:
+            if text and text.strip() and text not in self._index:
+                self._index[text] = len(self._texts)
+                self._texts.append(text)
+                self._cosines = None
+        return self
+    
+    def add_reference(self, *texts: str) -> "EmbeddingBatch":
+        """Statische Texte (Definitionen, Ideale) - landen im Disk Cache"""
+        self.add(*texts)
+        self._references.update(t for t in texts if t in self._index)
+        return self
+    
+    def encode(self) -> "EmbeddingBatch":
+        """Ein encode() + eine Matrix-Multiplikation für alle Paare"""
+        embeddings = cached_encode(self._texts, persist=self._references)
+        if embeddings is None:
+            self._cosines = np.zeros((len(self._texts), len(self._texts)))
+            return self
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        normalized = embeddings / norms
+        self._cosines = normalized @ normalized.T
+        return self
+    
+    def similarity(self, text1: str, text2: str) -> float:
+        """Wie semantic_similarity, aber aus der vorberechneten Matrix"""
+        i = self._index.get(text1)
+        j = self._index.get(text2)
+        if i is None or j is None:
+            # Nicht gesammelt oder leer
+            if text1 and text1.strip() and text2 and text2.strip():
+                return semantic_similarity(text1, text2)
+            return 0.0
+        if self._cosines is None:
+            self.encode()
+        return max(0.0, min(1.0, float(self._cosines[i, j])))
+
 def cosine_similarity(vec1: np.ndarray, vec2: np.ndarray) -> float:
     """Berechnet Cosine Similarity zwischen zwei Vektoren"""
     if vec1 is None or vec2 is None:
@@ -15,8 +15,9 @@ from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 
 from .field_definitions import get_field_definition, get_all_field_names
-from .embeddings import semantic_similarity, keyword_coverage
+from .embeddings import semantic_similarity, keyword_coverage, EmbeddingBatch
 from .coherence import calculate_coherence_score
+from ..utils.stage_metrics import stage
 
 logger = logging.getLogger("SYNTX.ScorerV2")
 
@@ -176,11 +177,12 @@ def _score_structure(text: str) -> float:
     
     return min(1.0, score)
 
-def _score_similarity(text: str, field_def: Dict) -> float:
+def _score_similarity(text: str, field_def: Dict, batch: Optional[EmbeddingBatch] = None) -> float:
     """
     Semantische Ähnlichkeit zur Feld-Definition
     Das Herz des V2 Scorers! ❤️
     Hier passiert die MAGIE mit Embeddings!
+    Mit batch: nur Lookup in der vorberechneten Cosine-Matrix
     """
     if not text:
         return 0.0
@@ -192,11 +194,12 @@ def _score_similarity(text: str, field_def: Dict) -> float:
         return 0.5  # Keine Definition? Dann neutral.
     
     # Embeddings go BRRRRR 🚀
+    similarity = batch.similarity if batch is not None else semantic_similarity
     scores = []
     if description:
-        scores.append(semantic_similarity(text, description))
+        scores.append(similarity(text, description))
     if ideal:
-        scores.append(semantic_similarity(text, ideal))
+        scores.append(similarity(text, ideal))
     
     return sum(scores) / len(scores) if scores else 0.5
 
@@ -205,7 +208,8 @@ def _score_similarity(text: str, field_def: Dict) -> float:
 # ═══════════════════════════════════════════════════════════════════════════════
 
 def score_field(field_name: str, field_value: str, all_fields: Dict[str, str], 
-                format_type: str = "SYNTEX_SYSTEM") -> FieldScore:
+                format_type: str = "SYNTEX_SYSTEM",
+                batch: Optional[EmbeddingBatch] = None) -> FieldScore:
     """
     Bewertet ein einzelnes Feld semantisch
     Der Micro-Manager unter den Scorern 🔍
@@ -221,7 +225,7 @@ def score_field(field_name: str, field_value: str, all_fields: Dict[str, str],
     result.presence_score = _score_presence(field_value)
     
     # 2. Similarity (35%) - Redest du auch über das richtige Thema?
-    result.similarity_score = _score_similarity(field_value, field_def)
+    result.similarity_score = _score_similarity(field_value, field_def, batch)
     
     # 3. Coherence (25%) - Placeholder, wird später befüllt
     result.coherence_score = 0.0
@@ -265,14 +269,24 @@ def score_all_fields(fields: Dict[str, str], format_type: str = "SYNTEX_SYSTEM")
         result.warnings.append(f"Unknown format: {format_type}")
         return result  # Unbekanntes Format? Raus hier!
     
+    # Alle Texte sammeln (Felder, Definitionen, Ideale) → EIN encode() 🚀
+    # Statt ~15 einzelner Forward Passes pro Response
+    # Definitionen/Ideale kommen nach dem ersten Mal aus dem Disk Cache
+    batch = EmbeddingBatch(fields.values())
+    for field_name in expected_fields:
+        field_def = get_field_definition(field_name) or {}
+        batch.add_reference(field_def.get("description", ""), field_def.get("ideal_response", ""))
+    with stage("embedding"):
+        batch.encode()
+    
     # Score jedes einzelne Feld - die Fleißarbeit
     for field_name in expected_fields:
         field_value = fields.get(field_name, "")
-        field_score = score_field(field_name, field_value, fields, format_type)
+        field_score = score_field(field_name, field_value, fields, format_type, batch)
         result.field_scores[field_name] = field_score
     
     # Coherence Score (global) - Passen die Felder zusammen? 🤝
-    result.coherence_score = calculate_coherence_score(fields, format_type)
+    result.coherence_score = calculate_coherence_score(fields, format_type, batch)
     
     # Update Coherence in allen Field Scores
     for fs in result.field_scores.values():
@@ -10,6 +10,7 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass
 
 from .scorer import QualityScore
+from ..utils.jsonl_reader import get_jsonl_reader
 
 
 @dataclass
@@ -60,19 +61,11 @@ class ProgressTracker:
             f.write(json.dumps(entry.to_dict(), ensure_ascii=False) + '\n')
     
     def get_history(self, n: int = 10) -> List[ProgressEntry]:
-        """Holt die letzten N Einträge"""
+        """Holt die letzten N Einträge (Offset-Index statt readlines)"""
         if not self.log_file.exists():
             return []
         
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        entries = []
-        for line in lines[-n:]:
-            data = json.loads(line)
-            entries.append(ProgressEntry(**data))
-        
-        return entries
+        return [ProgressEntry(**data) for data in get_jsonl_reader(self.log_file).tail(n)]
     
     def calculate_improvement(self, n: int = 10) -> Optional[float]:
         """Berechnet durchschnittliche Verbesserung über letzte N Einträge"""
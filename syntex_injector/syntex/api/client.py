@@ -1,36 +1,110 @@
 """
 API Client für 7B Model Communication
+
+APIClient      - sync, requests.Session mit Connection Pool + Keep-Alive
+AsyncAPIClient - async, httpx.AsyncClient mit Connection Pool + asyncio Backoff
+
+Beide liefern (response_text, error_message, retry_count)
 """
 
+import asyncio
 import requests
+import threading
 import time
 import sys
 from typing import Optional, Tuple
 
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # Async Client ist optional
+    httpx = None
+
 from .config import (
     API_ENDPOINT,
     MODEL_PARAMS,
     MAX_RETRIES,
     RETRY_DELAYS,
     CONNECT_TIMEOUT,
-    READ_TIMEOUT
+    READ_TIMEOUT,
+    POOL_CONNECTIONS,
+    POOL_MAXSIZE,
+    KEEPALIVE_EXPIRY
 )
 
+HEADERS = {"Content-Type": "application/json"}
+
+
+class _RetryableError(Exception):
+    """Timeout/Connection Error → nochmal versuchen"""
+
+
+class HTTPError(Exception):
+    """Server/Client Error Status (kein Retry)"""
+
+
+def _extract_response(status_code: int, result_loader) -> str:
+    """
+    Gemeinsame Response-Validierung für sync + async
+
+    Raises:
+        HTTPError: Server/Client Error (kein Retry)
+        ValueError: Response ohne "response" Feld (kein Retry)
+    """
+    if status_code >= 500:
+        raise HTTPError(f"Server Error {status_code}")
+    if status_code >= 400:
+        raise HTTPError(f"Client Error {status_code}")
+
+    result = result_loader()
+    if "response" not in result:
+        raise ValueError(f"Invalid response format")
+    return result["response"]
+
+
+def _retry_notice(attempt: int, error_msg: str) -> None:
+    print(
+        f"⚠️  Versuch {attempt + 1}/{MAX_RETRIES} fehlgeschlagen: "
+        f"{error_msg}. Retry in {RETRY_DELAYS[attempt]}s...",
+        file=sys.stderr
+    )
+
+
+# Eine Session pro Prozess → alle Calibrators/Worker teilen sich den Pool
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """Prozessweite requests.Session mit Connection Pool"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
 
 class APIClient:
     """Client für 7B Model API mit Retry-Logik"""
-    
-    def __init__(self):
+
+    def __init__(self, session: Optional[requests.Session] = None):
         self.endpoint = API_ENDPOINT
         self.params = MODEL_PARAMS
-    
+        self.session = session or get_session()
+
     def send(self, prompt: str) -> Tuple[Optional[str], Optional[str], int]:
         """
         Sendet Prompt an 7B Model.
-        
+
         Args:
             prompt: Vollständiger SYNTEX-kalibrierter Prompt
-        
+
         Returns:
             (response_text, error_message, retry_count)
         """
@@ -38,61 +112,128 @@ class APIClient:
             "prompt": prompt,
             **self.params
         }
-        
+
         for attempt in range(MAX_RETRIES):
             try:
-                response = requests.post(
-                    self.endpoint,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
-                )
-                
-                # Server Errors
-                if response.status_code >= 500:
-                    raise requests.HTTPError(
-                        f"Server Error {response.status_code}"
+                try:
+                    response = self.session.post(
+                        self.endpoint,
+                        json=payload,
+                        timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)
                     )
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                # Response validieren
-                if "response" not in result:
-                    raise ValueError(f"Invalid response format")
-                
-                return result["response"], None, attempt
-                
-            except requests.Timeout:
-                error_msg = f"Timeout after {READ_TIMEOUT}s"
+                except requests.Timeout:
+                    raise _RetryableError(f"Timeout after {READ_TIMEOUT}s")
+                except requests.ConnectionError as e:
+                    raise _RetryableError(f"Connection failed: {str(e)}")
+
+                return _extract_response(response.status_code, response.json), None, attempt
+
+            except _RetryableError as e:
+                error_msg = str(e)
                 if attempt < MAX_RETRIES - 1:
-                    print(
-                        f"⚠️  Versuch {attempt + 1}/{MAX_RETRIES} fehlgeschlagen: "
-                        f"{error_msg}. Retry in {RETRY_DELAYS[attempt]}s...",
-                        file=sys.stderr
-                    )
+                    _retry_notice(attempt, error_msg)
                     time.sleep(RETRY_DELAYS[attempt])
                 else:
                     return None, error_msg, attempt
-                    
-            except requests.ConnectionError as e:
-                error_msg = f"Connection failed: {str(e)}"
+
+            except (HTTPError, ValueError) as e:
+                error_msg = f"{type(e).__name__}: {str(e)}"
+                return None, error_msg, attempt
+
+            except Exception as e:
+                error_msg = f"Unexpected error: {type(e).__name__}: {str(e)}"
+                return None, error_msg, attempt
+
+        return None, "Max retries exceeded", MAX_RETRIES - 1
+
+
+class AsyncAPIClient:
+    """
+    Async Client für 7B Model API
+
+    - Persistenter httpx.AsyncClient (Keep-Alive, Pool aus config)
+    - Backoff via asyncio.sleep → blockiert den Event Loop nicht
+    - Gleicher Contract wie APIClient.send
+
+    Verwendung:
+        async with AsyncAPIClient() as client:
+            response, error, retries = await client.send(prompt)
+    """
+
+    def __init__(self):
+        if httpx is None:
+            raise ImportError("AsyncAPIClient benötigt httpx (pip install httpx)")
+        self.endpoint = API_ENDPOINT
+        self.params = MODEL_PARAMS
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        # Lazy: AsyncClient muss im laufenden Event Loop erstellt werden
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                headers=HEADERS,
+                timeout=httpx.Timeout(READ_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=POOL_MAXSIZE,
+                    max_keepalive_connections=POOL_CONNECTIONS,
+                    keepalive_expiry=KEEPALIVE_EXPIRY
+                )
+            )
+        return self._client
+
+    async def send(self, prompt: str) -> Tuple[Optional[str], Optional[str], int]:
+        """
+        Sendet Prompt an 7B Model (async).
+
+        Args:
+            prompt: Vollständiger SYNTEX-kalibrierter Prompt
+
+        Returns:
+            (response_text, error_message, retry_count)
+        """
+        payload = {
+            "prompt": prompt,
+            **self.params
+        }
+        client = self._get_client()
+
+        for attempt in range(MAX_RETRIES):
+            try:
+                try:
+                    response = await client.post(self.endpoint, json=payload)
+                except httpx.TimeoutException:
+                    raise _RetryableError(f"Timeout after {READ_TIMEOUT}s")
+                except httpx.TransportError as e:
+                    raise _RetryableError(f"Connection failed: {str(e)}")
+
+                return _extract_response(response.status_code, response.json), None, attempt
+
+            except _RetryableError as e:
+                error_msg = str(e)
                 if attempt < MAX_RETRIES - 1:
-                    print(
-                        f"⚠️  Versuch {attempt + 1}/{MAX_RETRIES} fehlgeschlagen: "
-                        f"{error_msg}. Retry in {RETRY_DELAYS[attempt]}s...",
-                        file=sys.stderr
-                    )
-                    time.sleep(RETRY_DELAYS[attempt])
+                    _retry_notice(attempt, error_msg)
+                    await asyncio.sleep(RETRY_DELAYS[attempt])
                 else:
                     return None, error_msg, attempt
-                    
-            except (requests.HTTPError, ValueError) as e:
+
+            except (HTTPError, ValueError) as e:
                 error_msg = f"{type(e).__name__}: {str(e)}"
                 return None, error_msg, attempt
-                
+
             except Exception as e:
                 error_msg = f"Unexpected error: {type(e).__name__}: {str(e)}"
                 return None, error_msg, attempt
-        
+
         return None, "Max retries exceeded", MAX_RETRIES - 1
+
+    async def aclose(self) -> None:
+        """Schließt alle Pool-Verbindungen"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "AsyncAPIClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
@@ -9,6 +9,11 @@ API_ENDPOINT = "https://dev.syntx-system.com/api/chat"
 CONNECT_TIMEOUT = 30
 READ_TIMEOUT = 3600  # 60 MINUTEN - Llama hat alle Zeit der Welt!
 
+# Connection Pool (Keep-Alive zum Chat-Endpoint)
+POOL_CONNECTIONS = 4     # Anzahl Host-Pools (requests) / Keep-Alive Verbindungen (httpx)
+POOL_MAXSIZE = 10        # Max. offene Verbindungen pro Host
+KEEPALIVE_EXPIRY = 300   # Sekunden bis idle Verbindungen geschlossen werden (httpx)
+
 # Retry Configuration
 MAX_RETRIES = 3
 RETRY_DELAYS = [1, 3, 7]  # Sekunden zwischen Retries
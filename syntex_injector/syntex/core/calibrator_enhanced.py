@@ -3,6 +3,7 @@ Enhanced SYNTEX Calibration Engine
 Mit Parser, Scorer und Progress Tracking
 """
 
+import asyncio
 import time
 import uuid
 from pathlib import Path
@@ -11,12 +12,13 @@ from typing import Optional, Tuple, Dict
 from .wrapper import SyntexWrapper
 from .logger import CalibrationLogger
 from .parser import SyntexParser
-from ..api.client import APIClient
+from ..api.client import APIClient, AsyncAPIClient
 from ..api.config import MODEL_PARAMS
 import os
 from ..analysis.scorer import SyntexScorer
 from ..analysis.scorer_v2 import score_all_fields, QualityScoreV2
 from ..analysis.tracker import ProgressTracker
+from ..utils.stage_metrics import stage, record_stage, count_event
 
 
 class EnhancedSyntexCalibrator:
@@ -28,6 +30,8 @@ class EnhancedSyntexCalibrator:
     - Quality Scoring
     - Progress Tracking
     - Detailed Logging
+    - Stage Timings (utils/stage_metrics.py): wrapper, http, parse,
+      embedding, score, log_write, calibrate
     """
     
     def __init__(
@@ -38,6 +42,7 @@ class EnhancedSyntexCalibrator:
     ):
         self.wrapper = SyntexWrapper(wrapper_name)
         self.client = APIClient()
+        self._async_client: Optional[AsyncAPIClient] = None
         self.logger = CalibrationLogger(log_file)
         self.parser = SyntexParser()
         self.scorer = SyntexScorer()
@@ -61,55 +66,142 @@ class EnhancedSyntexCalibrator:
         Returns:
             (success, response, metadata)
         """
-        # 1. Wrapper laden und Prompt bauen
+        with stage("calibrate"):
+            # 1. Wrapper laden und Prompt bauen
+            full_prompt, error_result = self._build_prompt(meta_prompt, verbose)
+            if error_result:
+                return error_result
+            
+            # 2. An Model senden
+            start_time = time.time()
+            response, error, retry_count = self.client.send(full_prompt)
+            duration_ms = int((time.time() - start_time) * 1000)
+            # Wartezeit auf den In-Flight Semaphore (BoundedClient) ist kein HTTP
+            record_stage("http", duration_ms / 1000 - getattr(self.client, "last_wait", 0.0))
+            count_event("llm_calls", "error" if error else "ok")
+            
+            # 3.-5. Analyse, Logging, Output
+            return self._finish(
+                meta_prompt, full_prompt, response, error, retry_count,
+                duration_ms, verbose, show_quality
+            )
+    
+    async def acalibrate(
+        self,
+        meta_prompt: str,
+        verbose: bool = True,
+        show_quality: bool = True
+    ) -> Tuple[bool, Optional[str], Dict]:
+        """
+        Async Variante von calibrate().
+        
+        Model-Call über AsyncAPIClient (Keep-Alive Pool, async Backoff),
+        Parse/Score/Logging laufen im Thread-Pool damit der Event Loop
+        frei bleibt.
+        
+        Returns:
+            (success, response, metadata) - identisch zu calibrate()
+        """
+        calibrate_start = time.perf_counter()
+        full_prompt, error_result = self._build_prompt(meta_prompt, verbose)
+        if error_result:
+            return error_result
+        
+        if self._async_client is None:
+            self._async_client = AsyncAPIClient()
+        
+        start_time = time.time()
+        response, error, retry_count = await self._async_client.send(full_prompt)
+        duration_ms = int((time.time() - start_time) * 1000)
+        record_stage("http", duration_ms / 1000)
+        count_event("llm_calls", "error" if error else "ok")
+        
+        result = await asyncio.to_thread(
+            self._finish,
+            meta_prompt, full_prompt, response, error, retry_count,
+            duration_ms, verbose, show_quality
+        )
+        record_stage("calibrate", time.perf_counter() - calibrate_start)
+        return result
+    
+    async def aclose(self) -> None:
+        """Schließt den Async Connection Pool"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+    
+    def _build_prompt(self, meta_prompt: str, verbose: bool) -> Tuple[Optional[str], Optional[Tuple]]:
+        """
+        Wrapper laden und Full Prompt bauen
+        
+        Returns:
+            (full_prompt, None) oder (None, Fehler-Result für calibrate)
+        """
         if verbose:
             print(f"🔧 SYNTEX Framework laden...")
         
         try:
-            full_prompt = self.wrapper.build_prompt(meta_prompt)
+            with stage("wrapper"):
+                full_prompt = self.wrapper.build_prompt(meta_prompt)
         except FileNotFoundError as e:
             print(f"❌ {e}")
-            return False, None, {"error": str(e)}
+            return None, (False, None, {"error": str(e)})
         
         if verbose:
             print(f"📊 Meta-Prompt: {len(meta_prompt)} Zeichen")
             print(f"📊 Full Prompt: {len(full_prompt)} Zeichen")
             print(f"📤 Sende an Model (Session: {self.session_id})...")
         
-        # 2. An Model senden
-        start_time = time.time()
-        response, error, retry_count = self.client.send(full_prompt)
-        duration_ms = int((time.time() - start_time) * 1000)
-        
+        return full_prompt, None
+    
+    def _finish(
+        self,
+        meta_prompt: str,
+        full_prompt: str,
+        response: Optional[str],
+        error: Optional[str],
+        retry_count: int,
+        duration_ms: int,
+        verbose: bool,
+        show_quality: bool
+    ) -> Tuple[bool, Optional[str], Dict]:
+        """Response parsen, scoren, loggen - gemeinsam für sync + async"""
         success = (error is None)
         
         # 3. Response analysieren
         quality_score = None
         parsed_fields = None
+        # Tracker + Logger zusammen = eine "log_write" Stufe pro Job
+        log_write_seconds = 0.0
         
         if success and response:
             try:
                 # Parse SYNTEX Fields
-                parsed_fields = self.parser.parse(response)
+                with stage("parse"):
+                    parsed_fields = self.parser.parse(response)
                 
                 # Score Quality
-                # Score Quality - V2 mit ENV Toggle
+                # Score Quality - V2 mit ENV Toggle (inkl. Stage "embedding")
                 use_v2 = os.getenv("SYNTX_SCORER_V2", "false").lower() == "true"
-                if use_v2:
-                    # Semantic Scorer V2
-                    fields_dict = {k: v for k, v in parsed_fields.to_dict().items() if v}
-                    format_type = parsed_fields.get_format()
-                    quality_score = score_all_fields(fields_dict, format_type)
-                else:
-                    # Legacy Boolean Scorer
-                    quality_score = self.scorer.score(parsed_fields, response)
+                with stage("score"):
+                    if use_v2:
+                        # Semantic Scorer V2
+                        fields_dict = {k: v for k, v in parsed_fields.to_dict().items() if v}
+                        format_type = parsed_fields.get_format()
+                        quality_score = score_all_fields(fields_dict, format_type)
+                    else:
+                        # Legacy Boolean Scorer
+                        quality_score = self.scorer.score(parsed_fields, response)
                 
                 # Track Progress
-                self.tracker.log_progress(
-                    session_id=self.session_id,
-                    score=quality_score,
-                    meta_prompt_length=len(meta_prompt)
-                )
+                log_start = time.perf_counter()
+                try:
+                    self.tracker.log_progress(
+                        session_id=self.session_id,
+                        score=quality_score,
+                        meta_prompt_length=len(meta_prompt)
+                    )
+                finally:
+                    log_write_seconds += time.perf_counter() - log_start
                 
             except Exception as parse_error:
                 if verbose:
@@ -133,7 +225,11 @@ class EnhancedSyntexCalibrator:
         if parsed_fields:
             log_data["parsed_fields"] = parsed_fields.to_dict()
         
-        self.logger.log_calibration(**log_data)
+        log_start = time.perf_counter()
+        try:
+            self.logger.log_calibration(**log_data)
+        finally:
+            record_stage("log_write", log_write_seconds + time.perf_counter() - log_start)
         
         # 5. Output
         if success:
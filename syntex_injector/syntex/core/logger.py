@@ -7,13 +7,32 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+from ..utils.jsonl_reader import get_jsonl_reader
+from ..utils.segmented_log import SEGMENTED_ENABLED, get_segmented_log, segmented_dir
+from ..utils.blob_store import BLOB_STORE_ENABLED, get_blob_store, resolve_text
+
 
 class CalibrationLogger:
-    """Loggt SYNTEX Kalibrierungs-Prozesse"""
+    """
+    Loggt SYNTEX Kalibrierungs-Prozesse
+    
+    SYNTX_LOG_SEGMENTED=true → statt einer JSONL rollende, komprimierte
+    Segmente unter logs/syntex_calibrations/ (siehe utils/segmented_log.py)
     
-    def __init__(self, log_file: Optional[Path] = None):
+    SYNTX_BLOB_STORE=true → meta_prompt/response als Referenz
+    (meta_prompt_ref/response_ref) statt Volltext (siehe utils/blob_store.py)
+    """
+    
+    def __init__(
+        self,
+        log_file: Optional[Path] = None,
+        segmented: bool = SEGMENTED_ENABLED,
+        use_blob_store: bool = BLOB_STORE_ENABLED
+    ):
         self.log_file = log_file or Path("logs/syntex_calibrations.jsonl")
         self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        self.segmented_log = get_segmented_log(segmented_dir(self.log_file)) if segmented else None
+        self.blob_store = get_blob_store() if use_blob_store else None
     
     def log_calibration(
         self,
@@ -46,15 +65,35 @@ class CalibrationLogger:
             "parsed_fields": parsed_fields
         }
         
+        if self.blob_store is not None:
+            log_entry["meta_prompt_ref"] = self.blob_store.put(log_entry.pop("meta_prompt"))
+            if response:
+                log_entry["response_ref"] = self.blob_store.put(log_entry.pop("response"))
+        
+        if self.segmented_log is not None:
+            self.segmented_log.append(log_entry)
+            return
+        
         with open(self.log_file, 'a', encoding='utf-8') as f:
             f.write(json.dumps(log_entry, ensure_ascii=False) + '\n')
     
     def get_last_calibrations(self, n: int = 10) -> list:
-        """Gibt die letzten N Kalibrierungen zurück"""
-        if not self.log_file.exists():
+        """Gibt die letzten N Kalibrierungen zurück (Offset-Index statt readlines)"""
+        if self.segmented_log is not None:
+            entries = self.segmented_log.tail(n)
+            if len(entries) < n and self.log_file.exists():
+                # Umstellung auf Segmente: ältere Einträge liegen noch in der JSONL
+                entries = (get_jsonl_reader(self.log_file).tail(n - len(entries)) + entries)[-n:]
+        elif self.log_file.exists():
+            entries = get_jsonl_reader(self.log_file).tail(n)
+        else:
             return []
         
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-        
-        return [json.loads(line) for line in lines[-n:]]
+        return [self._expand(entry) for entry in entries]
+    
+    def _expand(self, entry: Dict[str, Any]) -> Dict[str, Any]:
+        """Blob-Referenzen wieder durch Volltext ersetzen"""
+        for key in ("meta_prompt", "response"):
+            if key not in entry and f"{key}_ref" in entry:
+                entry[key] = resolve_text(entry, key, self.blob_store)
+        return entry
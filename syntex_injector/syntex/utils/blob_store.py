@@ -0,0 +1,155 @@
+"""
+SYNTEX Blob Store - Content-Addressed Storage für Prompt-/Response-Texte
+
+=== ZWECK ===
+Derselbe Text lag bis zu vierfach auf Disk: Job .txt, _response.txt,
+response_text im Job-JSON und meta_prompt/response im Kalibrierungs-Log.
+Der Blob Store speichert jeden Text EINMAL unter seinem SHA256:
+
+    <blob_dir>/ab/cdef0123...      (Klartext, read-only)
+
+Metadaten und Logs halten nur noch Referenzen ("sha256:<hex>").
+Queue-Dateien (.txt, _response.txt) sind eigenständige Kopien des Blobs
+(Reflink wo das Dateisystem es kann, sonst normale Kopie) → alle
+bestehenden Reader funktionieren unverändert, und ein Edit an einer
+Queue-Datei verändert NIE den Blob oder andere Jobs.
+
+Kein Hardlink: Die Services laufen als root, 0444 schützt da nichts -
+ein open(..., 'w') auf eine gelinkte Queue-Datei hätte still jeden Job
+mit demselben Text mitgeändert.
+
+=== CONFIG ===
+SYNTX_BLOB_STORE=true    Consumer/FileHandler/CalibrationLogger schreiben über den Store (opt-in)
+SYNTX_BLOB_DIR           Blob-Verzeichnis (default <projekt>/queue/.blobs - absolut, damit
+                         Consumer, Cron-Jobs und API unabhängig vom CWD denselben Store nutzen)
+
+=== VERWENDUNG ===
+    store = get_blob_store()
+    ref = store.put(response)                 # "sha256:..."
+    store.copy_to(ref, processed / "x_response.txt")
+    text = store.get(ref)
+
+    resolve_text(syntex_result, "response_text")   # Inline-Text ODER Ref
+"""
+
+import fcntl
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+BLOB_STORE_ENABLED = os.getenv("SYNTX_BLOB_STORE", "false").lower() == "true"
+# <projekt>/queue/.blobs - gleicher Ort wie QUEUE_DIR/.blobs der API,
+# einmal absolut aufgelöst (Consumer/Cron/API laufen mit verschiedenen CWDs)
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+BLOB_DIR = Path(os.getenv("SYNTX_BLOB_DIR", str(_PROJECT_ROOT / "queue" / ".blobs"))).resolve()
+
+# Linux ioctl: Reflink (Copy-on-Write Klon, btrfs/xfs) - sonst normale Kopie
+_FICLONE = 0x40049409
+
+REF_PREFIX = "sha256:"
+
+
+def is_ref(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(REF_PREFIX) and len(value) == len(REF_PREFIX) + 64
+
+
+class BlobStore:
+    """
+    Content-Addressed Store - Schreiben ist idempotent, Blobs sind unveränderlich
+
+    Parallele Writer (Consumer-Prozesse, Pool-Worker) schreiben über
+    tmp + os.replace; gleicher Inhalt → gleicher Pfad → kein Konflikt
+    """
+
+    def __init__(self, root: Path = BLOB_DIR):
+        self.root = Path(root)
+
+    def path(self, ref: str) -> Path:
+        digest = ref[len(REF_PREFIX):]
+        return self.root / digest[:2] / digest[2:]
+
+    def put(self, text: str) -> str:
+        """Speichert text (falls neu) → Referenz"""
+        data = text.encode("utf-8")
+        ref = REF_PREFIX + hashlib.sha256(data).hexdigest()
+        path = self.path(ref)
+        if path.exists():
+            return ref
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        # Read-only: Blobs werden nie verändert (Queue-Dateien sind Kopien)
+        os.chmod(tmp, 0o444)
+        os.replace(tmp, path)
+        return ref
+
+    def get(self, ref: str) -> Optional[str]:
+        """Text zu einer Referenz, None wenn der Blob fehlt"""
+        try:
+            with open(self.path(ref), "r", encoding="utf-8") as f:
+                return f.read()
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def copy_to(self, ref: str, target: Path) -> Path:
+        """
+        Legt target als eigenständige, beschreibbare Kopie des Blobs an
+        (Reflink wenn möglich, sonst Byte-Kopie)
+
+        Bestehendes target wird ersetzt (atomic via tmp + rename)
+        """
+        target = Path(target)
+        source = self.path(ref)
+        tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.copy")
+        with open(source, "rb") as src, open(tmp, "wb") as dst:
+            try:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            except OSError:
+                # Kein Reflink (ext4, anderes Dateisystem) → normale Kopie
+                shutil.copyfileobj(src, dst)
+        os.replace(tmp, target)
+        return target
+
+    def write_file(self, text: str, target: Path) -> str:
+        """put() + copy_to() in einem Schritt → Referenz"""
+        ref = self.put(text)
+        self.copy_to(ref, target)
+        return ref
+
+
+def resolve_text(container: Optional[Dict], key: str, store: Optional[BlobStore] = None) -> Optional[str]:
+    """
+    Text aus einem Metadaten-/Log-Dict - inline (key) oder als Ref (key_ref)
+
+    resolve_text(syntex_result, "response_text")
+    → syntex_result["response_text"] oder Blob von syntex_result["response_text_ref"]
+    """
+    if not isinstance(container, dict):
+        return None
+    value = container.get(key)
+    if value is not None:
+        return value
+    ref = container.get(f"{key}_ref")
+    if not is_ref(ref):
+        return None
+    return (store or get_blob_store()).get(ref)
+
+
+# Ein Store pro Verzeichnis und Prozess
+_stores: Dict[str, BlobStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_blob_store(root: Optional[Path] = None) -> BlobStore:
+    """Prozessweiter BlobStore (default: SYNTX_BLOB_DIR)"""
+    root = Path(root).resolve() if root is not None else BLOB_DIR
+    key = str(root)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = BlobStore(root)
+        return _stores[key]
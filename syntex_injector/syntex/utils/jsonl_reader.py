@@ -0,0 +1,299 @@
+"""
+SYNTEX JSONL Reader - Offset-Index für große Append-Only Logs
+
+=== ZWECK ===
+get_last_calibrations(), get_history(), Verlauf-Endpoints etc. haben
+readlines() auf das ganze Log gemacht, nur um die letzten N Zeilen
+zu zeigen. Bei Logs im GB-Bereich heißt das: GB lesen pro Request.
+
+=== SIDECAR INDEX ===
+<log>.idx neben dem Log:
+    Header: Magic "SXJI" | Version | Inode | Zeilen | indiziertes Byte-Ende | Leerzeilen
+    Body:   uint64 Byte-Offset pro Zeile (Zeile i beginnt bei offsets[i])
+
+- Einmal aufgebaut, danach wird nur noch der neue Tail gescannt
+- Andere Prozesse (API, CLI) laden den Sidecar statt das Log zu scannen
+- Inode anders / Datei kürzer (Rotation, Truncate) → Neuaufbau
+- Nur vollständige Zeilen (mit '\\n') werden indiziert
+
+=== VERWENDUNG ===
+    reader = get_jsonl_reader(Path("logs/syntex_calibrations.jsonl"))
+    reader.tail(10)             # letzte 10 Einträge (geparst)
+    reader.count()              # nicht-leere Zeilen (len() zählt alle)
+    reader.read(100, 200)       # Zeilen 100..199
+    for entry in reader.iter_reverse(): ...
+
+    read_tail(path, 1)          # ohne Index: Datei rückwärts lesen
+"""
+
+import fcntl
+import json
+import os
+import struct
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_MAGIC = b"SXJI"
+_VERSION = 2
+_HEADER = struct.Struct("<4sIQQQQ")  # magic, version, inode, lines, indexed_end, blank_lines
+_BLOCK_SIZE = 1 << 16
+_REVERSE_BATCH = 256                 # Zeilen pro Read bei iter_reverse()
+
+
+def _parse(line: bytes) -> Optional[Any]:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def read_tail(path: Path, n: int = 10) -> List[Any]:
+    """
+    Letzte n Einträge ohne Index - liest die Datei blockweise von hinten
+
+    Für Einmal-Lookups (z.B. letzte Generation) wo sich kein Sidecar lohnt
+    """
+    if n <= 0:
+        return []
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            position = f.tell()
+            buffer = b""
+            # n Zeilen brauchen n+1 Zeilenumbrüche (erste evtl. unvollständig)
+            while position > 0 and buffer.count(b"\n") <= n:
+                step = min(_BLOCK_SIZE, position)
+                position -= step
+                f.seek(position)
+                buffer = f.read(step) + buffer
+    except OSError:
+        return []
+
+    lines = buffer.splitlines()
+    if position > 0:
+        lines = lines[1:]  # angeschnittene erste Zeile
+    entries = [_parse(line) for line in lines if line.strip()]
+    return [e for e in entries if e is not None][-n:]
+
+
+class JsonlReader:
+    """
+    JSONL-Datei mit Zeilen-Offset-Index (Sidecar <log>.idx)
+
+    Thread-safe; mehrere Prozesse teilen sich den Sidecar (flock beim Schreiben)
+    """
+
+    def __init__(self, path: Path, persist: bool = True):
+        """
+        === ARGS ===
+        path: JSONL-Datei
+        persist: Index als Sidecar speichern (False → nur im Speicher)
+        """
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + ".idx")
+        self.persist = persist
+        self._lock = threading.Lock()
+        self._offsets = array("Q")
+        self._indexed_end = 0
+        self._blank = 0
+        self._inode: Optional[int] = None
+
+    # ========================================================================
+    # INDEX
+    # ========================================================================
+
+    def _reset(self, inode: Optional[int]) -> None:
+        self._offsets = array("Q")
+        self._indexed_end = 0
+        self._blank = 0
+        self._inode = inode
+
+    def _load_sidecar(self, inode: int) -> None:
+        """Übernimmt den Sidecar wenn er zur aktuellen Datei passt"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                fcntl.flock(f, fcntl.LOCK_SH)
+                magic, version, idx_inode, lines, indexed_end, blank = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != _MAGIC or version != _VERSION or idx_inode != inode:
+                    return
+                if indexed_end <= self._indexed_end:
+                    return
+                offsets = array("Q")
+                offsets.frombytes(f.read(lines * offsets.itemsize))
+                if len(offsets) != lines:
+                    return
+        except (OSError, struct.error, ValueError):
+            return
+        self._offsets = offsets
+        self._indexed_end = indexed_end
+        self._blank = blank
+        self._inode = inode
+
+    def _save_sidecar(self, new_from: int) -> None:
+        """Hängt neue Offsets an den Sidecar an (Header zuletzt)"""
+        if not self.persist:
+            return
+        header = _HEADER.pack(_MAGIC, _VERSION, self._inode, len(self._offsets), self._indexed_end, self._blank)
+        try:
+            fd = os.open(self.index_path, os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(fd, 'r+b') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    size = f.seek(0, os.SEEK_END)
+                    expected = _HEADER.size + new_from * self._offsets.itemsize
+                    if new_from and size >= expected:
+                        # Nur anhängen - Reader sehen bis zum Header-Update den alten Stand
+                        f.seek(expected)
+                        f.write(self._offsets[new_from:].tobytes())
+                    else:
+                        f.seek(_HEADER.size)
+                        f.write(self._offsets.tobytes())
+                    f.truncate()
+                    f.seek(0)
+                    f.write(header)
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        except OSError:
+            # Log-Verzeichnis read-only o.ä. → Index bleibt im Speicher
+            self.persist = False
+
+    def _ends_at_line_break(self) -> bool:
+        """Plausibilitäts-Check: indiziertes Ende liegt direkt hinter einem '\\n'"""
+        if self._indexed_end == 0:
+            return True
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self._indexed_end - 1)
+                return f.read(1) == b"\n"
+        except OSError:
+            return False
+
+    def _scan(self, start: int) -> None:
+        """Indiziert vollständige Zeilen ab Byte start (zählt Leerzeilen mit)"""
+        offsets = self._offsets
+        blank = 0
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            position = start
+            pending = b""
+            while True:
+                block = f.read(_BLOCK_SIZE)
+                if not block:
+                    break
+                base = position - len(pending)
+                data = pending + block
+                line_start = 0
+                newline = data.find(b"\n")
+                while newline != -1:
+                    offsets.append(base + line_start)
+                    if newline == line_start or data[line_start:newline].isspace():
+                        blank += 1
+                    line_start = newline + 1
+                    newline = data.find(b"\n", line_start)
+                pending = data[line_start:]
+                position += len(block)
+        self._indexed_end = position - len(pending)
+        self._blank += blank
+
+    def refresh(self) -> int:
+        """
+        Bringt den Index auf den aktuellen Datei-Stand
+
+        Returns:
+            Anzahl neu indizierter Zeilen
+        """
+        with self._lock:
+            try:
+                stat = self.path.stat()
+            except FileNotFoundError:
+                self._reset(None)
+                return 0
+
+            if stat.st_ino != self._inode or stat.st_size < self._indexed_end:
+                self._reset(stat.st_ino)
+            if stat.st_size == self._indexed_end:
+                return 0
+
+            before = len(self._offsets)
+            self._load_sidecar(stat.st_ino)
+            if not self._ends_at_line_break():
+                self._reset(stat.st_ino)  # Sidecar von vor einem Truncate
+            loaded = len(self._offsets)
+
+            if stat.st_size > self._indexed_end:
+                self._scan(self._indexed_end)
+                if len(self._offsets) > loaded:
+                    self._save_sidecar(loaded)
+            return len(self._offsets) - before
+
+    # ========================================================================
+    # READ
+    # ========================================================================
+
+    def __len__(self) -> int:
+        self.refresh()
+        return len(self._offsets)
+
+    def count(self) -> int:
+        """Anzahl Einträge = nicht-leere Zeilen (wie 'if line.strip()')"""
+        self.refresh()
+        with self._lock:
+            return len(self._offsets) - self._blank
+
+    def read_lines(self, start: int, stop: Optional[int] = None) -> List[bytes]:
+        """Rohe Zeilen [start, stop) - EIN seek + read, Python-Slice-Semantik"""
+        self.refresh()
+        with self._lock:
+            start, stop, _ = slice(start, stop).indices(len(self._offsets))
+            if start >= stop:
+                return []
+            begin = self._offsets[start]
+            end = self._offsets[stop] if stop < len(self._offsets) else self._indexed_end
+        with open(self.path, 'rb') as f:
+            f.seek(begin)
+            data = f.read(end - begin)
+        return data.splitlines()
+
+    def read(self, start: int, stop: Optional[int] = None) -> List[Any]:
+        """Geparste Einträge [start, stop) - kaputte Zeilen werden übersprungen"""
+        entries = [_parse(line) for line in self.read_lines(start, stop) if line.strip()]
+        return [e for e in entries if e is not None]
+
+    def tail(self, n: int = 10) -> List[Any]:
+        """Letzte n Einträge (älteste zuerst, wie lines[-n:])"""
+        if n <= 0:
+            return []
+        return self.read(-n)
+
+    def iter_reverse(self, limit: Optional[int] = None) -> Iterator[Any]:
+        """Einträge von neu nach alt, in Batches von hinten gelesen"""
+        stop = len(self)
+        yielded = 0
+        while stop > 0:
+            start = max(0, stop - _REVERSE_BATCH)
+            for entry in reversed(self.read(start, stop)):
+                yield entry
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+            stop = start
+
+    def last(self) -> Optional[Any]:
+        """Letzter gültiger Eintrag"""
+        return next(self.iter_reverse(), None)
+
+
+# Ein Reader pro Datei und Prozess (Index bleibt zwischen Requests im Speicher)
+_readers: Dict[str, JsonlReader] = {}
+_readers_lock = threading.Lock()
+
+
+def get_jsonl_reader(path: Path) -> JsonlReader:
+    """Prozessweiter JsonlReader für eine Datei"""
+    key = os.path.abspath(path)
+    with _readers_lock:
+        if key not in _readers:
+            _readers[key] = JsonlReader(Path(path))
+        return _readers[key]
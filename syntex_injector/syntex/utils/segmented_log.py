@@ -0,0 +1,390 @@
+"""
+SYNTEX Segmented Log - Rollende, komprimierte JSONL-Segmente + Manifest
+
+=== ZWECK ===
+syntex_calibrations.jsonl enthält pro Kalibrierung Meta-Prompt + Response
+im Klartext und wächst unbegrenzt. Der Segmented Log schreibt in ein
+aktives Segment, versiegelt es ab Größe/Alter und komprimiert es.
+Reader dekomprimieren nur Segmente, die den angefragten Zeitraum berühren.
+
+=== LAYOUT ===
+<dir>/active.jsonl                  aktives Segment (Klartext, append)
+<dir>/segment-000042.jsonl.zst      versiegelt (zstd, sonst .jsonl.gz)
+<dir>/manifest.json                 Segmente mit first_ts/last_ts/entries/bytes
+<dir>/.lock                         flock für Append + Versiegeln
+
+=== VERSIEGELN ===
+1. active.jsonl → sealing-<id>.jsonl (rename, neue Appends gehen in neues active)
+2. Komprimieren → segment-<id>.tmp → rename
+3. Manifest atomic replace (next_id = id + 1)
+4. sealing-<id>.jsonl löschen
+Crash dazwischen → _recover() beim nächsten Append macht weiter
+
+=== CONFIG ===
+SYNTX_LOG_SEGMENTED=true        CalibrationLogger schreibt segmentiert (opt-in)
+SYNTX_LOG_SEGMENT_MB            Max. Größe des aktiven Segments (default 64)
+SYNTX_LOG_SEGMENT_HOURS         Max. Alter des aktiven Segments (default 24)
+SYNTX_LOG_CODEC                 auto | zstd | gzip (auto: zstd wenn installiert)
+"""
+
+import fcntl
+import gzip
+import io
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd ist optional, gzip ist immer da
+    zstandard = None
+
+from .jsonl_reader import read_tail
+
+SEGMENTED_ENABLED = os.getenv("SYNTX_LOG_SEGMENTED", "false").lower() == "true"
+SEGMENT_MAX_BYTES = int(float(os.getenv("SYNTX_LOG_SEGMENT_MB", "64")) * 1024 * 1024)
+SEGMENT_MAX_SECONDS = float(os.getenv("SYNTX_LOG_SEGMENT_HOURS", "24")) * 3600
+LOG_CODEC = os.getenv("SYNTX_LOG_CODEC", "auto").lower()
+
+# tail(): versiegelte Segmente ändern sich nie → ihre letzten Einträge einmal
+# dekomprimieren und pro Prozess merken (statt bis zu 64 MB pro Aufruf)
+SEGMENT_TAIL_ENTRIES = 256   # gemerkte Einträge pro Segment (mehr nur bei Bedarf)
+SEGMENT_TAIL_CACHE = 2       # Segmente im Tail-Cache
+
+_SEALING = re.compile(r"^sealing-(\d+)\.jsonl$")
+
+
+def entry_epoch(entry: Any) -> Optional[float]:
+    """timestamp eines Log-Eintrags → Epoch Sekunden"""
+    try:
+        return datetime.fromisoformat(entry['timestamp'].replace('Z', '+00:00')).timestamp()
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+
+
+def _codec() -> str:
+    if LOG_CODEC == "zstd" or (LOG_CODEC == "auto" and zstandard is not None):
+        if zstandard is None:
+            raise ImportError("SYNTX_LOG_CODEC=zstd benötigt zstandard (pip install zstandard)")
+        return "zstd"
+    return "gzip"
+
+
+def _open_segment(path: Path):
+    """Dekomprimierender Binary-Stream eines versiegelten Segments"""
+    if path.name.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(f"{path.name} benötigt zstandard (pip install zstandard)")
+        # BufferedReader → zeilenweise iterierbar wie gzip
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True))
+    return gzip.open(path, 'rb')
+
+
+def _parse_lines(stream) -> Iterator[Dict]:
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+class SegmentedLog:
+    """
+    Append-Only Log aus rollenden, komprimierten Segmenten
+
+    Mehrere Prozesse (Consumer, Pool-Worker) dürfen gleichzeitig schreiben:
+    Append und Versiegeln laufen unter flock(<dir>/.lock)
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int = SEGMENT_MAX_BYTES,
+        max_age_seconds: float = SEGMENT_MAX_SECONDS
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._tails: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._recovered = False
+
+    @property
+    def active_path(self) -> Path:
+        return self.directory / "active.jsonl"
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.directory / "manifest.json"
+
+    # ========================================================================
+    # MANIFEST
+    # ========================================================================
+
+    def manifest(self) -> Dict:
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"version": 1, "next_id": 1, "segments": []}
+
+    def _write_manifest(self, manifest: Dict) -> None:
+        tmp = self.manifest_path.with_name(f"manifest.json.{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def segments(self, since: Optional[float] = None, until: Optional[float] = None) -> List[Dict]:
+        """Versiegelte Segmente die [since, until] berühren (Epoch, None = offen)"""
+        result = []
+        for segment in self.manifest().get("segments", []):
+            first, last = segment.get("first_ts"), segment.get("last_ts")
+            if since is not None and last is not None and last < since:
+                continue
+            if until is not None and first is not None and first > until:
+                continue
+            result.append(segment)
+        return result
+
+    # ========================================================================
+    # WRITE
+    # ========================================================================
+
+    def _locked(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        return open(self.directory / ".lock", 'a')
+
+    def append(self, entry: Dict) -> None:
+        """Hängt einen Eintrag an, versiegelt das aktive Segment bei Bedarf"""
+        line = (json.dumps(entry, ensure_ascii=False) + '\n').encode('utf-8')
+        with self._lock, self._locked() as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if not self._recovered:
+                    self._recover()
+                    self._recovered = True
+                with open(self.active_path, 'ab') as f:
+                    f.write(line)
+                    size = f.tell()
+                if size >= self.max_bytes or self._active_age() >= self.max_age_seconds:
+                    self._recover()
+                    self._seal()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def seal(self) -> Optional[Dict]:
+        """Versiegelt das aktive Segment sofort (z.B. Cron/Rotation)"""
+        with self._lock, self._locked() as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                self._recover()
+                return self._seal()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _active_age(self) -> float:
+        """Alter des ersten Eintrags im aktiven Segment"""
+        try:
+            with open(self.active_path, 'rb') as f:
+                first = json.loads(f.readline())
+        except (OSError, ValueError):
+            return 0.0
+        epoch = entry_epoch(first)
+        return time.time() - epoch if epoch is not None else 0.0
+
+    def _recover(self) -> None:
+        """Unterbrochenes Versiegeln fertigstellen (nur unter flock)"""
+        if not self.directory.exists():
+            return
+        next_id = self.manifest().get("next_id", 1)
+        for path in sorted(self.directory.iterdir()):
+            match = _SEALING.match(path.name)
+            if not match:
+                continue
+            if int(match.group(1)) < next_id:
+                path.unlink()  # Segment steht schon im Manifest
+            else:
+                self._compress(path, int(match.group(1)))
+
+    def _seal(self) -> Optional[Dict]:
+        """active.jsonl → komprimiertes Segment (nur unter flock)"""
+        try:
+            if self.active_path.stat().st_size == 0:
+                return None
+        except FileNotFoundError:
+            return None
+        segment_id = self.manifest().get("next_id", 1)
+        sealing = self.directory / f"sealing-{segment_id:06d}.jsonl"
+        os.replace(self.active_path, sealing)
+        return self._compress(sealing, segment_id)
+
+    def _compress(self, sealing: Path, segment_id: int) -> Dict:
+        codec = _codec()
+        suffix = ".jsonl.zst" if codec == "zstd" else ".jsonl.gz"
+        target = self.directory / f"segment-{segment_id:06d}{suffix}"
+        tmp = target.with_name(target.name + ".tmp")
+
+        first_ts = last_ts = None
+        entries = raw_bytes = 0
+        with open(sealing, 'rb') as src, open(tmp, 'wb') as raw:
+            if codec == "zstd":
+                writer = zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False)
+            else:
+                writer = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6)
+            with writer:
+                for line in src:
+                    writer.write(line)
+                    raw_bytes += len(line)
+                    try:
+                        epoch = entry_epoch(json.loads(line))
+                    except ValueError:
+                        continue
+                    entries += 1
+                    if epoch is not None:
+                        first_ts = epoch if first_ts is None else min(first_ts, epoch)
+                        last_ts = epoch if last_ts is None else max(last_ts, epoch)
+        os.replace(tmp, target)
+
+        segment = {
+            "file": target.name,
+            "codec": codec,
+            "first_ts": first_ts,
+            "last_ts": last_ts,
+            "entries": entries,
+            "raw_bytes": raw_bytes,
+            "bytes": target.stat().st_size,
+            "sealed_at": datetime.now().isoformat()
+        }
+        manifest = self.manifest()
+        manifest["segments"].append(segment)
+        manifest["next_id"] = segment_id + 1
+        self._write_manifest(manifest)
+        sealing.unlink()
+        return segment
+
+    # ========================================================================
+    # READ
+    # ========================================================================
+
+    def _sealed_paths(self) -> List[Path]:
+        """sealing-*.jsonl (gerade im Versiegeln) zählen noch als aktiv"""
+        if not self.directory.exists():
+            return []
+        return sorted(p for p in self.directory.iterdir() if _SEALING.match(p.name))
+
+    def read(self, since: Optional[float] = None, until: Optional[float] = None) -> Iterator[Dict]:
+        """
+        Einträge im Zeitraum [since, until] (Epoch, None = offen)
+
+        Dekomprimiert nur Segmente, deren first_ts/last_ts den Zeitraum berühren
+        """
+        def in_range(entry: Dict) -> bool:
+            if since is None and until is None:
+                return True
+            epoch = entry_epoch(entry)
+            if epoch is None:
+                return False
+            return (since is None or epoch >= since) and (until is None or epoch <= until)
+
+        for segment in self.segments(since, until):
+            try:
+                with _open_segment(self.directory / segment["file"]) as stream:
+                    for entry in _parse_lines(stream):
+                        if in_range(entry):
+                            yield entry
+            except FileNotFoundError:
+                continue  # Segment wurde gelöscht (Retention)
+
+        for path in self._sealed_paths() + [self.active_path]:
+            try:
+                with open(path, 'rb') as f:
+                    for entry in _parse_lines(f):
+                        if in_range(entry):
+                            yield entry
+            except FileNotFoundError:
+                continue
+
+    def tail(self, n: int = 10) -> List[Dict]:
+        """Letzte n Einträge - aktives Segment zuerst, ältere Segmente nur bei Bedarf"""
+        if n <= 0:
+            return []
+        entries = read_tail(self.active_path, n)
+        for path in reversed(self._sealed_paths()):
+            if len(entries) >= n:
+                break
+            entries = read_tail(path, n - len(entries)) + entries
+        for segment in reversed(self.manifest().get("segments", [])):
+            if len(entries) >= n:
+                break
+            try:
+                older = self._segment_tail(segment, n - len(entries))
+            except FileNotFoundError:
+                continue
+            entries = older + entries
+        return entries[-n:]
+
+    def _segment_tail(self, segment: Dict, n: int) -> List[Dict]:
+        """Letzte n Einträge eines versiegelten Segments - LRU gecacht"""
+        name = segment["file"]
+        with self._lock:
+            cached = self._tails.get(name)
+            # Reicht der Cache - oder hält er schon das ganze Segment?
+            if cached is not None and (len(cached) >= n or len(cached) >= segment.get("entries", 0)):
+                self._tails.move_to_end(name)
+                return cached[-n:]
+
+        # Streamend dekomprimieren, nur die letzten Einträge behalten
+        with _open_segment(self.directory / name) as stream:
+            tail = list(deque(_parse_lines(stream), maxlen=max(n, SEGMENT_TAIL_ENTRIES)))
+
+        with self._lock:
+            self._tails[name] = tail
+            self._tails.move_to_end(name)
+            while len(self._tails) > SEGMENT_TAIL_CACHE:
+                self._tails.popitem(last=False)
+        return tail[-n:]
+
+    def stats(self) -> Dict:
+        segments = self.manifest().get("segments", [])
+        try:
+            active_bytes = self.active_path.stat().st_size
+        except FileNotFoundError:
+            active_bytes = 0
+        raw = sum(s.get("raw_bytes", 0) for s in segments)
+        stored = sum(s.get("bytes", 0) for s in segments)
+        return {
+            "segments": len(segments),
+            "entries": sum(s.get("entries", 0) for s in segments),
+            "raw_bytes": raw,
+            "stored_bytes": stored,
+            "compression_ratio": round(raw / stored, 2) if stored else None,
+            "active_bytes": active_bytes
+        }
+
+
+def segmented_dir(log_file: Path) -> Path:
+    """logs/syntex_calibrations.jsonl → logs/syntex_calibrations/"""
+    log_file = Path(log_file)
+    return log_file.with_name(log_file.name.split('.')[0])
+
+
+# Ein SegmentedLog pro Verzeichnis und Prozess (Tail-Cache bleibt erhalten)
+_logs: Dict[str, SegmentedLog] = {}
+_logs_lock = threading.Lock()
+
+
+def get_segmented_log(directory: Path) -> SegmentedLog:
+    """Prozessweiter SegmentedLog für ein Verzeichnis"""
+    key = os.path.abspath(directory)
+    with _logs_lock:
+        if key not in _logs:
+            _logs[key] = SegmentedLog(Path(directory))
+        return _logs[key]
@@ -0,0 +1,466 @@
+"""
+SYNTEX Stage Metrics - Laufzeit pro Pipeline-Stufe als HDR-Histogramme
+
+=== ZWECK ===
+calibrate() kennt nur duration_ms gesamt. Wo die Zeit bleibt
+(Wrapper, HTTP, Parse, Embedding, Score, Log, File Move) war unsichtbar.
+
+    with stage("http"):
+        response = client.send(prompt)
+
+=== HISTOGRAMM ===
+Log-lineare Buckets wie HdrHistogram: Werte in Mikrosekunden,
+64 Sub-Buckets pro Zweierpotenz → max. ~1.6% relativer Fehler,
+Speicher O(Buckets mit Werten) statt O(Samples). Histogramme sind
+über Prozesse hinweg mergebar (Counts addieren).
+
+=== PROZESSE ===
+Jeder Prozess (Consumer-Pool-Worker, Re-Scorer, ...) hält seine
+Histogramme im Speicher und schreibt sie alle FLUSH_SECONDS nach
+    <metrics_dir>/stages-<host>-<pid>.json     (atomic replace)
+Die API merged alle Dateien → p50/p95/p99 pro Stufe, JSON oder
+Prometheus Text Format.
+
+=== KOMPAKTIERUNG ===
+Pro Prozess eine Datei → ohne Aufräumen wächst metrics_dir mit jedem
+Cron-Lauf. Beim ersten Flush und danach alle COMPACT_SECONDS merged der
+Recorder (unter fcntl.flock) die Dateien beendeter Prozesse SEINES Hosts
+in <metrics_dir>/totals-<host>.json und löscht sie. Zähler und
+Histogramme bleiben so kumulativ (kein Counter-Reset wenn Prozesse
+enden). Tot = PID existiert nicht mehr, oder gleiche PID mit anderem
+Startzeitpunkt (PID-Wiederverwendung). Dateien beendeter Prozesse
+fremder Hosts zählen weiter mit, bis ein Prozess dort kompaktiert -
+nichts fällt aus der Summe, Prometheus sieht keinen Counter-Reset.
+
+=== ZÄHLER ===
+Neben den Histogrammen hält der Recorder Event-Zähler pro Label
+(count_event("jobs_processed", wrapper)) - gleiche Datei, gleicher Flush.
+Summe über totals + laufende Prozess-Dateien ist ein monoton steigender Counter.
+
+=== CONFIG ===
+SYNTX_STAGE_METRICS=false    Aufzeichnung abschalten (default an)
+SYNTX_METRICS_DIR            default <repo>/queue/.metrics (absolut)
+"""
+
+import atexit
+import fcntl
+import json
+import math
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+STAGE_METRICS_ENABLED = os.getenv("SYNTX_STAGE_METRICS", "true").lower() == "true"
+# Absolut wie BLOB_DIR - Consumer (Cron, beliebiges CWD) und API lesen dasselbe Verzeichnis
+_PROJECT_ROOT = Path(__file__).resolve().parents[3]
+METRICS_DIR = Path(os.getenv("SYNTX_METRICS_DIR", str(_PROJECT_ROOT / "queue" / ".metrics"))).resolve()
+
+FLUSH_SECONDS = 5.0
+COMPACT_SECONDS = 300.0
+
+# Reihenfolge der Stufen in Ausgaben (unbekannte Stufen hinten dran)
+STAGES = ("wrapper", "http", "parse", "embedding", "score", "log_write", "file_move", "calibrate", "job")
+
+_SUB_BITS = 6
+_SUB_COUNT = 1 << _SUB_BITS          # 64 Sub-Buckets
+_LINEAR_LIMIT = _SUB_COUNT * 2       # Werte < 128µs exakt
+
+
+def _bucket_index(value: int) -> int:
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - (_SUB_BITS + 1)
+    return _LINEAR_LIMIT + (shift - 1) * _SUB_COUNT + ((value >> shift) - _SUB_COUNT)
+
+
+def _bucket_value(index: int) -> float:
+    """Mittelwert des Buckets (Repräsentant für Perzentile)"""
+    if index < _LINEAR_LIMIT:
+        return float(index)
+    shift = (index - _LINEAR_LIMIT) // _SUB_COUNT + 1
+    mantissa = (index - _LINEAR_LIMIT) % _SUB_COUNT + _SUB_COUNT
+    low = mantissa << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class Histogram:
+    """HDR-artiges Histogramm über Mikrosekunden-Werte"""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0
+        self.min: Optional[int] = None
+        self.max: Optional[int] = None
+
+    def record(self, micros: int) -> None:
+        micros = max(0, int(micros))
+        index = _bucket_index(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += micros
+        if self.min is None or micros < self.min:
+            self.min = micros
+        if self.max is None or micros > self.max:
+            self.max = micros
+
+    def merge(self, other: "Histogram") -> None:
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+
+    def percentile(self, p: float) -> float:
+        """p in [0, 100] → Mikrosekunden (Bucket-Mitte, geclampt auf min/max)"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100.0 * self.count))  # Nearest Rank
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(max(_bucket_value(index), self.min), self.max)
+        return float(self.max)
+
+    def to_dict(self) -> Dict:
+        return {
+            "counts": {str(i): n for i, n in self.counts.items()},
+            "count": self.count, "total": self.total, "min": self.min, "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Histogram":
+        hist = cls()
+        hist.counts = {int(i): int(n) for i, n in data.get("counts", {}).items()}
+        hist.count = int(data.get("count", 0))
+        hist.total = int(data.get("total", 0))
+        hist.min = data.get("min")
+        hist.max = data.get("max")
+        return hist
+
+
+class StageRecorder:
+    """
+    Histogramme dieses Prozesses + periodischer Flush nach metrics_dir
+
+    Thread-safe; record() kostet ein Dict-Update unter Lock
+    """
+
+    def __init__(self, metrics_dir: Path = METRICS_DIR, enabled: bool = STAGE_METRICS_ENABLED):
+        self.metrics_dir = Path(metrics_dir)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._last_flush = time.monotonic()
+        self._last_compact: Optional[float] = None
+        self._dirty = False
+        self._host = socket.gethostname()
+        self._started = time.time()
+        self._path = self.metrics_dir / f"stages-{self._host}-{os.getpid()}.json"
+
+    def record(self, stage_name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            hist = self._histograms.get(stage_name)
+            if hist is None:
+                hist = self._histograms[stage_name] = Histogram()
+            hist.record(seconds * 1_000_000)
+            self._dirty = True
+            due = time.monotonic() - self._last_flush >= FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def count(self, name: str, label: str = "", n: int = 1) -> None:
+        """Event-Zähler erhöhen (z.B. Cache-Hits, Jobs pro Wrapper)"""
+        if not self.enabled or not n:
+            return
+        with self._lock:
+            counter = self._counters.get(name)
+            if counter is None:
+                counter = self._counters[name] = {}
+            counter[label] = counter.get(label, 0) + n
+            self._dirty = True
+            due = time.monotonic() - self._last_flush >= FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    @contextmanager
+    def stage(self, stage_name: str) -> Iterator[None]:
+        """Misst den with-Block (auch bei Exceptions)"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage_name, time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Histogram]:
+        """Kopie der Histogramme dieses Prozesses"""
+        with self._lock:
+            copies = {}
+            for name, hist in self._histograms.items():
+                copy = Histogram()
+                copy.merge(hist)
+                copies[name] = copy
+            return copies
+
+    def flush(self) -> None:
+        """Schreibt die Histogramme dieses Prozesses (atomic replace)"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._dirty:
+                return
+            payload = {
+                "host": self._host,
+                "pid": os.getpid(),
+                "started": self._started,
+                "updated": time.time(),
+                "stages": {name: hist.to_dict() for name, hist in self._histograms.items()},
+                "counters": {name: dict(counter) for name, counter in self._counters.items()},
+            }
+            self._dirty = False
+            compact_due = (self._last_compact is None
+                           or time.monotonic() - self._last_compact >= COMPACT_SECONDS)
+            if compact_due:
+                self._last_compact = time.monotonic()
+        try:
+            self.metrics_dir.mkdir(parents=True, exist_ok=True)
+            if compact_due:
+                # VOR dem ersten Write: eine Datei unter unserer PID stammt sonst
+                # von einem beendeten Vorgänger und würde überschrieben
+                compact_metrics(self.metrics_dir, self._host, own_started=self._started)
+            _write_json(self._path, payload)
+        except OSError:
+            # Metrics dürfen nie die Pipeline kippen
+            pass
+
+
+def _write_json(path: Path, payload: Dict) -> None:
+    """Atomic replace über eine Temp-Datei pro Thread"""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f)
+    os.replace(tmp, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # PermissionError → Prozess existiert (anderer User)
+        return True
+    return True
+
+
+def _read_json(path: Path) -> Optional[Dict]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_into(data: Dict, histograms: Dict[str, Histogram], counters: Dict[str, Dict[str, int]]) -> None:
+    for name, raw in data.get("stages", {}).items():
+        histograms.setdefault(name, Histogram()).merge(Histogram.from_dict(raw))
+    for name, labels in data.get("counters", {}).items():
+        counter = counters.setdefault(name, {})
+        for label, n in labels.items():
+            counter[label] = counter.get(label, 0) + int(n)
+
+
+def compact_metrics(metrics_dir: Path = METRICS_DIR, host: Optional[str] = None,
+                    own_started: Optional[float] = None) -> int:
+    """
+    Merged die Dateien beendeter Prozesse dieses Hosts in totals-<host>.json
+
+    === ABLAUF (unter flock, ein Kompaktierer pro Verzeichnis) ===
+    1. totals lesen, tote stages-<host>-<pid>.json dazu mergen
+    2. totals atomic schreiben - mit Name + Startzeit der gemergten Dateien
+    3. gemergte Dateien löschen
+    Crash zwischen 2 und 3 → "merged" verhindert doppeltes Zählen
+    (Read-Pfad und nächste Kompaktierung überspringen diese Dateien;
+    die Startzeit unterscheidet sie vom Nachfolger mit gleicher PID)
+
+    Returns:
+        Anzahl kompaktierter Dateien
+    """
+    metrics_dir = Path(metrics_dir)
+    host = host or socket.gethostname()
+    totals_path = metrics_dir / f"totals-{host}.json"
+
+    with open(metrics_dir / ".compact.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        totals = _read_json(totals_path) or {}
+        already = totals.get("merged", {})
+        histograms: Dict[str, Histogram] = {}
+        counters: Dict[str, Dict[str, int]] = {}
+        _merge_into(totals, histograms, counters)
+
+        dead = []
+        for path in metrics_dir.glob(f"stages-{host}-*.json"):
+            data = _read_json(path)
+            if data is None:
+                continue
+            if path.name in already and already[path.name] == data.get("started"):
+                # Schon in totals (Crash vor dem Löschen) - nur noch aufräumen
+                dead.append((path, data))
+                continue
+            pid = data.get("pid")
+            if not isinstance(pid, int) or path.name != f"stages-{host}-{pid}.json":
+                continue  # Host-Name mit "-" als Präfix eines anderen Hosts
+            if pid == os.getpid():
+                if own_started is None or data.get("started") == own_started:
+                    continue
+            elif _pid_alive(pid):
+                continue
+            _merge_into(data, histograms, counters)
+            dead.append((path, data))
+
+        if not dead:
+            return 0
+
+        _write_json(totals_path, {
+            "host": host,
+            "updated": time.time(),
+            "stages": {name: hist.to_dict() for name, hist in histograms.items()},
+            "counters": counters,
+            "merged": {path.name: data.get("started") for path, data in dead},
+        })
+        for path, _ in dead:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        return len(dead)
+
+
+# ============================================================================
+# READ PATH (API)
+# ============================================================================
+
+def load_metrics(metrics_dir: Path = METRICS_DIR) -> Tuple[Dict[str, Histogram], Dict[str, Dict[str, int]]]:
+    """
+    Merged Histogramme und Zähler: totals-<host>.json (beendete Prozesse,
+    kumulativ) + Dateien laufender Prozesse
+
+    Returns:
+        (stage → Histogram, counter → {label: summe})
+    """
+    merged: Dict[str, Histogram] = {}
+    counters: Dict[str, Dict[str, int]] = {}
+    try:
+        totals_files = list(Path(metrics_dir).glob("totals-*.json"))
+        files = list(Path(metrics_dir).glob("stages-*.json"))
+    except OSError:
+        return merged, counters
+
+    compacted: Dict[str, Optional[float]] = {}
+    for path in totals_files:
+        data = _read_json(path)
+        if data is None:
+            continue
+        compacted.update(data.get("merged", {}))
+        _merge_into(data, merged, counters)
+
+    for path in files:
+        data = _read_json(path)
+        if data is None:
+            continue
+        if path.name in compacted and compacted[path.name] == data.get("started"):
+            continue  # schon in totals, Löschen steht noch aus
+        _merge_into(data, merged, counters)
+    return merged, counters
+
+
+def load_histograms(metrics_dir: Path = METRICS_DIR) -> Dict[str, Histogram]:
+    """Merged die Histogramme aller Prozesse (laufend + kompaktiert)"""
+    return load_metrics(metrics_dir)[0]
+
+
+def _ordered(histograms: Dict[str, Histogram]) -> List[str]:
+    known = [name for name in STAGES if name in histograms]
+    return known + sorted(name for name in histograms if name not in STAGES)
+
+
+def summarize(histograms: Dict[str, Histogram]) -> Dict[str, Dict]:
+    """Stufe → count, mean/p50/p95/p99/max in Millisekunden"""
+    summary = {}
+    for name in _ordered(histograms):
+        hist = histograms[name]
+        summary[name] = {
+            "count": hist.count,
+            "mean_ms": round(hist.total / hist.count / 1000, 2) if hist.count else 0,
+            "p50_ms": round(hist.percentile(50) / 1000, 2),
+            "p95_ms": round(hist.percentile(95) / 1000, 2),
+            "p99_ms": round(hist.percentile(99) / 1000, 2),
+            "max_ms": round((hist.max or 0) / 1000, 2),
+            "total_s": round(hist.total / 1_000_000, 2),
+        }
+    return summary
+
+
+def prometheus_text(histograms: Dict[str, Histogram], metric: str = "syntx_stage_duration_seconds",
+                    help_text: str = "Consumer pipeline stage duration in seconds") -> str:
+    """Prometheus Text Format (Typ summary: Quantile + _sum + _count)"""
+    lines = [
+        f"# HELP {metric} {help_text}",
+        f"# TYPE {metric} summary",
+    ]
+    for name in _ordered(histograms):
+        hist = histograms[name]
+        for quantile in (0.5, 0.95, 0.99):
+            value = hist.percentile(quantile * 100) / 1_000_000
+            lines.append(f'{metric}{{stage="{name}",quantile="{quantile}"}} {value:.6f}')
+        lines.append(f'{metric}_sum{{stage="{name}"}} {hist.total / 1_000_000:.6f}')
+        lines.append(f'{metric}_count{{stage="{name}"}} {hist.count}')
+    return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# PROZESSWEITER RECORDER
+# ============================================================================
+
+_recorder: Optional[StageRecorder] = None
+_recorder_pid: Optional[int] = None
+_recorder_lock = threading.Lock()
+
+
+def get_stage_recorder() -> StageRecorder:
+    """Recorder dieses Prozesses (flusht zusätzlich beim Beenden)"""
+    global _recorder, _recorder_pid
+    with _recorder_lock:
+        if _recorder is None or _recorder_pid != os.getpid():
+            # Neu nach fork() - sonst schreiben Parent und Child in dieselbe Datei
+            _recorder = StageRecorder()
+            _recorder_pid = os.getpid()
+            atexit.register(_recorder.flush)
+        return _recorder
+
+
+def stage(stage_name: str):
+    """with stage("http"): ... → Dauer ins Histogramm der Stufe"""
+    return get_stage_recorder().stage(stage_name)
+
+
+def record_stage(stage_name: str, seconds: float) -> None:
+    """Bereits gemessene Dauer eintragen"""
+    get_stage_recorder().record(stage_name, seconds)
+
+
+def count_event(name: str, label: str = "", n: int = 1) -> None:
+    """Event-Zähler dieses Prozesses erhöhen (landet in der Stage-Datei)"""
+    get_stage_recorder().count(name, label, n)